@@ -0,0 +1,188 @@
+"""Benchmark i regresiona provera proračuna.
+
+Meri latenciju jedne ponude, pretragu cilindra za ceo opseg W (0.1-400 mm),
+batch ponude za 1k i 100k poslova i hladan import modula. Pre merenja svaka
+putanja se proverava na zlatnom korpusu (benchmark_podaci/), tako da ubrzanje
+ne može neprimetno da promeni cene. Rezultati se upoređuju sa sačuvanom osnovom.
+
+    python benchmark.py                     # provera + poređenje sa osnovom
+    python benchmark.py --izlaz rez.json    # rezultati u JSON
+    python benchmark.py --sacuvaj-osnovu    # trenutni rezultati postaju osnova
+
+Izlazni kod je 1 ako se vrednosti ne poklapaju sa korpusom ili je neka putanja
+sporija od osnove više od dozvoljene tolerancije.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import kalkulacija
+from kalkulacija import (
+    SIRINA_RADNA, RAZMAK_SIRINA, OTPAD_SIRINA, pronadji_specifikacije_cilindra, najbolji_cilindar_niz,
+    izracunaj_broj_po_sirini, izracunaj_sirinu_materijala, izracunaj_ponudu, izracunaj_ponude,
+)
+from kes import isprazni_keseve
+
+PODACI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_podaci")
+ZLATNE_PONUDE = os.path.join(PODACI, "zlatne_ponude.csv")
+ZLATNI_CILINDRI = os.path.join(PODACI, "zlatni_cilindri.csv")
+OSNOVA = os.path.join(PODACI, "osnova.json")
+ULAZ = ["sirina_W", "visina_H", "tiraz", "broj_boja", "is_blanko", "is_uv_lak", "materijal", "tip_alata", "brzina_masine_m_min", "koeficijent_zarade"]
+RTOL = 1e-9
+MIN_APSOLUTNO_S = 0.002   # razlike manje od ovoga se ne računaju kao regresija (šum merenja)
+
+
+# --- Zlatni korpus ---
+def ucitaj_korpus(putanja):
+    # round_trip: granične širine cilindra moraju da se učitaju do poslednjeg bita
+    return pd.read_csv(putanja, float_precision="round_trip")
+
+def _uporedi(ime, ocekivano, dobijeno, greske):
+    ocekivano = np.asarray(ocekivano, dtype=float); dobijeno = np.asarray(dobijeno, dtype=float)
+    isto = np.isclose(dobijeno, ocekivano, rtol=RTOL, atol=0.0, equal_nan=True)
+    if not isto.all():
+        i = int(np.flatnonzero(~isto)[0])
+        greske.append(f"{ime}: {int((~isto).sum())} razlika (red {i}: očekivano {ocekivano[i]!r}, dobijeno {dobijeno[i]!r})")
+
+def proveri_cilindre(zlatni):
+    greske = []
+    W = zlatni["sirina_W"].to_numpy()
+    # Skalarna putanja (lista svih rešenja)
+    skalarno = [pronadji_specifikacije_cilindra(float(w)) for w in W]
+    _uporedi("cilindar/skalarno/Z", zlatni["broj_zuba_Z"].astype(float), [b["broj_zuba_Z"] if b else np.nan for b, _, _ in skalarno], greske)
+    _uporedi("cilindar/skalarno/x", zlatni["broj_sablona_N_obim"].astype(float), [b["broj_sablona_N_obim"] if b else np.nan for b, _, _ in skalarno], greske)
+    _uporedi("cilindar/skalarno/G", zlatni["razmak_G_obim_mm"], [b["razmak_G_obim_mm"] if b else np.nan for b, _, _ in skalarno], greske)
+    _uporedi("cilindar/skalarno/broj_resenja", zlatni["broj_resenja"], [len(s) for _, s, _ in skalarno], greske)
+    # Vektorska putanja
+    niz = najbolji_cilindar_niz(W)
+    _uporedi("cilindar/niz/Z", zlatni["broj_zuba_Z"].astype(float), niz["broj_zuba_Z"], greske)
+    _uporedi("cilindar/niz/x", zlatni["broj_sablona_N_obim"].astype(float), niz["broj_sablona_N_obim"], greske)
+    _uporedi("cilindar/niz/G", zlatni["razmak_G_obim_mm"], niz["razmak_G_obim_mm"], greske)
+    return greske
+
+def proveri_ponude(zlatne):
+    greske = []
+    validne = zlatne[zlatne["validno"]]
+    # Pomoćne funkcije koraka 2-3
+    y = [izracunaj_broj_po_sirini(h, SIRINA_RADNA, RAZMAK_SIRINA) for h in validne["visina_H"]]
+    _uporedi("y", validne["broj_po_sirini_y"].astype(float), y, greske)
+    _uporedi("sirina_materijala", validne["sirina_materijala_potrebna_mm"],
+             [izracunaj_sirinu_materijala(yy, h, RAZMAK_SIRINA, OTPAD_SIRINA) for yy, h in zip(y, validne["visina_H"])], greske)
+    kolone = [k for k in zlatne.columns if k not in ULAZ and k != "validno"]
+    # Skalarna putanja (kao u aplikaciji), bez i sa kešom
+    for prolaz in ["hladno", "toplo"]:
+        if prolaz == "hladno": isprazni_keseve()
+        rezultati = [izracunaj_ponudu(**{k: (v.item() if hasattr(v, "item") else v) for k, v in red.items()}) for red in zlatne[ULAZ].to_dict("records")]
+        validno = np.array([r is not None for r in rezultati])
+        if not (validno == zlatne["validno"].to_numpy()).all(): greske.append(f"ponuda/skalarno/{prolaz}: validnost se razlikuje")
+        for k in kolone:
+            _uporedi(f"ponuda/skalarno/{prolaz}/{k}", zlatne.loc[validno, k].astype(float), [r[k] for r in rezultati if r is not None], greske)
+    # Batch putanja
+    batch = izracunaj_ponude(zlatne[ULAZ])
+    if not (batch["validno"].to_numpy() == zlatne["validno"].to_numpy()).all(): greske.append("ponuda/batch: validnost se razlikuje")
+    # Korpus za nevalidne poslove nema vrednosti; batch za njih računa geometriju, a troškovi su NaN
+    for k in kolone: _uporedi(f"ponuda/batch/{k}", validne[k].astype(float), batch.loc[zlatne["validno"].to_numpy(), k].astype(float), greske)
+    if not batch.loc[~zlatne["validno"].to_numpy(), "ukupni_trosak_proizvodnje_rsd"].isna().all(): greske.append("ponuda/batch: nevalidan posao ima trošak")
+    return greske
+
+
+# --- Merenja ---
+def izmeri(funkcija, ponavljanja, zagrevanje=1):
+    for _ in range(zagrevanje): funkcija()
+    vremena = []
+    for _ in range(ponavljanja):
+        t = time.perf_counter(); funkcija(); vremena.append(time.perf_counter() - t)
+    return {"median_s": statistics.median(vremena), "min_s": min(vremena), "p95_s": float(np.percentile(vremena, 95)), "ponavljanja": ponavljanja}
+
+def poslovi_za_batch(n, seme=0):
+    rng = np.random.default_rng(seme)
+    return pd.DataFrame({
+        "sirina_W": np.round(rng.uniform(0.1, 400, n), 3), "visina_H": np.round(rng.uniform(0.1, 190, n), 3),
+        "tiraz": rng.integers(1000, 2_000_000, n), "broj_boja": rng.integers(1, 9, n),
+        "is_blanko": rng.random(n) < 0.1, "is_uv_lak": rng.random(n) < 0.4,
+        "materijal": rng.choice(list(kalkulacija.DEFAULT_MATERIJALI_CENE), n),
+        "tip_alata": rng.choice(kalkulacija.TIPOVI_ALATA, n), "brzina_masine_m_min": rng.choice(np.arange(10, 121, 5), n),
+        "koeficijent_zarade": np.round(rng.uniform(0.01, 2, n), 2),
+    })
+
+def hladan_import(ponavljanja):
+    vremena = []
+    for _ in range(ponavljanja):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import kalkulacija"], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        vremena.append(time.perf_counter() - t)
+    return {"median_s": statistics.median(vremena), "min_s": min(vremena), "p95_s": float(np.percentile(vremena, 95)), "ponavljanja": ponavljanja}
+
+def pokreni_benchmark(brzo=False):
+    f = 0.2 if brzo else 1.0
+    W_opseg = np.round(np.arange(0.1, 400.0001, 0.1), 1)
+    W_gusto = np.linspace(0.1, 400, 400_000)
+    batch_1k = poslovi_za_batch(1_000); batch_100k = poslovi_za_batch(100_000)
+
+    def jedna_ponuda_hladno():
+        isprazni_keseve(); izracunaj_ponudu(76.0, 76.0, 100000, 2, False, True, None, "Rotacioni", 30, 0.2)
+
+    return {
+        "ponuda/jedna/hladno": izmeri(jedna_ponuda_hladno, max(5, int(200 * f))),
+        "ponuda/jedna/toplo": izmeri(lambda: izracunaj_ponudu(76.0, 76.0, 100000, 2, False, True, None, "Rotacioni", 30, 0.2), max(5, int(2000 * f))),
+        "cilindar/skalarno/0.1-400mm": izmeri(lambda: [pronadji_specifikacije_cilindra(float(w)) for w in W_opseg], max(3, int(5 * f))),
+        "cilindar/niz/400k": izmeri(lambda: najbolji_cilindar_niz(W_gusto), max(3, int(10 * f))),
+        "batch/1k": izmeri(lambda: izracunaj_ponude(batch_1k), max(5, int(50 * f))),
+        "batch/100k": izmeri(lambda: izracunaj_ponude(batch_100k), max(3, int(5 * f))),
+        "import/hladan": hladan_import(max(3, int(5 * f))),
+    }
+
+
+def uporedi_sa_osnovom(rezultati, osnova, tolerancija):
+    regresije = []
+    for ime, r in rezultati.items():
+        if ime not in osnova: continue
+        staro = osnova[ime]["median_s"]; novo = r["median_s"]
+        r["osnova_median_s"] = staro; r["odnos"] = novo / staro if staro else None
+        if novo > staro * (1 + tolerancija) and novo - staro > MIN_APSOLUTNO_S:
+            regresije.append(f"{ime}: {novo * 1000:.3f} ms vs osnova {staro * 1000:.3f} ms ({novo / staro:.2f}×)")
+    return regresije
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark i regresiona provera proračuna ponuda.")
+    parser.add_argument("--izlaz", help="JSON fajl sa rezultatima (podrazumevano stdout)")
+    parser.add_argument("--osnova", default=OSNOVA, help="JSON sa osnovnim rezultatima za poređenje")
+    parser.add_argument("--tolerancija", type=float, default=0.5, help="Dozvoljeno usporenje u odnosu na osnovu (0.5 = 50%%)")
+    parser.add_argument("--sacuvaj-osnovu", action="store_true", help="Upiši trenutne rezultate kao novu osnovu")
+    parser.add_argument("--brzo", action="store_true", help="Manje ponavljanja (za brzu proveru)")
+    parser.add_argument("--samo-korpus", action="store_true", help="Samo provera zlatnog korpusa, bez merenja")
+    args = parser.parse_args(argv)
+
+    greske = proveri_cilindre(ucitaj_korpus(ZLATNI_CILINDRI)) + proveri_ponude(ucitaj_korpus(ZLATNE_PONUDE))
+    izvestaj = {"korpus": {"ok": not greske, "greske": greske}}
+    regresije = []
+    if not args.samo_korpus:
+        rezultati = pokreni_benchmark(args.brzo)
+        if os.path.exists(args.osnova) and not args.sacuvaj_osnovu:
+            with open(args.osnova, encoding="utf-8") as f: osnova = json.load(f)["rezultati"]
+            regresije = uporedi_sa_osnovom(rezultati, osnova, args.tolerancija)
+        izvestaj.update({"rezultati": rezultati, "regresije": regresije,
+                         "okruzenje": {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__, "masina": platform.machine(), "cpu": os.cpu_count()}})
+        if args.sacuvaj_osnovu:
+            if greske: print("Osnova nije sačuvana: korpus se ne poklapa.", file=sys.stderr)
+            else:
+                with open(args.osnova, "w", encoding="utf-8") as f: json.dump({"rezultati": rezultati, "okruzenje": izvestaj["okruzenje"]}, f, indent=2)
+    tekst = json.dumps(izvestaj, indent=2, ensure_ascii=False)
+    if args.izlaz:
+        with open(args.izlaz, "w", encoding="utf-8") as f: f.write(tekst)
+    else: print(tekst)
+    for g in greske: print(f"KORPUS: {g}", file=sys.stderr)
+    for r in regresije: print(f"REGRESIJA: {r}", file=sys.stderr)
+    return 1 if greske or regresije else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
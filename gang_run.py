@@ -0,0 +1,155 @@
+"""Planiranje gang-run štampe: više poslova na istom cilindru i istoj traci materijala.
+
+Poslovi sa istim bojama, lakom, materijalom, alatom i koeficijentom zarade mogu
+da dele cilindar ako za isti Z svaki ima validno rešenje po obimu; trake (y) se
+dele po SIRINA_RADNA. Deljenjem se štede škart, priprema, rasprema, kliše i alat.
+
+Grupe se grade pohlepno po uštedama (Clarke-Wright): počinje se od pojedinačnih
+poslova, parovi se ocenjuju jednom, a posle svakog spajanja samo nova grupa
+sa preostalima. Nema pretrage svih kombinacija.
+
+Upotreba iz komandne linije:
+    python gang_run.py poslovi.csv -o plan.csv
+"""
+import argparse
+import heapq
+import numpy as np
+import pandas as pd
+from kalkulacija import (
+    SIRINA_RADNA, RAZMAK_SIRINA, OTPAD_SIRINA, INDEKS_CILINDARA,
+    pripremi_poslove, izracunaj_ponude, potrosnja_za_duzinu, izracunaj_troskove, svedi_broj_boja, podrazumevane_cene, ucitaj_tabelu, sacuvaj_tabelu,
+)
+
+KLJUC_KOMPATIBILNOSTI = ["broj_boja", "is_blanko", "is_uv_lak", "materijal", "tip_alata", "koeficijent_zarade"]
+
+
+class _Planer:
+    def __init__(self, poslovi, cene, indeks, sirina_radna, razmak_sirina):
+        self.poslovi = poslovi; self.cene = cene; self.indeks = indeks
+        self.sirina_radna = sirina_radna; self.razmak_sirina = razmak_sirina
+        self.W = poslovi["sirina_W"].to_numpy(dtype=float); self.H = poslovi["visina_H"].to_numpy(dtype=float)
+        self.tiraz = poslovi["tiraz"].to_numpy(dtype=float); self.brzina = poslovi["brzina_masine_m_min"].to_numpy(dtype=float)
+        self.zapisi = poslovi[KLJUC_KOMPATIBILNOSTI + ["cena_po_m2"]].to_dict("records")
+        # n_po_z[posao, Z - z_min] = najveći validan x za taj Z (0 = Z ne odgovara)
+        svi = indeks.svi(self.W)
+        self.n_po_z = np.zeros((len(poslovi), indeks.z.size), dtype=np.int64)
+        np.maximum.at(self.n_po_z, (svi["red"], svi["broj_zuba_Z"] - indeks.z_min), svi["broj_sablona_N_obim"])
+
+    def oceni(self, grupa):
+        """Najjeftiniji zajednički cilindar i raspodela traka za grupu; None ako grupa ne može zajedno."""
+        grupa = np.asarray(grupa); H = self.H[grupa]
+        sirina_min = H.sum() + (grupa.size - 1) * self.razmak_sirina
+        if sirina_min > self.sirina_radna: return None
+        zajednicki = np.flatnonzero((self.n_po_z[grupa] > 0).all(axis=0))
+        if zajednicki.size == 0: return None
+        n = self.n_po_z[grupa][:, zajednicki].T                            # K × g
+        segment = self.indeks.obim[zajednicki][:, None] / n                 # mm po šablonu
+        potrebno_m = self.tiraz[grupa][None, :] * segment / 1000            # dužina sa jednom trakom
+        # Trake se dodaju poslu koji najduže traje, dok ima mesta po širini
+        y = np.ones_like(n); sirina = np.full(zajednicki.size, sirina_min)
+        redovi = np.arange(zajednicki.size)
+        while True:
+            usko_grlo = np.argmax(potrebno_m / y, axis=1)
+            dodatak = H[usko_grlo] + self.razmak_sirina
+            moze = sirina + dodatak <= self.sirina_radna
+            if not moze.any(): break
+            y[redovi[moze], usko_grlo[moze]] += 1; sirina[moze] += dodatak[moze]
+        # Zajednička traka se štampa u celim obrtajima cilindra, pa i posao koji je usko grlo dobije pun tiraž
+        obim = self.indeks.obim[zajednicki]
+        obrtaja = np.ceil((potrebno_m / y).max(axis=1) * 1000 / obim - 1e-9)
+        duzina = obrtaja * obim / 1000
+        prvi = self.zapisi[grupa[0]]
+        bb = svedi_broj_boja(prvi["broj_boja"], prvi["is_blanko"])
+        pot = potrosnja_za_duzinu(duzina, sirina + OTPAD_SIRINA, bb, prvi["is_blanko"], self.brzina[grupa].min())
+        tro = izracunaj_troskove(pot, self.tiraz[grupa].sum(), bb, prvi["is_blanko"], prvi["is_uv_lak"], prvi["cena_po_m2"],
+                                 prvi["tip_alata"], prvi["koeficijent_zarade"], self.cene)
+        k = int(np.argmin(tro["ukupni_trosak_proizvodnje_rsd"]))
+        return {
+            "poslovi": grupa.tolist(), "broj_zuba_Z": int(self.indeks.z[zajednicki[k]]),
+            "broj_po_obimu_x": n[k], "broj_po_sirini_y": y[k], "segment_mm": segment[k], "obrtaja": obrtaja[k],
+            "duzina_proizvodnje_m": duzina[k], "sirina_materijala_mm": sirina[k] + OTPAD_SIRINA,
+            "trosak_rsd": tro["ukupni_trosak_proizvodnje_rsd"][k], "prodajna_rsd": tro["ukupna_cena_prodajna_rsd"][k],
+        }
+
+
+def planiraj_gang_run(poslovi, cene=None, min_usteda_rsd=0.0, indeks=None, sirina_radna=SIRINA_RADNA, razmak_sirina=RAZMAK_SIRINA):
+    """Grupiše poslove u gang-run štampe i poredi sa pojedinačnim ponudama.
+
+    Vraća (plan_poslova, plan_grupa). Pojedinačni poslovi ostaju svaki u svojoj grupi.
+    """
+    cene = cene or podrazumevane_cene(); indeks = indeks or INDEKS_CILINDARA
+    # Iste provere kao batch proračun (obavezne kolone, nepoznat materijal ili alat -> ValueError)
+    poslovi, kolone, cena_po_m2 = pripremi_poslove(poslovi, cene)
+    poslovi = poslovi.assign(**kolone, cena_po_m2=cena_po_m2)
+    samostalno = izracunaj_ponude(poslovi, cene)
+    planer = _Planer(poslovi, cene, indeks, sirina_radna, razmak_sirina)
+
+    # Grupe: id -> (članovi, ocena); pojedinačni posao ima trošak svoje ponude
+    trosak = {i: samostalno["ukupni_trosak_proizvodnje_rsd"].iat[i] for i in range(len(poslovi))}
+    clanovi = {i: [i] for i in range(len(poslovi))}; ocene = {}
+    particija = poslovi[KLJUC_KOMPATIBILNOSTI + ["cena_po_m2"]].astype(str).agg("|".join, axis=1).to_numpy()
+    validni = samostalno["validno"].to_numpy()
+    heap = []
+
+    def predlozi(a, b):
+        ocena = planer.oceni(clanovi[a] + clanovi[b])
+        if ocena is None: return
+        usteda = trosak[a] + trosak[b] - ocena["trosak_rsd"]
+        if usteda > min_usteda_rsd: heapq.heappush(heap, (-usteda, a, b, ocena))
+
+    for p in np.unique(particija):
+        clan = [i for i in np.flatnonzero(particija == p) if validni[i]]
+        for ia, a in enumerate(clan):
+            for b in clan[ia + 1:]: predlozi(a, b)
+    sledeci_id = len(poslovi)
+    while heap:
+        _, a, b, ocena = heapq.heappop(heap)
+        if a not in clanovi or b not in clanovi: continue
+        novi = sledeci_id; sledeci_id += 1
+        clanovi[novi] = clanovi.pop(a) + clanovi.pop(b); trosak[novi] = ocena["trosak_rsd"]; ocene[novi] = ocena
+        del trosak[a], trosak[b]
+        for drugi in list(clanovi):
+            if drugi != novi and particija[clanovi[drugi][0]] == particija[clanovi[novi][0]] and validni[clanovi[drugi][0]]: predlozi(novi, drugi)
+
+    # Izveštaj
+    plan = poslovi.copy()
+    plan["samostalni_trosak_rsd"] = samostalno["ukupni_trosak_proizvodnje_rsd"]; plan["samostalna_prodajna_rsd"] = samostalno["ukupna_cena_prodajna_rsd"]
+    for ime in ["grupa", "broj_zuba_Z", "broj_po_obimu_x", "broj_po_sirini_y", "komada_odstampano", "udeo_troska_rsd"]: plan[ime] = np.nan
+    grupe = []
+    for broj, (gid, cl) in enumerate(sorted(clanovi.items(), key=lambda g: -len(g[1]))):
+        cl = list(cl)
+        if gid in ocene:
+            o = ocene[gid]; y = np.asarray(o["broj_po_sirini_y"])
+            komada = o["obrtaja"] * np.asarray(o["broj_po_obimu_x"]) * y
+            udeo = y * planer.H[cl]; udeo = udeo / udeo.sum()
+            plan.loc[cl, "broj_zuba_Z"] = o["broj_zuba_Z"]; plan.loc[cl, "broj_po_obimu_x"] = o["broj_po_obimu_x"]; plan.loc[cl, "broj_po_sirini_y"] = y
+            plan.loc[cl, "komada_odstampano"] = komada; plan.loc[cl, "udeo_troska_rsd"] = udeo * o["trosak_rsd"]
+            gang_trosak, gang_prodajna, duzina, sirina, z = o["trosak_rsd"], o["prodajna_rsd"], o["duzina_proizvodnje_m"], o["sirina_materijala_mm"], o["broj_zuba_Z"]
+        else:
+            s = samostalno.iloc[cl[0]]
+            plan.loc[cl, ["broj_zuba_Z", "broj_po_obimu_x", "broj_po_sirini_y"]] = [s["broj_zuba_Z"], s["broj_po_obimu_x"], s["broj_po_sirini_y"]]
+            plan.loc[cl, "komada_odstampano"] = plan.loc[cl, "tiraz"]; plan.loc[cl, "udeo_troska_rsd"] = s["ukupni_trosak_proizvodnje_rsd"]
+            gang_trosak, gang_prodajna, duzina, sirina, z = s["ukupni_trosak_proizvodnje_rsd"], s["ukupna_cena_prodajna_rsd"], s["ukupna_duzina_proizvodnja_m"], s["sirina_materijala_potrebna_mm"], s["broj_zuba_Z"]
+        plan.loc[cl, "grupa"] = broj
+        samostalni = samostalno["ukupni_trosak_proizvodnje_rsd"].iloc[cl].sum(); samostalna_prodajna = samostalno["ukupna_cena_prodajna_rsd"].iloc[cl].sum()
+        grupe.append({"grupa": broj, "broj_poslova": len(cl), "poslovi": cl, "broj_zuba_Z": z, "duzina_proizvodnje_m": duzina, "sirina_materijala_mm": sirina,
+                      "trosak_rsd": gang_trosak, "samostalni_trosak_rsd": samostalni, "usteda_rsd": samostalni - gang_trosak,
+                      "prodajna_rsd": gang_prodajna, "samostalna_prodajna_rsd": samostalna_prodajna})
+    plan["grupa"] = plan["grupa"].astype("Int64")
+    return plan, pd.DataFrame(grupe)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gang-run plan za tabelu poslova (CSV/Parquet).")
+    parser.add_argument("ulaz", help="Tabela poslova (.csv ili .parquet), iste kolone kao za kalkulacija.py")
+    parser.add_argument("-o", "--izlaz", help="Plan po poslovima (.csv ili .parquet)")
+    args = parser.parse_args(argv)
+    plan, grupe = planiraj_gang_run(ucitaj_tabelu(args.ulaz))
+    if args.izlaz: sacuvaj_tabelu(plan, args.izlaz)
+    print(grupe.drop(columns=["poslovi"]).to_string(index=False))
+    print(f"Ukupna ušteda: {grupe['usteda_rsd'].sum():,.2f} RSD")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,470 @@
+"""Proračun troškova štampe etiketa, nezavisan od Streamlit-a.
+
+Faze proračuna (koraci 1-15 iz aplikacije) su napisane nad NumPy nizovima,
+tako da isti kod računa jednu ponudu za stranicu i ceo katalog odjednom.
+
+Upotreba iz komandne linije:
+    python kalkulacija.py poslovi.csv -o ponude.csv
+"""
+import argparse
+import math
+import sys
+import numpy as np
+import pandas as pd
+from kes import napravi_kes
+from merenje import meri
+
+# --- Konstante ---
+PITCH = 3.175; GAP_MIN = 2.5; GAP_MAX = 4.0; Z_MIN = 70; Z_MAX = 140
+SIRINA_CILINDRA_UKUPNA = 200; SIRINA_RADNA = 190; RAZMAK_SIRINA = 5
+OTPAD_SIRINA = 10; MAX_SIRINA_MATERIJALA = 200
+DUZINA_SKART_OSNOVA = 50.0; DUZINA_SKART_PO_BOJI = 50.0
+VREME_PRIPREME_PO_BOJI_ILI_OSNOVA = 30; VREME_RASPREME_MIN = 30
+BRZINA_MASINE_DEFAULT = 30; BRZINA_MASINE_MIN = 10; BRZINA_MASINE_MAX = 120
+GRAMA_BOJE_PO_M2 = 3.0; GRAMA_LAKA_PO_M2 = 4.0
+CENA_BOJE_PO_KG_DEFAULT = 2350.0; CENA_LAKA_PO_KG_DEFAULT = 1800.0
+CENA_RADA_MASINE_PO_SATU_DEFAULT = 3000.0
+CENA_ALATA_POLUROTACIONI_DEFAULT = 6000.0
+CENA_ALATA_ROTACIONI_DEFAULT = 8000.0
+KOEFICIJENT_ZARADE_DEFAULT = 0.20
+CENA_KLISEA_PO_BOJI_DEFAULT = 2000.0
+
+# Podrazumevani materijali i cene (RSD/m²)
+DEFAULT_MATERIJALI_CENE = {
+    "Papir (hrom)": 39.95,
+    "Plastika (PPW)": 54.05,
+    "Termopapir": 49.35
+}
+
+TIPOVI_ALATA = ["Nijedan", "Polurotacioni", "Rotacioni"]
+
+# Najveći broj stavki u keševima proračuna jedne ponude
+KES_CILINDRI_MAX = 1024; KES_GEOMETRIJA_MAX = 2048; KES_POTROSNJA_MAX = 4096; KES_TROSKOVI_MAX = 4096
+
+# Kolone ulazne tabele za batch i njihove podrazumevane vrednosti (None = obavezna)
+ULAZNE_KOLONE = {
+    "sirina_W": None,
+    "visina_H": None,
+    "tiraz": None,
+    "broj_boja": 1,
+    "is_blanko": False,
+    "is_uv_lak": False,
+    "materijal": next(iter(DEFAULT_MATERIJALI_CENE)),
+    "tip_alata": "Nijedan",
+    "brzina_masine_m_min": BRZINA_MASINE_DEFAULT,
+    "koeficijent_zarade": KOEFICIJENT_ZARADE_DEFAULT,
+}
+
+
+def podrazumevane_cene():
+    """Cenovnik sa podrazumevanim vrednostima (isti ključevi kao u session_state)."""
+    return {
+        "materijali_cene": DEFAULT_MATERIJALI_CENE.copy(),
+        "cena_boje_po_kg": CENA_BOJE_PO_KG_DEFAULT,
+        "cena_laka_po_kg": CENA_LAKA_PO_KG_DEFAULT,
+        "cena_rada_masine_po_satu": CENA_RADA_MASINE_PO_SATU_DEFAULT,
+        "cena_alata_polurotacioni": CENA_ALATA_POLUROTACIONI_DEFAULT,
+        "cena_alata_rotacioni": CENA_ALATA_ROTACIONI_DEFAULT,
+        "cena_klisea_po_boji": CENA_KLISEA_PO_BOJI_DEFAULT,
+    }
+
+
+# --- Funkcije Kalkulacija (skalarne) ---
+@meri("1. obim: pretraga cilindra")
+def pronadji_specifikacije_cilindra(sirina_sablona_W, indeks=None):
+    if sirina_sablona_W <= 0: return None, [], "Greška: Širina šablona mora biti > 0."
+    indeks = indeks or INDEKS_CILINDARA
+    svi = indeks.svi(sirina_sablona_W)
+    validna_resenja = [{"broj_zuba_Z": z, "obim_mm": obim_C, "broj_sablona_N_obim": n, "razmak_G_obim_mm": razmak_G_obim}
+                       for z, obim_C, n, razmak_G_obim in zip(svi["broj_zuba_Z"].tolist(), svi["obim_mm"].tolist(), svi["broj_sablona_N_obim"].tolist(), svi["razmak_G_obim_mm"].tolist())]
+    if not validna_resenja:
+        message = f"Nije pronađen cilindar ({indeks.z_min}-{indeks.z_max} zuba) za W={sirina_sablona_W:.3f}mm sa G={indeks.gap_min:.1f}-{indeks.gap_max:.1f}mm."
+        return None, [], message
+    return validna_resenja[0], validna_resenja, "Proračun za obim OK."
+
+def pronadji_specifikacije_cilindra_kes(sirina_sablona_W):
+    """Kao pronadji_specifikacije_cilindra, uz keš po širini (rezultat se ne sme menjati)."""
+    return _KES_CILINDRI.dohvati_ili_izracunaj(float(sirina_sablona_W), lambda: pronadji_specifikacije_cilindra(sirina_sablona_W))
+
+def izracunaj_broj_po_sirini(visina_sablona_H, sirina_radna, razmak_sirina):
+    if visina_sablona_H <= 0: return 0
+    if visina_sablona_H > sirina_radna: return 0
+    if visina_sablona_H <= sirina_radna and (visina_sablona_H * 2 + razmak_sirina) > sirina_radna: return 1
+    denominator = visina_sablona_H + razmak_sirina
+    if denominator <= 1e-9: return 0
+    return int(math.floor((sirina_radna + razmak_sirina) / denominator))
+
+def izracunaj_sirinu_materijala(broj_po_sirini_y, visina_sablona_H, razmak_sirina, otpad_sirina):
+    if broj_po_sirini_y <= 0: return 0
+    sirina_sablona_ukupno = broj_po_sirini_y * visina_sablona_H
+    sirina_razmaka_ukupno = max(0, broj_po_sirini_y - 1) * razmak_sirina
+    return sirina_sablona_ukupno + sirina_razmaka_ukupno + otpad_sirina
+
+def format_time(total_minutes):
+    if total_minutes < 0: return "N/A"
+    total_minutes = round(total_minutes)
+    if total_minutes == 0: return "0 min"
+    if total_minutes < 60: return f"{total_minutes} min"
+    hours, minutes = divmod(total_minutes, 60)
+    if minutes == 0: return f"{hours} h"
+    return f"{hours} h {minutes} min"
+
+
+# --- Vektorizovane verzije ---
+class IndeksCilindara:
+    """Unapred izračunat indeks rešenja za obim cilindra.
+
+    Svaki par (Z, n) važi za tačno jedan interval širina W:
+    C/n - GAP_MAX <= W <= C/n - GAP_MIN. Granice svih intervala se sortiraju
+    jednom; između dve susedne granice skup validnih parova je isti, pa se
+    najbolje rešenje za svaki segment čuva i traži sa np.searchsorted (O(log k)).
+    Sva rešenja se računaju zatvorenom formulom za opseg n po svakom Z.
+    Širine na ~1e-7 od granice idu na direktnu proveru (ista logika kao petlja).
+    """
+    TOLERANCIJA = 1e-9
+    BLIZU_GRANICE = 1e-7
+    RESENJA_PO_PAKETU = 1_000_000   # kandidata (W, Z, n) po paketu u svi()
+    MAX_RESENJA = 20_000_000        # ukupno kandidata u jednom pozivu svi() (~1 GB rezultata)
+
+    def __init__(self, pitch=PITCH, gap_min=GAP_MIN, gap_max=GAP_MAX, z_min=Z_MIN, z_max=Z_MAX):
+        self.pitch = pitch; self.gap_min = gap_min; self.gap_max = gap_max; self.z_min = z_min; self.z_max = z_max
+        self.z = np.arange(z_min, z_max + 1)
+        self.obim = self.z * pitch
+        # Svi intervali (Z, n) za W > 0
+        n_max = np.floor(self.obim / gap_min).astype(np.int64)
+        z_int = np.repeat(self.z, n_max); obim_int = np.repeat(self.obim, n_max)
+        n_int = np.arange(n_max.sum()) - np.repeat(np.cumsum(n_max) - n_max, n_max) + 1
+        donja = obim_int / n_int - gap_max - self.TOLERANCIJA; gornja = obim_int / n_int - gap_min
+        self.broj_intervala = len(z_int)
+        self.granice = np.unique(np.concatenate([donja, gornja, [0.0]]))
+        # Predstavnik svakog segmenta (sredina; krajnji segmenti van granica)
+        g = self.granice
+        predstavnici = np.concatenate([[g[0] - 1.0], (g[:-1] + g[1:]) / 2, [g[-1] + 1.0]])
+        najbolje = self._najbolji_direktno(predstavnici)
+        self.segment_z = najbolje["broj_zuba_Z"]; self.segment_n = najbolje["broj_sablona_N_obim"]
+
+    def _najbolji_direktno(self, sirina_W):
+        sirina_W = np.asarray(sirina_W, dtype=float)
+        z_best = np.full(sirina_W.shape, np.nan); obim_best = np.full(sirina_W.shape, np.nan)
+        n_best = np.full(sirina_W.shape, np.nan); gap_best = np.full(sirina_W.shape, np.nan)
+        tolerancija = self.TOLERANCIJA
+        with np.errstate(divide="ignore", invalid="ignore"):
+            korak = sirina_W + self.gap_min
+            # Od najvećeg ka najmanjem Z, tako da najmanji validan Z ostane upisan
+            for z, obim_C in zip(self.z[::-1].tolist(), self.obim[::-1].tolist()):
+                n = np.floor(obim_C / korak)
+                gap = obim_C / n - sirina_W
+                ok = (sirina_W > 0) & (n >= 1) & (gap >= self.gap_min - tolerancija) & (gap <= self.gap_max + tolerancija)
+                z_best[ok] = z; obim_best[ok] = obim_C; n_best[ok] = n[ok]; gap_best[ok] = gap[ok]
+        return {"broj_zuba_Z": z_best, "obim_mm": obim_best, "broj_sablona_N_obim": n_best, "razmak_G_obim_mm": gap_best}
+
+    def najbolji(self, sirina_W):
+        """Najbolje rešenje (najmanji Z, najviše x) za svaku širinu iz niza; NaN ako ga nema."""
+        sirina_W = np.atleast_1d(np.asarray(sirina_W, dtype=float))
+        g = self.granice
+        idx = np.searchsorted(g, sirina_W)
+        z = self.segment_z[idx]; n = self.segment_n[idx]
+        obim = z * self.pitch
+        with np.errstate(invalid="ignore"):
+            gap = obim / n - sirina_W
+            blizu = (np.abs(sirina_W - g[np.maximum(idx - 1, 0)]) < self.BLIZU_GRANICE) | (np.abs(g[np.minimum(idx, len(g) - 1)] - sirina_W) < self.BLIZU_GRANICE)
+        rezultat = {"broj_zuba_Z": z, "obim_mm": obim, "broj_sablona_N_obim": n, "razmak_G_obim_mm": gap}
+        if blizu.any():
+            direktno = self._najbolji_direktno(sirina_W[blizu])
+            for ime in rezultat: rezultat[ime][blizu] = direktno[ime]
+        return rezultat
+
+    def svi(self, sirina_W):
+        """Sva validna rešenja za niz širina, sortirana po (red, Z ↑, x ↓).
+
+        Vraća ravne nizove; kolona `red` je indeks širine u ulaznom nizu. Broj rešenja
+        raste kako W opada (~5 za W=76, ~2600 za W=0.5), pa se širine obrađuju u paketima
+        od najviše RESENJA_PO_PAKETU kandidata. Rezultat i dalje drži sva rešenja, pa je
+        namenjeno za mali broj širina; preko MAX_RESENJA kandidata je ValueError, a za
+        velike nizove širina treba koristiti najbolji().
+        """
+        sirina_W = np.atleast_1d(np.asarray(sirina_W, dtype=float))
+        n_max, n_min = self._opseg_n(sirina_W)
+        po_sirini = np.clip(n_max - n_min + 1, 0, None).sum(axis=1)
+        if po_sirini.sum() > self.MAX_RESENJA:
+            raise ValueError(f"Previše kandidata za svi() ({po_sirini.sum():,} za {sirina_W.size:,} širina, najviše {self.MAX_RESENJA:,}); za veće nizove koristite najbolji().")
+        # Granice paketa: paket se završava gde zbir kandidata pređe sledeći umnožak RESENJA_PO_PAKETU
+        # (paket ima najviše RESENJA_PO_PAKETU + kandidate jedne širine)
+        zbir = np.cumsum(po_sirini)
+        umnosci = np.arange(1, zbir[-1] // self.RESENJA_PO_PAKETU + 1) * self.RESENJA_PO_PAKETU if zbir.size else np.empty(0, np.int64)
+        unutra = np.unique(np.searchsorted(zbir, umnosci, side="right"))
+        granice = [0, *unutra[(unutra > 0) & (unutra < sirina_W.size)].tolist(), sirina_W.size]
+        delovi = [self._svi_paket(sirina_W[od:do], n_max[od:do], n_min[od:do], od) for od, do in zip(granice[:-1], granice[1:])]
+        return delovi[0] if len(delovi) == 1 else {ime: np.concatenate([d[ime] for d in delovi]) for ime in delovi[0]}
+
+    def _opseg_n(self, sirina_W):
+        W = sirina_W[:, None]; obim = self.obim[None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n_max = np.floor(obim / (W + self.gap_min))
+            n_min = np.ceil(obim / (W + self.gap_max + self.TOLERANCIJA)) - 1
+        n_max = np.where((W > 0) & np.isfinite(n_max), n_max, 0).astype(np.int64)
+        n_min = np.maximum(1, np.nan_to_num(n_min, posinf=0)).astype(np.int64)
+        return n_max, n_min
+
+    def _svi_paket(self, sirina_W, n_max, n_min, pomeraj_reda):
+        broj = np.clip(n_max - n_min + 1, 0, None).ravel()
+        par = np.repeat(np.arange(broj.size), broj)
+        n = n_max.ravel()[par] - (np.arange(par.size) - np.repeat(np.cumsum(broj) - broj, broj))
+        red, zi = np.divmod(par, self.z.size)
+        obim_r = self.obim[zi]
+        gap = obim_r / n - sirina_W[red]
+        ok = (gap >= self.gap_min - self.TOLERANCIJA) & (gap <= self.gap_max + self.TOLERANCIJA)
+        return {"red": red[ok] + pomeraj_reda, "broj_zuba_Z": self.z[zi][ok], "obim_mm": obim_r[ok], "broj_sablona_N_obim": n[ok], "razmak_G_obim_mm": gap[ok]}
+
+INDEKS_CILINDARA = IndeksCilindara()
+
+_KES_CILINDRI = napravi_kes("cilindri", KES_CILINDRI_MAX)
+_KES_GEOMETRIJA = napravi_kes("geometrija", KES_GEOMETRIJA_MAX)
+_KES_POTROSNJA = napravi_kes("potrosnja", KES_POTROSNJA_MAX)
+_KES_TROSKOVI = napravi_kes("troskovi", KES_TROSKOVI_MAX)
+
+def najbolji_cilindar_niz(sirina_W, indeks=None):
+    """Najbolje rešenje za svaku širinu W iz niza (vidi IndeksCilindara)."""
+    return (indeks or INDEKS_CILINDARA).najbolji(sirina_W)
+
+def broj_po_sirini_niz(visina_H, sirina_radna=SIRINA_RADNA, razmak_sirina=RAZMAK_SIRINA):
+    visina_H = np.asarray(visina_H, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.floor((sirina_radna + razmak_sirina) / (visina_H + razmak_sirina))
+    y = np.where(visina_H * 2 + razmak_sirina > sirina_radna, 1, y)
+    y = np.where(~np.isfinite(visina_H) | (visina_H <= 0) | (visina_H > sirina_radna) | (visina_H + razmak_sirina <= 1e-9), 0, y)
+    return y.astype(np.int64)
+
+def sirina_materijala_niz(broj_po_sirini_y, visina_H, razmak_sirina=RAZMAK_SIRINA, otpad_sirina=OTPAD_SIRINA):
+    y = np.asarray(broj_po_sirini_y); visina_H = np.asarray(visina_H, dtype=float)
+    with np.errstate(invalid="ignore"):
+        sirina = y * visina_H + np.maximum(0, y - 1) * razmak_sirina + otpad_sirina
+    return np.where(y <= 0, 0.0, sirina)
+
+
+# --- Faze proračuna ---
+@meri("1-3 geometrija")
+def izracunaj_geometriju(sirina_W, visina_H, indeks=None, sirina_radna=SIRINA_RADNA, razmak_sirina=RAZMAK_SIRINA,
+                         otpad_sirina=OTPAD_SIRINA, max_sirina_materijala=MAX_SIRINA_MATERIJALA):
+    """Koraci 1-3: cilindar, broj šablona po širini (y) i širina materijala.
+
+    Podrazumevano za mašinu iz konstanti; druge mašine daju svoj indeks i širine (vidi masine.py).
+    """
+    geo = najbolji_cilindar_niz(sirina_W, indeks)
+    y = broj_po_sirini_niz(visina_H, sirina_radna, razmak_sirina)
+    geo["broj_po_obimu_x"] = geo["broj_sablona_N_obim"]
+    geo["broj_po_sirini_y"] = y
+    geo["ukupno_sablona_po_ciklusu"] = y * geo["broj_sablona_N_obim"]
+    geo["sirina_materijala_potrebna_mm"] = sirina_materijala_niz(y, visina_H, razmak_sirina, otpad_sirina)
+    geo["prekoracena_sirina_materijala"] = geo["sirina_materijala_potrebna_mm"] > max_sirina_materijala
+    # Prazna ili beskonačna H (npr. prazna ćelija u CSV-u) je nevalidan posao, kao i W bez cilindra
+    geo["validno"] = ~np.isnan(geo["broj_zuba_Z"]) & np.isfinite(np.asarray(visina_H, dtype=float))
+    return geo
+
+@meri("4-7 potrošnja i vreme")
+def izracunaj_potrosnju(geo, sirina_W, tiraz, broj_boja, is_blanko, brzina_masine_m_min, **parametri):
+    """Koraci 4-7: potrošnja materijala (proizvodnja + škart) i vreme rada.
+
+    `broj_boja` je već svedeni broj boja (0 za blanko, inače najmanje 1).
+    `parametri` zamenjuju konstante škarta i vremena (vidi potrosnja_za_duzinu).
+    """
+    sirina_W = np.asarray(sirina_W, dtype=float); tiraz = np.asarray(tiraz, dtype=float)
+    y = geo["broj_po_sirini_y"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 4. Proizvodnja
+        duzina_segmenta_mm = sirina_W + geo["razmak_G_obim_mm"]
+        duzina_proizvodnja = np.where(y > 0, (tiraz / y) * duzina_segmenta_mm / 1000, 0.0)
+    return potrosnja_za_duzinu(duzina_proizvodnja, geo["sirina_materijala_potrebna_mm"], broj_boja, is_blanko, brzina_masine_m_min, **parametri)
+
+def potrosnja_za_duzinu(duzina_proizvodnja, sirina_mat, broj_boja, is_blanko, brzina_masine_m_min,
+                        duzina_skart_osnova=DUZINA_SKART_OSNOVA, duzina_skart_po_boji=DUZINA_SKART_PO_BOJI,
+                        vreme_pripreme_po_boji=VREME_PRIPREME_PO_BOJI_ILI_OSNOVA, vreme_raspreme_min=VREME_RASPREME_MIN):
+    """Koraci 4-7 za već poznatu dužinu proizvodnje (m) i širinu materijala (mm), npr. za gang-run.
+
+    Škart i vremena mogu biti i nizovi (npr. uzorci za analizu rizika); ulazi se broadcast-uju.
+    """
+    duzina_proizvodnja = np.asarray(duzina_proizvodnja, dtype=float); sirina_mat = np.asarray(sirina_mat, dtype=float)
+    broj_boja = np.asarray(broj_boja); is_blanko = np.asarray(is_blanko, dtype=bool)
+    brzina = np.asarray(brzina_masine_m_min, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kvadratura_proizvodnja = np.where(sirina_mat > 0, duzina_proizvodnja * (sirina_mat / 1000), 0.0)
+        # 5. Škart
+        duzina_skart = np.where(is_blanko, duzina_skart_osnova, duzina_skart_osnova + (broj_boja * duzina_skart_po_boji))
+        kvadratura_skart = np.where(sirina_mat > 0, duzina_skart * (sirina_mat / 1000), 0.0)
+        # 7. Vreme
+        broj_boja_za_skart_vreme = np.where(is_blanko, 1, broj_boja)
+        vreme_pripreme = broj_boja_za_skart_vreme * vreme_pripreme_po_boji
+        vreme_proizvodnje = np.where((duzina_proizvodnja > 0) & (brzina > 0), duzina_proizvodnja / brzina, 0.0)
+    vreme_raspreme = np.zeros(np.broadcast_shapes(duzina_proizvodnja.shape, np.shape(vreme_raspreme_min))) + vreme_raspreme_min
+    return {
+        "ukupna_duzina_proizvodnja_m": duzina_proizvodnja,
+        "ukupna_kvadratura_proizvodnja_m2": kvadratura_proizvodnja,
+        "duzina_skart_m": duzina_skart,
+        "kvadratura_skart_m2": kvadratura_skart,
+        # 6. Ukupno
+        "ukupna_duzina_final_m": duzina_proizvodnja + duzina_skart,
+        "ukupna_kvadratura_final_m2": kvadratura_proizvodnja + kvadratura_skart,
+        "broj_boja_za_skart_vreme": broj_boja_za_skart_vreme,
+        "vreme_pripreme_min": vreme_pripreme,
+        "vreme_proizvodnje_min": vreme_proizvodnje,
+        "vreme_raspreme_min": vreme_raspreme,
+        "ukupno_vreme_min": vreme_pripreme + vreme_proizvodnje + vreme_raspreme,
+    }
+
+@meri("8-15 troškovi i cena")
+def izracunaj_troskove(pot, tiraz, broj_boja, is_blanko, is_uv_lak, cena_po_m2, tip_alata, koeficijent_zarade, cene,
+                       grama_boje_po_m2=GRAMA_BOJE_PO_M2, grama_laka_po_m2=GRAMA_LAKA_PO_M2):
+    """Koraci 8-15: boja i lak, kliše, materijal, rad mašine, alat, zarada i prodajna cena."""
+    tiraz = np.asarray(tiraz, dtype=float); broj_boja = np.asarray(broj_boja)
+    is_blanko = np.asarray(is_blanko, dtype=bool); is_uv_lak = np.asarray(is_uv_lak, dtype=bool)
+    cena_po_m2 = np.asarray(cena_po_m2, dtype=float); tip_alata = np.asarray(tip_alata)
+    koeficijent_zarade = np.asarray(koeficijent_zarade, dtype=float)
+    kv_proizvodnja = pot["ukupna_kvadratura_proizvodnja_m2"]; kv_final = pot["ukupna_kvadratura_final_m2"]
+    vreme_min = pot["ukupno_vreme_min"]
+    # 8. Boja i lak
+    ima_boje = ~is_blanko & (broj_boja > 0) & (kv_proizvodnja > 0)
+    potrosnja_boje_kg = np.where(ima_boje, kv_proizvodnja * broj_boja * grama_boje_po_m2 / 1000.0, 0.0)
+    cena_boje = np.where(ima_boje, potrosnja_boje_kg * cene["cena_boje_po_kg"], 0.0)
+    ima_laka = is_uv_lak & (kv_proizvodnja > 0)
+    potrosnja_laka_kg = np.where(ima_laka, kv_proizvodnja * grama_laka_po_m2 / 1000.0, 0.0)
+    cena_laka = np.where(ima_laka, potrosnja_laka_kg * cene["cena_laka_po_kg"], 0.0)
+    cena_boja_lak = cena_boje + cena_laka
+    # 9. Kliše
+    cena_klisea = np.where(~is_blanko & (broj_boja > 0), broj_boja * cene["cena_klisea_po_boji"], 0.0)
+    # 10. Materijal
+    cena_materijala = np.where((kv_final > 0) & (cena_po_m2 >= 0), kv_final * cena_po_m2, 0.0)
+    # 11. Rad mašine
+    cena_rada = cene["cena_rada_masine_po_satu"]
+    cena_rada_masine = np.where((vreme_min > 0) & (cena_rada >= 0), vreme_min / 60.0 * cena_rada, 0.0)
+    # 12. Alat
+    cena_alata = np.select([tip_alata == "Polurotacioni", tip_alata == "Rotacioni"],
+                           [cene["cena_alata_polurotacioni"], cene["cena_alata_rotacioni"]], 0.0)
+    cena_alata = np.broadcast_to(cena_alata, cena_boja_lak.shape).astype(float)
+    # 13. Ukupan trošak proizvodnje
+    trosak = cena_boja_lak + cena_klisea + cena_materijala + cena_rada_masine + cena_alata
+    # 14. Zarada
+    zarada = np.where((cena_materijala > 0) & (koeficijent_zarade > 0), cena_materijala * koeficijent_zarade, 0.0)
+    # 15. Prodajna cena
+    prodajna = trosak + zarada
+    with np.errstate(divide="ignore", invalid="ignore"):
+        po_komadu = np.where(tiraz > 0, prodajna / tiraz, 0.0)
+    return {
+        "potrosnja_boje_kg": potrosnja_boje_kg, "cena_boje_rsd": cena_boje,
+        "potrosnja_laka_kg": potrosnja_laka_kg, "cena_laka_rsd": cena_laka,
+        "ukupna_cena_boja_lak_rsd": cena_boja_lak,
+        "ukupna_cena_klisea_rsd": cena_klisea,
+        "ukupna_cena_materijala_rsd": cena_materijala,
+        "ukupna_cena_rada_masine_rsd": cena_rada_masine,
+        "ukupna_cena_alata_rsd": cena_alata,
+        "ukupni_trosak_proizvodnje_rsd": trosak,
+        "zarada_rsd": zarada,
+        "ukupna_cena_prodajna_rsd": prodajna,
+        "prodajna_cena_po_komadu_rsd": po_komadu,
+    }
+
+def svedi_broj_boja(broj_boja, is_blanko):
+    """Broj boja koji ulazi u proračun: 0 za blanko, inače najmanje 1."""
+    return np.where(np.asarray(is_blanko, dtype=bool), 0, np.maximum(np.asarray(broj_boja), 1))
+
+
+# --- Ulazne tačke ---
+def pripremi_poslove(poslovi, cene):
+    """Tabela poslova -> (tabela, kolone kao nizovi sa podrazumevanim vrednostima, cena_po_m2 po poslu).
+
+    Nepoznat materijal ili tip alata je ValueError.
+    """
+    poslovi = pd.DataFrame(poslovi).reset_index(drop=True)
+    kolone = {}
+    for ime, podrazumevano in ULAZNE_KOLONE.items():
+        if ime in poslovi: kolone[ime] = poslovi[ime].to_numpy()
+        elif podrazumevano is None: raise ValueError(f"Nedostaje obavezna kolona '{ime}'.")
+        else: kolone[ime] = np.full(len(poslovi), podrazumevano)
+    if "cena_po_m2" in poslovi:
+        cena_po_m2 = poslovi["cena_po_m2"].to_numpy(dtype=float)
+    else:
+        materijali = pd.Series(kolone["materijal"])
+        nepoznati = set(materijali[~materijali.isin(list(cene["materijali_cene"]))])
+        if nepoznati: raise ValueError(f"Nepoznati materijali: {sorted(nepoznati)}")
+        cena_po_m2 = materijali.map(cene["materijali_cene"]).to_numpy(dtype=float)
+    nepoznati_alati = set(kolone["tip_alata"]) - set(TIPOVI_ALATA)
+    if nepoznati_alati: raise ValueError(f"Nepoznati tipovi alata: {sorted(nepoznati_alati)}")
+    return poslovi, kolone, cena_po_m2
+
+@meri("ponude: batch ukupno")
+def izracunaj_ponude(poslovi, cene=None):
+    """Batch proračun: tabela poslova (kolone iz ULAZNE_KOLONE) -> tabela sa svim koracima.
+
+    Opciona kolona `cena_po_m2` zamenjuje cenu materijala iz cenovnika.
+    Redovi za koje nije pronađen cilindar ili bez visine H imaju `validno=False` i NaN troškove.
+    """
+    cene = cene or podrazumevane_cene()
+    poslovi, kolone, cena_po_m2 = pripremi_poslove(poslovi, cene)
+    broj_boja = svedi_broj_boja(kolone["broj_boja"], kolone["is_blanko"])
+    geo = izracunaj_geometriju(kolone["sirina_W"], kolone["visina_H"])
+    pot = izracunaj_potrosnju(geo, kolone["sirina_W"], kolone["tiraz"], broj_boja, kolone["is_blanko"], kolone["brzina_masine_m_min"])
+    tro = izracunaj_troskove(pot, kolone["tiraz"], broj_boja, kolone["is_blanko"], kolone["is_uv_lak"], cena_po_m2,
+                             kolone["tip_alata"], kolone["koeficijent_zarade"], cene)
+
+    # Kolone se prave odjednom; dodavanje jedne po jedne u DataFrame je sporo za male tabele
+    kolone = {"validno": geo["validno"]}
+    for ime in ["broj_zuba_Z", "obim_mm", "broj_po_obimu_x", "razmak_G_obim_mm", "broj_po_sirini_y",
+                "ukupno_sablona_po_ciklusu", "sirina_materijala_potrebna_mm", "prekoracena_sirina_materijala"]:
+        kolone[ime] = geo[ime]
+    for ime, vrednosti in {**pot, **tro}.items():
+        kolone[ime] = np.where(geo["validno"], vrednosti, np.nan)
+    for ime in ["broj_zuba_Z", "broj_po_obimu_x", "ukupno_sablona_po_ciklusu"]:
+        kolone[ime] = pd.array(kolone[ime], dtype="Int64")
+    rezultat = pd.concat([poslovi.drop(columns=[ime for ime in kolone if ime in poslovi]), pd.DataFrame(kolone)], axis=1)
+    return rezultat
+
+@meri("ponuda: ukupno (sa kešom)")
+def izracunaj_ponudu(sirina_W, visina_H, tiraz, broj_boja=1, is_blanko=False, is_uv_lak=False, cena_po_m2=None,
+                     tip_alata="Nijedan", brzina_masine_m_min=BRZINA_MASINE_DEFAULT,
+                     koeficijent_zarade=KOEFICIJENT_ZARADE_DEFAULT, materijal=None, cene=None):
+    """Proračun jedne ponude; vraća rečnik sa svim koracima ili None ako nema cilindra."""
+    cene = cene or podrazumevane_cene()
+    if cena_po_m2 is None:
+        materijal = materijal or ULAZNE_KOLONE["materijal"]
+        cena_po_m2 = cene["materijali_cene"][materijal]
+    bb = svedi_broj_boja([broj_boja], [is_blanko])
+    # Svaka faza ima svoj keš i ključ samo od ulaza od kojih zavisi,
+    # pa promena cene ne poništava geometriju ni potrošnju
+    kljuc_geo = (float(sirina_W), float(visina_H))
+    geo = _KES_GEOMETRIJA.dohvati_ili_izracunaj(kljuc_geo, lambda: izracunaj_geometriju([sirina_W], [visina_H]))
+    if not geo["validno"][0]: return None
+    kljuc_pot = kljuc_geo + (float(tiraz), int(bb[0]), bool(is_blanko), float(brzina_masine_m_min))
+    pot = _KES_POTROSNJA.dohvati_ili_izracunaj(kljuc_pot, lambda: izracunaj_potrosnju(geo, [sirina_W], [tiraz], bb, [is_blanko], [brzina_masine_m_min]))
+    cena_alata = {"Polurotacioni": cene["cena_alata_polurotacioni"], "Rotacioni": cene["cena_alata_rotacioni"]}.get(tip_alata, 0.0)
+    kljuc_tro = kljuc_pot + (bool(is_uv_lak), float(cena_po_m2), tip_alata, float(cena_alata), float(koeficijent_zarade),
+                             cene["cena_boje_po_kg"], cene["cena_laka_po_kg"], cene["cena_klisea_po_boji"], cene["cena_rada_masine_po_satu"])
+    tro = _KES_TROSKOVI.dohvati_ili_izracunaj(kljuc_tro, lambda: izracunaj_troskove(pot, [tiraz], bb, [is_blanko], [is_uv_lak], [cena_po_m2], [tip_alata], [koeficijent_zarade], cene))
+    rezultat = {ime: vrednosti[0].item() for ime, vrednosti in {**geo, **pot, **tro}.items()}
+    for ime in ["broj_zuba_Z", "broj_sablona_N_obim", "broj_po_obimu_x", "broj_po_sirini_y", "ukupno_sablona_po_ciklusu", "broj_boja_za_skart_vreme"]:
+        rezultat[ime] = int(rezultat[ime])
+    rezultat["broj_boja"] = int(bb[0])
+    return rezultat
+
+
+def ucitaj_tabelu(putanja):
+    if str(putanja).lower().endswith(".parquet"): return pd.read_parquet(putanja)
+    return pd.read_csv(putanja)
+
+def sacuvaj_tabelu(tabela, putanja):
+    if str(putanja).lower().endswith(".parquet"): tabela.to_parquet(putanja, index=False)
+    else: tabela.to_csv(putanja, index=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch kalkulacija ponuda za etikete (CSV/Parquet).")
+    parser.add_argument("ulaz", help="Tabela poslova (.csv ili .parquet)")
+    parser.add_argument("-o", "--izlaz", help="Izlazna tabela (.csv ili .parquet); podrazumevano stdout kao CSV")
+    args = parser.parse_args(argv)
+    rezultat = izracunaj_ponude(ucitaj_tabelu(args.ulaz))
+    if args.izlaz: sacuvaj_tabelu(rezultat, args.izlaz)
+    else: print(rezultat.to_csv(index=False), end="")
+    nevalidni = int((~rezultat["validno"]).sum())
+    if nevalidni: print(f"Upozorenje: {nevalidni} poslova bez odgovarajućeg cilindra.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,57 @@
+"""Ograničeni keš (LRU) za rezultate proračuna.
+
+Keševi žive na nivou procesa, pa ih dele sve Streamlit sesije na serveru.
+Svaki keš ima ime, najveći broj stavki i brojače pogodaka/promašaja/izbacivanja.
+"""
+import threading
+from collections import OrderedDict
+
+_KESEVI = {}
+_KESEVI_LOCK = threading.Lock()
+
+
+class OgranicenKes:
+    """LRU keš sa ograničenim brojem stavki; bezbedan za više niti."""
+
+    def __init__(self, ime, max_velicina):
+        if max_velicina < 1: raise ValueError("max_velicina mora biti >= 1")
+        self.ime = ime; self.max_velicina = max_velicina
+        self._stavke = OrderedDict(); self._lock = threading.Lock()
+        self.pogoci = 0; self.promasaji = 0; self.izbaceno = 0
+
+    def dohvati_ili_izracunaj(self, kljuc, funkcija):
+        with self._lock:
+            if kljuc in self._stavke:
+                self._stavke.move_to_end(kljuc); self.pogoci += 1
+                return self._stavke[kljuc]
+            self.promasaji += 1
+        # Računa se van lock-a; dve niti mogu izračunati isti ključ, rezultat je isti
+        vrednost = funkcija()
+        with self._lock:
+            self._stavke[kljuc] = vrednost; self._stavke.move_to_end(kljuc)
+            while len(self._stavke) > self.max_velicina:
+                self._stavke.popitem(last=False); self.izbaceno += 1
+        return vrednost
+
+    def isprazni(self):
+        with self._lock: self._stavke.clear()
+
+    def statistika(self):
+        with self._lock:
+            ukupno = self.pogoci + self.promasaji
+            return {"kes": self.ime, "stavki": len(self._stavke), "max": self.max_velicina,
+                    "pogoci": self.pogoci, "promasaji": self.promasaji, "izbaceno": self.izbaceno,
+                    "procenat_pogodaka": (100.0 * self.pogoci / ukupno) if ukupno else 0.0}
+
+
+def napravi_kes(ime, max_velicina):
+    """Vraća keš sa datim imenom; pravi ga pri prvom pozivu (bezbedno za ponovljene rerun-ove)."""
+    with _KESEVI_LOCK:
+        if ime not in _KESEVI: _KESEVI[ime] = OgranicenKes(ime, max_velicina)
+        return _KESEVI[ime]
+
+def statistika_keseva():
+    return [kes.statistika() for kes in list(_KESEVI.values())]
+
+def isprazni_keseve():
+    for kes in list(_KESEVI.values()): kes.isprazni()
@@ -0,0 +1,193 @@
+"""Profili mašina (flota) i ponuda na svim kompatibilnim mašinama.
+
+Profili se učitavaju iz JSON ili TOML fajla (podrazumevano masine.json, putanja
+se menja promenljivom LABEL_MASINE): lista mašina sa korakom zupčanika, opsegom
+Z, širinom cilindra i trake, brzinom i cenom rada po satu. Nenavedena polja
+uzimaju vrednosti iz kalkulacija.py (trenutna mašina).
+
+Geometrija se računa po mašini nad njenim indeksom cilindara, a potrošnja i
+troškovi za sve parove (posao, mašina) jednim vektorskim prolazom, pa flota od
+10 mašina za jednu ponudu košta oko milisekunde više nego jedna. Veliki batch-evi
+se dele po mašinama na više niti: NumPy oslobađa GIL nad velikim nizovima, a
+niti dele memoriju, pa se nizovi ne kopiraju između procesa.
+
+Upotreba iz komandne linije:
+    python masine.py poslovi.csv --masine masine.json -o poredjenje.csv
+"""
+import argparse
+import json
+import os
+import threading
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from kes import napravi_kes
+from kalkulacija import (
+    PITCH, GAP_MIN, GAP_MAX, Z_MIN, Z_MAX, SIRINA_CILINDRA_UKUPNA, SIRINA_RADNA, RAZMAK_SIRINA, OTPAD_SIRINA,
+    MAX_SIRINA_MATERIJALA, BRZINA_MASINE_DEFAULT, BRZINA_MASINE_MIN, BRZINA_MASINE_MAX, CENA_RADA_MASINE_PO_SATU_DEFAULT,
+    INDEKS_CILINDARA, IndeksCilindara, pripremi_poslove, izracunaj_geometriju, izracunaj_potrosnju, izracunaj_troskove,
+    svedi_broj_boja, podrazumevane_cene, ucitaj_tabelu, sacuvaj_tabelu,
+)
+
+PUTANJA_MASINA = os.environ.get("LABEL_MASINE", "masine.json")
+POLJA_MASINE = {   # polje -> podrazumevana vrednost (trenutna mašina iz kalkulacija.py)
+    "pitch": PITCH, "gap_min": GAP_MIN, "gap_max": GAP_MAX, "z_min": Z_MIN, "z_max": Z_MAX,
+    "sirina_cilindra_ukupna": SIRINA_CILINDRA_UKUPNA, "sirina_radna": SIRINA_RADNA, "razmak_sirina": RAZMAK_SIRINA,
+    "otpad_sirina": OTPAD_SIRINA, "max_sirina_materijala": MAX_SIRINA_MATERIJALA,
+    "brzina_m_min": BRZINA_MASINE_DEFAULT, "brzina_min": BRZINA_MASINE_MIN, "brzina_max": BRZINA_MASINE_MAX,
+    "cena_rada_po_satu": CENA_RADA_MASINE_PO_SATU_DEFAULT,
+}
+KRITERIJUMI_PREPORUKE = ["ukupni_trosak_proizvodnje_rsd", "ukupno_vreme_min", "ukupna_cena_prodajna_rsd"]
+PRAG_PARALELNO = 200_000   # parova (posao, mašina) od kog se mašine dele na više niti
+KOLONE_POREDJENJA = [
+    "broj_zuba_Z", "broj_po_obimu_x", "broj_po_sirini_y", "razmak_G_obim_mm", "sirina_materijala_potrebna_mm",
+    "ukupna_duzina_final_m", "ukupna_kvadratura_final_m2", "ukupno_vreme_min", "ukupna_cena_materijala_rsd",
+    "ukupna_cena_rada_masine_rsd", "ukupni_trosak_proizvodnje_rsd", "ukupna_cena_prodajna_rsd", "prodajna_cena_po_komadu_rsd",
+]
+
+_INDEKSI = {}
+_INDEKSI_LOCK = threading.Lock()
+
+
+class ProfilMasine:
+    """Parametri jedne mašine; nenavedena polja su iz POLJA_MASINE."""
+
+    def __init__(self, naziv, **parametri):
+        nepoznata = set(parametri) - set(POLJA_MASINE)
+        if nepoznata: raise ValueError(f"Nepoznata polja mašine '{naziv}': {sorted(nepoznata)}")
+        self.naziv = str(naziv)
+        for polje, podrazumevano in POLJA_MASINE.items():
+            vrednost = parametri.get(polje, podrazumevano)
+            setattr(self, polje, int(vrednost) if polje in ("z_min", "z_max") else float(vrednost))
+        if self.z_min > self.z_max or self.gap_min > self.gap_max or self.pitch <= 0:
+            raise ValueError(f"Mašina '{naziv}': neispravan opseg cilindra (Z {self.z_min}-{self.z_max}, G {self.gap_min}-{self.gap_max}, pitch {self.pitch}).")
+        if self.sirina_radna > self.sirina_cilindra_ukupna:
+            raise ValueError(f"Mašina '{naziv}': radna širina {self.sirina_radna} je veća od širine cilindra {self.sirina_cilindra_ukupna}.")
+        if not self.brzina_min <= self.brzina_m_min <= self.brzina_max:
+            raise ValueError(f"Mašina '{naziv}': brzina {self.brzina_m_min} nije u opsegu {self.brzina_min}-{self.brzina_max} m/min.")
+
+    def kljuc_indeksa(self):
+        return (self.pitch, self.gap_min, self.gap_max, self.z_min, self.z_max)
+
+    def recnik(self):
+        return {"naziv": self.naziv, **{polje: getattr(self, polje) for polje in POLJA_MASINE}}
+
+    def __repr__(self):
+        return f"ProfilMasine({self.naziv!r})"
+
+
+def indeks_za(masina):
+    """Indeks cilindara za mašinu; deli se između mašina sa istim zupčanicima i opsegom Z."""
+    kljuc = masina.kljuc_indeksa()
+    if kljuc == (PITCH, GAP_MIN, GAP_MAX, Z_MIN, Z_MAX): return INDEKS_CILINDARA
+    with _INDEKSI_LOCK:
+        if kljuc not in _INDEKSI: _INDEKSI[kljuc] = IndeksCilindara(*kljuc)
+        return _INDEKSI[kljuc]
+
+def ucitaj_flotu(putanja=None):
+    """Lista ProfilMasine iz JSON/TOML fajla ({"masine": [...]}, ili samo lista u JSON-u).
+
+    Bez fajla na podrazumevanoj putanji flota je jedna mašina iz konstanti.
+    """
+    if putanja is None and not os.path.exists(PUTANJA_MASINA): return [ProfilMasine("Podrazumevana")]
+    putanja = putanja or PUTANJA_MASINA
+    if str(putanja).lower().endswith(".toml"):
+        with open(putanja, "rb") as f: podaci = tomllib.load(f)
+    else:
+        with open(putanja, encoding="utf-8") as f: podaci = json.load(f)
+    masine = podaci.get("masine", []) if isinstance(podaci, dict) else podaci
+    if not masine: raise ValueError(f"Fajl '{putanja}' ne sadrži nijednu mašinu.")
+    flota = [ProfilMasine(**m) for m in masine]
+    nazivi = [m.naziv for m in flota]
+    if len(set(nazivi)) != len(nazivi): raise ValueError(f"Nazivi mašina se ponavljaju: {sorted({n for n in nazivi if nazivi.count(n) > 1})}")
+    return flota
+
+def ucitaj_flotu_kes(putanja=None):
+    """Kao ucitaj_flotu, uz keš po putanji i vremenu izmene fajla."""
+    putanja = putanja or PUTANJA_MASINA
+    izmena = os.path.getmtime(putanja) if os.path.exists(putanja) else None
+    return napravi_kes("flota", 8).dohvati_ili_izracunaj((putanja, izmena), lambda: ucitaj_flotu(putanja if izmena is not None else None))
+
+
+def _na_masinama(kolone, cena_po_m2, flota, cene):
+    """Svi parovi (mašina, posao) za dati deo flote; redovi su po mašini pa po poslu."""
+    n = len(kolone["sirina_W"])
+    delovi = [izracunaj_geometriju(kolone["sirina_W"], kolone["visina_H"], indeks_za(m), m.sirina_radna, m.razmak_sirina,
+                                   m.otpad_sirina, m.max_sirina_materijala) for m in flota]
+    geo = {ime: np.concatenate([d[ime] for d in delovi]) for ime in delovi[0]}
+    ponovi = lambda niz: np.tile(np.asarray(niz), len(flota))
+    brzina = np.repeat([m.brzina_m_min for m in flota], n)
+    bb = ponovi(svedi_broj_boja(kolone["broj_boja"], kolone["is_blanko"]))
+    # Cena rada je po mašini; izracunaj_troskove je prima i kao niz poravnat sa redovima
+    cene = {**cene, "cena_rada_masine_po_satu": np.repeat([m.cena_rada_po_satu for m in flota], n)}
+    pot = izracunaj_potrosnju(geo, ponovi(kolone["sirina_W"]), ponovi(kolone["tiraz"]), bb, ponovi(kolone["is_blanko"]), brzina)
+    tro = izracunaj_troskove(pot, ponovi(kolone["tiraz"]), bb, ponovi(kolone["is_blanko"]), ponovi(kolone["is_uv_lak"]), ponovi(cena_po_m2),
+                             ponovi(kolone["tip_alata"]), ponovi(kolone["koeficijent_zarade"]), cene)
+    return {**geo, **pot, **tro, "brzina_masine_m_min": brzina}
+
+def izracunaj_na_floti(poslovi, flota=None, cene=None, kriterijum="ukupni_trosak_proizvodnje_rsd", radnici=None):
+    """Svaki posao na svakoj mašini flote -> tabela (posao × mašina) sa preporukom.
+
+    Mašina je kompatibilna ako ima cilindar za W, bar jednu traku (y > 0) i ako
+    širina materijala ne prelazi njen maksimum. Brzina i cena rada su iz profila
+    mašine (kolona brzina_masine_m_min iz poslova se ovde ne koristi). Preporučena je
+    kompatibilna mašina sa najmanjim `kriterijum`; kod jednakih prednost ima ranija u floti.
+    """
+    if kriterijum not in KRITERIJUMI_PREPORUKE: raise ValueError(f"Nepoznat kriterijum '{kriterijum}'.")
+    flota = flota or ucitaj_flotu_kes(); cene = cene or podrazumevane_cene()
+    _, kolone, cena_po_m2 = pripremi_poslove(poslovi, cene)
+    n = len(cena_po_m2)
+    radnici = min(radnici or os.cpu_count() or 1, len(flota))
+    if radnici > 1 and n * len(flota) >= PRAG_PARALELNO:
+        delovi_flote = [list(d) for d in np.array_split(np.arange(len(flota)), radnici)]
+        with ThreadPoolExecutor(max_workers=radnici) as izvrsilac:
+            rezultati = list(izvrsilac.map(_na_masinama, [kolone] * radnici, [cena_po_m2] * radnici,
+                                           [[flota[i] for i in d] for d in delovi_flote], [cene] * radnici))
+        rez = {ime: np.concatenate([r[ime] for r in rezultati]) for ime in rezultati[0]}
+    else: rez = _na_masinama(kolone, cena_po_m2, flota, cene)
+
+    kompatibilna = rez["validno"] & (rez["broj_po_sirini_y"] > 0) & ~rez["prekoracena_sirina_materijala"]
+    vrednost = np.where(kompatibilna, rez[kriterijum], np.inf).reshape(len(flota), n)
+    najbolja = np.argmin(vrednost, axis=0)
+    preporucena = np.zeros((len(flota), n), dtype=bool)
+    preporucena[najbolja, np.arange(n)] = np.isfinite(vrednost[najbolja, np.arange(n)])
+
+    tabela = {"posao": np.tile(np.arange(n), len(flota)), "masina": np.repeat(np.array([m.naziv for m in flota], dtype=object), n),
+              "kompatibilna": kompatibilna, "preporucena": preporucena.ravel(), "brzina_masine_m_min": rez["brzina_masine_m_min"]}
+    for ime in KOLONE_POREDJENJA:
+        tabela[ime] = rez[ime] if ime.startswith("broj_") or ime in ("razmak_G_obim_mm", "sirina_materijala_potrebna_mm") else np.where(kompatibilna, rez[ime], np.nan)
+    for ime in ["broj_zuba_Z", "broj_po_obimu_x"]: tabela[ime] = pd.array(tabela[ime], dtype="Int64")
+    redosled = np.lexsort((np.repeat(np.arange(len(flota)), n), tabela["posao"]))
+    return pd.DataFrame(tabela).iloc[redosled].reset_index(drop=True)
+
+def uporedi_masine(sirina_W, visina_H, tiraz, broj_boja=1, is_blanko=False, is_uv_lak=False, cena_po_m2=None, tip_alata="Nijedan",
+                   koeficijent_zarade=None, materijal=None, flota=None, cene=None, kriterijum="ukupni_trosak_proizvodnje_rsd"):
+    """Jedna ponuda na svim mašinama flote (tabela po mašini, bez kolone posao)."""
+    posao = {"sirina_W": sirina_W, "visina_H": visina_H, "tiraz": tiraz, "broj_boja": broj_boja, "is_blanko": is_blanko,
+             "is_uv_lak": is_uv_lak, "tip_alata": tip_alata}
+    if koeficijent_zarade is not None: posao["koeficijent_zarade"] = koeficijent_zarade
+    if cena_po_m2 is not None: posao["cena_po_m2"] = cena_po_m2
+    elif materijal is not None: posao["materijal"] = materijal
+    return izracunaj_na_floti([posao], flota, cene, kriterijum).drop(columns=["posao"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ponude za tabelu poslova na svim mašinama flote.")
+    parser.add_argument("ulaz", help="Tabela poslova (.csv ili .parquet), iste kolone kao za kalkulacija.py")
+    parser.add_argument("--masine", help=f"Profili mašina (.json ili .toml, podrazumevano {PUTANJA_MASINA})")
+    parser.add_argument("--kriterijum", default="ukupni_trosak_proizvodnje_rsd", choices=KRITERIJUMI_PREPORUKE)
+    parser.add_argument("--radnici", type=int, help="Broj niti za velike tabele (podrazumevano broj jezgara)")
+    parser.add_argument("-o", "--izlaz", help="Poređenje po (posao, mašina) (.csv ili .parquet)")
+    args = parser.parse_args(argv)
+    flota = ucitaj_flotu(args.masine)
+    tabela = izracunaj_na_floti(ucitaj_tabelu(args.ulaz), flota, kriterijum=args.kriterijum, radnici=args.radnici)
+    if args.izlaz: sacuvaj_tabelu(tabela, args.izlaz)
+    preporuke = tabela[tabela["preporucena"]]
+    print(preporuke["masina"].value_counts().rename("preporuka").to_string())
+    print(f"Poslova bez kompatibilne mašine: {tabela['posao'].nunique() - len(preporuke)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+"""Merenje vremena po fazama proračuna i delovima stranice.
+
+Podrazumevano je isključeno: etapa() tada vraća uvek isti prazan context manager,
+bez čitanja sata i bez zaključavanja. Uključuje se promenljivom okruženja
+LABEL_PROFIL=1 ili iz skrivenog debug panela aplikacije (?debug=1 u adresi).
+
+Delovi stranice se mere kao krugovi štoperice: deo(ime) zatvara prethodni deo
+i počinje novi, pa pokusaj.py ne mora da se prerasporedi u blokove.
+
+Izvoz: prometheus_tekst() (Prometheus text format), json_linije() (poslednji
+rerun-ovi, jedan JSON po liniji), fajl LABEL_PROFIL_LOG (JSON linija po rerun-u)
+i HTTP /metrics preko pokreni_izvoz(port).
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+POCETAK_UVOZA = time.perf_counter()   # pokusaj.py uvozi ovaj modul pre ostalih (zato samo standardna biblioteka)
+BROJ_UZORAKA = 1000; BROJ_RERUNOVA = 200
+
+_NISTA = contextlib.nullcontext()
+
+
+def _kvantil(sortirano, q):
+    """Kvantil sa linearnom interpolacijom (kao numpy.quantile) nad sortiranom listom."""
+    i = q * (len(sortirano) - 1); dole = int(i); gore = min(dole + 1, len(sortirano) - 1)
+    return sortirano[dole] + (sortirano[gore] - sortirano[dole]) * (i - dole)
+
+
+class _Metrika:
+    __slots__ = ("broj", "ukupno_s", "max_s", "uzorci")
+
+    def __init__(self):
+        self.broj = 0; self.ukupno_s = 0.0; self.max_s = 0.0; self.uzorci = deque(maxlen=BROJ_UZORAKA)
+
+
+class Profil:
+    """Brojači i trajanja na nivou procesa; rerun u toku se vodi po niti (svaka sesija ima svoju)."""
+
+    def __init__(self, ukljuceno=False, log_putanja=None):
+        self.ukljuceno = ukljuceno; self.log_putanja = log_putanja
+        self._lock = threading.Lock(); self._lokalno = threading.local()
+        self._metrike = {}; self.rerunovi = deque(maxlen=BROJ_RERUNOVA)
+        self.broj_rerunova = 0; self.vreme_uvoza_s = None; self.prvi_rerun_s = None
+
+    # --- Faze ---
+    def etapa(self, ime):
+        """Context manager koji meri blok; kad je merenje isključeno ne radi ništa."""
+        if not self.ukljuceno: return _NISTA
+        return self._meri(ime)
+
+    @contextlib.contextmanager
+    def _meri(self, ime):
+        pocetak = time.perf_counter()
+        try: yield
+        finally: self.zabelezi(ime, time.perf_counter() - pocetak)
+
+    def zabelezi(self, ime, trajanje_s):
+        with self._lock:
+            metrika = self._metrike.get(ime)
+            if metrika is None: metrika = self._metrike[ime] = _Metrika()
+            metrika.broj += 1; metrika.ukupno_s += trajanje_s; metrika.max_s = max(metrika.max_s, trajanje_s); metrika.uzorci.append(trajanje_s)
+        rerun = getattr(self._lokalno, "rerun", None)
+        if rerun is not None: rerun["etape"].append([ime, trajanje_s])
+
+    # --- Rerun i delovi stranice ---
+    def zabelezi_uvoz(self):
+        """Vreme od prvog uvoza ovog modula do kraja uvoza aplikacije; beleži se jednom po procesu."""
+        if self.vreme_uvoza_s is None: self.vreme_uvoza_s = time.perf_counter() - POCETAK_UVOZA
+
+    def pocni_rerun(self, sesija=None):
+        with self._lock: self.broj_rerunova += 1; broj = self.broj_rerunova
+        if not self.ukljuceno: self._lokalno.rerun = None; return
+        sada = time.perf_counter()
+        self._lokalno.rerun = {"rerun": broj, "sesija": sesija, "vreme": datetime.now().isoformat(timespec="milliseconds"), "pocetak": sada, "etape": []}
+        self._lokalno.deo = None; self._lokalno.deo_pocetak = sada
+
+    def deo(self, ime):
+        """Zatvara prethodni deo stranice i počinje novi."""
+        if getattr(self._lokalno, "rerun", None) is None: return
+        sada = time.perf_counter()
+        if self._lokalno.deo is not None: self.zabelezi(f"stranica: {self._lokalno.deo}", sada - self._lokalno.deo_pocetak)
+        self._lokalno.deo = ime; self._lokalno.deo_pocetak = time.perf_counter()
+
+    def zavrsi_rerun(self):
+        """Zatvara poslednji deo, beleži ukupno trajanje rerun-a i vraća zapis (None ako merenje nije bilo uključeno)."""
+        rerun = getattr(self._lokalno, "rerun", None)
+        if rerun is None: return None
+        self.deo(None)
+        ukupno = time.perf_counter() - rerun.pop("pocetak"); self._lokalno.rerun = None
+        self.zabelezi("rerun: ukupno", ukupno)
+        rerun["ukupno_s"] = ukupno
+        with self._lock:
+            if self.prvi_rerun_s is None: self.prvi_rerun_s = ukupno
+            self.rerunovi.append(rerun)
+        if self.log_putanja:
+            with open(self.log_putanja, "a", encoding="utf-8") as f: f.write(json.dumps(rerun, ensure_ascii=False) + "\n")
+        return rerun
+
+    # --- Pregled i izvoz ---
+    def statistika(self):
+        with self._lock: stavke = [(ime, m.broj, m.ukupno_s, m.max_s, sorted(m.uzorci)) for ime, m in self._metrike.items()]
+        return [{"etapa": ime, "broj": broj, "ukupno_ms": 1000 * ukupno, "prosek_ms": 1000 * ukupno / broj,
+                 "p50_ms": 1000 * _kvantil(uzorci, 0.5), "p95_ms": 1000 * _kvantil(uzorci, 0.95), "max_ms": 1000 * maks}
+                for ime, broj, ukupno, maks, uzorci in sorted(stavke, key=lambda s: -s[2])]
+
+    def isprazni(self):
+        with self._lock: self._metrike.clear(); self.rerunovi.clear()
+
+    def json_linije(self):
+        with self._lock: return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in self.rerunovi)
+
+    def prometheus_tekst(self, prefiks="label"):
+        def oznaka(vrednost): return str(vrednost).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        linije = [f"# HELP {prefiks}_etapa_sekunde Trajanje faza proračuna i delova stranice.", f"# TYPE {prefiks}_etapa_sekunde summary"]
+        with self._lock: stavke = [(ime, m.broj, m.ukupno_s, sorted(m.uzorci)) for ime, m in self._metrike.items()]
+        for ime, broj, ukupno, uzorci in stavke:
+            for kvantil in (0.5, 0.9, 0.99): linije.append(f'{prefiks}_etapa_sekunde{{etapa="{oznaka(ime)}",quantile="{kvantil}"}} {_kvantil(uzorci, kvantil):.9f}')
+            linije.append(f'{prefiks}_etapa_sekunde_sum{{etapa="{oznaka(ime)}"}} {ukupno:.9f}'); linije.append(f'{prefiks}_etapa_sekunde_count{{etapa="{oznaka(ime)}"}} {broj}')
+        linije += [f"# TYPE {prefiks}_rerun_ukupno counter", f"{prefiks}_rerun_ukupno {self.broj_rerunova}",
+                   f"# TYPE {prefiks}_profil_ukljuceno gauge", f"{prefiks}_profil_ukljuceno {int(self.ukljuceno)}"]
+        if self.vreme_uvoza_s is not None: linije += [f"# TYPE {prefiks}_uvoz_sekunde gauge", f"{prefiks}_uvoz_sekunde {self.vreme_uvoza_s:.9f}"]
+        if self.prvi_rerun_s is not None: linije += [f"# TYPE {prefiks}_prvi_rerun_sekunde gauge", f"{prefiks}_prvi_rerun_sekunde {self.prvi_rerun_s:.9f}"]
+        return "\n".join(linije) + "\n"
+
+
+PROFIL = Profil(os.environ.get("LABEL_PROFIL") == "1", os.environ.get("LABEL_PROFIL_LOG"))
+etapa = PROFIL.etapa
+
+def meri(ime):
+    """Dekorator: meri svaki poziv funkcije kao etapu `ime` (kad je merenje isključeno, samo jedna provera)."""
+    def omotac(funkcija):
+        @functools.wraps(funkcija)
+        def izmerena(*args, **kwargs):
+            if not PROFIL.ukljuceno: return funkcija(*args, **kwargs)
+            with PROFIL._meri(ime): return funkcija(*args, **kwargs)
+        return izmerena
+    return omotac
+
+_IZVOZ = {}
+_IZVOZ_LOCK = threading.Lock()
+
+
+def pokreni_izvoz(port, host="127.0.0.1", profil=None):
+    """HTTP server u pozadinskoj niti: GET /metrics (Prometheus) i /metrics.json; jedan po portu u procesu."""
+    profil = profil or PROFIL
+
+    class _Obrada(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics": telo, tip = profil.prometheus_tekst(), "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path == "/metrics.json": telo, tip = json.dumps({"etape": profil.statistika(), "rerunovi": profil.broj_rerunova}, ensure_ascii=False), "application/json"
+            else: self.send_error(404); return
+            telo = telo.encode("utf-8")
+            self.send_response(200); self.send_header("Content-Type", tip); self.send_header("Content-Length", str(len(telo))); self.end_headers()
+            self.wfile.write(telo)
+
+        def log_message(self, *args): pass
+
+    with _IZVOZ_LOCK:
+        if port not in _IZVOZ:
+            server = ThreadingHTTPServer((host, port), _Obrada)
+            threading.Thread(target=server.serve_forever, name=f"merenje:{port}", daemon=True).start()
+            _IZVOZ[port] = server
+        return _IZVOZ[port]
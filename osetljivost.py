@@ -0,0 +1,63 @@
+"""Analiza osetljivosti: cena u zavisnosti od tiraža, broja boja, brzine mašine i materijala.
+
+Cela mreža kombinacija se računa jednim batch pozivom izracunaj_ponude.
+"""
+import numpy as np
+import pandas as pd
+from kalkulacija import izracunaj_ponude, podrazumevane_cene, KOEFICIJENT_ZARADE_DEFAULT
+
+PODRAZUMEVANI_TIRAZI = [10000, 25000, 50000, 100000, 250000, 500000, 1000000]
+
+
+def log_tirazi(tiraz_od, tiraz_do, broj_tacaka):
+    """Logaritamski raspoređeni tiraži (celi, bez duplikata) za glatke krive."""
+    return np.unique(np.round(np.geomspace(tiraz_od, tiraz_do, broj_tacaka)).astype(np.int64))
+
+def mreza_poslova(sirina_W, visina_H, tirazi, brojevi_boja, brzine, materijali, **ostalo):
+    """Dekartov proizvod tiraž × boje × brzina × materijal kao tabela poslova.
+
+    `ostalo` su zajedničke kolone (is_blanko, is_uv_lak, tip_alata, koeficijent_zarade...).
+    """
+    osi = np.meshgrid(np.arange(len(tirazi)), np.arange(len(brojevi_boja)), np.arange(len(brzine)), np.arange(len(materijali)), indexing="ij")
+    it, ib, iv, im = (osa.ravel() for osa in osi)
+    poslovi = pd.DataFrame({
+        "sirina_W": sirina_W, "visina_H": visina_H,
+        "tiraz": np.asarray(tirazi)[it], "broj_boja": np.asarray(brojevi_boja)[ib],
+        "brzina_masine_m_min": np.asarray(brzine)[iv], "materijal": np.asarray(materijali, dtype=object)[im],
+    })
+    for ime, vrednost in ostalo.items(): poslovi[ime] = vrednost
+    return poslovi
+
+def izracunaj_mrezu(sirina_W, visina_H, tirazi, brojevi_boja, brzine, materijali, cene=None, **ostalo):
+    return izracunaj_ponude(mreza_poslova(sirina_W, visina_H, tirazi, brojevi_boja, brzine, materijali, **ostalo), cene)
+
+def _linearni_model(poslovi, cene):
+    """Prodajna cena je linearna po tiražu (A + B·tiraž); A i B iz proračuna za tiraž 1 i 2."""
+    dva = pd.concat([poslovi.assign(tiraz=1), poslovi.assign(tiraz=2)], ignore_index=True)
+    cena = izracunaj_ponude(dva, cene)["ukupna_cena_prodajna_rsd"].to_numpy()
+    p1, p2 = cena[:len(poslovi)], cena[len(poslovi):]
+    B = p2 - p1
+    return p1 - B, B
+
+def prelomni_tiraz(sirina_W, visina_H, brojevi_boja, materijali, brzina_polurotacioni, brzina_rotacioni,
+                   cene=None, **ostalo):
+    """Tiraž od kog je rotacioni alat isplativiji od polurotacionog, za svaku kombinaciju boje × materijal.
+
+    Alati se razlikuju po ceni i po brzini mašine sa kojom rade. Ako rotacioni ne radi
+    brže, prelomna tačka ne postoji (NaN) i polurotacioni je uvek jeftiniji.
+    """
+    cene = cene or podrazumevane_cene()
+    ostalo.setdefault("koeficijent_zarade", KOEFICIJENT_ZARADE_DEFAULT)
+    polu = mreza_poslova(sirina_W, visina_H, [1], brojevi_boja, [brzina_polurotacioni], materijali, **ostalo).assign(tip_alata="Polurotacioni")
+    rot = mreza_poslova(sirina_W, visina_H, [1], brojevi_boja, [brzina_rotacioni], materijali, **ostalo).assign(tip_alata="Rotacioni")
+    A, B = _linearni_model(pd.concat([polu, rot], ignore_index=True), cene)
+    a_polu, a_rot = A[:len(polu)], A[len(polu):]; b_polu, b_rot = B[:len(polu)], B[len(polu):]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tiraz = (a_rot - a_polu) / (b_polu - b_rot)
+    tiraz = np.where((b_polu > b_rot) & (tiraz > 0), np.ceil(tiraz), np.nan)
+    return pd.DataFrame({
+        "broj_boja": polu["broj_boja"], "materijal": polu["materijal"],
+        "fiksno_polurotacioni_rsd": a_polu, "po_komadu_polurotacioni_rsd": b_polu,
+        "fiksno_rotacioni_rsd": a_rot, "po_komadu_rotacioni_rsd": b_rot,
+        "prelomni_tiraz": tiraz,
+    })
@@ -1,322 +1,478 @@
-import streamlit as st
-import math
-import pandas as pd
-import datetime # Za formatiranje vremena
-# Nema PDF/OS importa
-
-# --- Konstante ---
-PITCH = 3.175; GAP_MIN = 2.5; GAP_MAX = 4.0; Z_MIN = 70; Z_MAX = 140
-SIRINA_CILINDRA_UKUPNA = 200; SIRINA_RADNA = 190; RAZMAK_SIRINA = 5
-OTPAD_SIRINA = 10; MAX_SIRINA_MATERIJALA = 200
-DUZINA_SKART_OSNOVA = 50.0; DUZINA_SKART_PO_BOJI = 50.0
-VREME_PRIPREME_PO_BOJI_ILI_OSNOVA = 30; VREME_RASPREME_MIN = 30
-BRZINA_MASINE_DEFAULT = 30; BRZINA_MASINE_MIN = 10; BRZINA_MASINE_MAX = 120
-GRAMA_BOJE_PO_M2 = 3.0; GRAMA_LAKA_PO_M2 = 4.0
-CENA_BOJE_PO_KG_DEFAULT = 2350.0; CENA_LAKA_PO_KG_DEFAULT = 1800.0
-CENA_RADA_MASINE_PO_SATU_DEFAULT = 3000.0
-CENA_ALATA_POLUROTACIONI_DEFAULT = 6000.0
-CENA_ALATA_ROTACIONI_DEFAULT = 8000.0
-KOEFICIJENT_ZARADE_DEFAULT = 0.20
-# Nova konstanta za kliše
-CENA_KLISEA_PO_BOJI_DEFAULT = 2000.0
-
-# Podrazumevani materijali i cene (RSD/m²)
-DEFAULT_MATERIJALI_CENE = {
-    "Papir (hrom)": 39.95,
-    "Plastika (PPW)": 54.05,
-    "Termopapir": 49.35
-}
-
-# --- Inicijalizacija Session State ---
-if 'materijali_cene' not in st.session_state: st.session_state.materijali_cene = DEFAULT_MATERIJALI_CENE.copy()
-if 'cena_boje_po_kg' not in st.session_state: st.session_state.cena_boje_po_kg = CENA_BOJE_PO_KG_DEFAULT
-if 'cena_laka_po_kg' not in st.session_state: st.session_state.cena_laka_po_kg = CENA_LAKA_PO_KG_DEFAULT
-if 'cena_rada_masine_po_satu' not in st.session_state: st.session_state.cena_rada_masine_po_satu = CENA_RADA_MASINE_PO_SATU_DEFAULT
-if 'cena_alata_polurotacioni' not in st.session_state: st.session_state.cena_alata_polurotacioni = CENA_ALATA_POLUROTACIONI_DEFAULT
-if 'cena_alata_rotacioni' not in st.session_state: st.session_state.cena_alata_rotacioni = CENA_ALATA_ROTACIONI_DEFAULT
-if 'postojeci_alat_info' not in st.session_state: st.session_state.postojeci_alat_info = ""
-# Inicijalizacija za cenu klišea
-if 'cena_klisea_po_boji' not in st.session_state: st.session_state.cena_klisea_po_boji = CENA_KLISEA_PO_BOJI_DEFAULT
-
-
-# --- Funkcije Kalkulacija ---
-def pronadji_specifikacije_cilindra(sirina_sablona_W):
-    validna_resenja = []; message = ""
-    if sirina_sablona_W <= 0: return None, [], "Greška: Širina šablona mora biti > 0."
-    for z in range(Z_MIN, Z_MAX + 1):
-        obim_C = z * PITCH
-        if (sirina_sablona_W + GAP_MIN) <= 1e-9: continue
-        n_max_moguce = math.floor(obim_C / (sirina_sablona_W + GAP_MIN))
-        for n in range(1, n_max_moguce + 1):
-            if n == 0: continue
-            razmak_G_obim = (obim_C / n) - sirina_sablona_W
-            tolerancija = 1e-9
-            if (GAP_MIN - tolerancija) <= razmak_G_obim <= (GAP_MAX + tolerancija):
-                validna_resenja.append({"broj_zuba_Z": z, "obim_mm": obim_C, "broj_sablona_N_obim": n, "razmak_G_obim_mm": razmak_G_obim})
-    if not validna_resenja:
-        message = f"Nije pronađen cilindar ({Z_MIN}-{Z_MAX} zuba) za W={sirina_sablona_W:.3f}mm sa G={GAP_MIN:.1f}-{GAP_MAX:.1f}mm."
-        return None, [], message
-    validna_resenja.sort(key=lambda x: (x["broj_zuba_Z"], -x["broj_sablona_N_obim"]))
-    return validna_resenja[0], validna_resenja, "Proračun za obim OK."
-
-def izracunaj_broj_po_sirini(visina_sablona_H, sirina_radna, razmak_sirina):
-    if visina_sablona_H <= 0: return 0
-    if visina_sablona_H > sirina_radna: return 0
-    if visina_sablona_H <= sirina_radna and (visina_sablona_H * 2 + razmak_sirina) > sirina_radna: return 1
-    denominator = visina_sablona_H + razmak_sirina
-    if denominator <= 1e-9: return 0
-    return int(math.floor((sirina_radna + razmak_sirina) / denominator))
-
-def izracunaj_sirinu_materijala(broj_po_sirini_y, visina_sablona_H, razmak_sirina, otpad_sirina):
-    if broj_po_sirini_y <= 0: return 0
-    sirina_sablona_ukupno = broj_po_sirini_y * visina_sablona_H
-    sirina_razmaka_ukupno = max(0, broj_po_sirini_y - 1) * razmak_sirina
-    return sirina_sablona_ukupno + sirina_razmaka_ukupno + otpad_sirina
-
-def format_time(total_minutes):
-    if total_minutes < 0: return "N/A"
-    total_minutes = round(total_minutes)
-    if total_minutes == 0: return "0 min"
-    if total_minutes < 60: return f"{total_minutes} min"
-    hours, minutes = divmod(total_minutes, 60)
-    if minutes == 0: return f"{hours} h"
-    return f"{hours} h {minutes} min"
-
-# --- Streamlit Aplikacija ---
-st.set_page_config(page_title="Kalkulacija Štampe", layout="wide")
-st.title("📊 Kalkulator Troškova Štampe Etiketa")
-
-col_info1, col_info2 = st.columns(2)
-with col_info1: client_name = st.text_input("Ime Klijenta:")
-with col_info2: product_name = st.text_input("Naziv Proizvoda/Etikete:")
-st.markdown("---")
-st.markdown("Unesite parametre štampe i podesite cene/koeficijente u **sidebar-u levo**. Aplikacija računa sve potrebne vrednosti za kalkulaciju.")
-
-# --- Sidebar ---
-# Uklonjen izbor jezika
-st.sidebar.header("Parametri Unosa")
-sirina_W_input = st.sidebar.number_input("Širina šablona (po obimu, mm):", 0.1, value=76.0, step=0.1, format="%.3f")
-visina_H_input = st.sidebar.number_input("Visina šablona (po širini cil., mm):", 0.1, value=76.0, step=0.1, format="%.3f")
-tiraz_input = st.sidebar.number_input("Željeni Tiraž (komada):", 1, value=100000, step=1000, format="%d")
-
-st.sidebar.markdown("---"); st.sidebar.subheader("Podešavanje Boja, Laka i Klišea") # Promenjen naslov
-is_blanko = st.sidebar.checkbox("Blanko Šablon (bez boje)", value=False, help="Bez troška boje i klišea.")
-broj_boja_input = st.sidebar.number_input("Broj Boja:", 1, 8, value=1, step=1, format="%d", disabled=is_blanko)
-is_uv_lak_input = st.sidebar.checkbox("UV Lak", value=False, help=f"Dodaje trošak UV laka ({GRAMA_LAKA_PO_M2}g/m²).")
-trenutna_cena_boje = st.session_state.cena_boje_po_kg; cena_boje_kg_input = st.sidebar.number_input("Cena boje (RSD/kg):", 0.0, value=trenutna_cena_boje, step=10.0, format="%.2f", help=f"Def: {CENA_BOJE_PO_KG_DEFAULT:.2f}")
-if cena_boje_kg_input != trenutna_cena_boje: st.session_state.cena_boje_po_kg = cena_boje_kg_input
-trenutna_cena_laka = st.session_state.cena_laka_po_kg; cena_laka_kg_input = st.sidebar.number_input("Cena UV laka (RSD/kg):", 0.0, value=trenutna_cena_laka, step=10.0, format="%.2f", help=f"Def: {CENA_LAKA_PO_KG_DEFAULT:.2f}")
-if cena_laka_kg_input != trenutna_cena_laka: st.session_state.cena_laka_po_kg = cena_laka_kg_input
-# Novi unos za cenu klišea
-trenutna_cena_klisea = st.session_state.cena_klisea_po_boji
-cena_klisea_input = st.sidebar.number_input("Cena klišea po boji (RSD):", 0.0, value=trenutna_cena_klisea, step=50.0, format="%.2f", help=f"Jednokratni trošak po boji štampe. Def: {CENA_KLISEA_PO_BOJI_DEFAULT:.2f}")
-if cena_klisea_input != trenutna_cena_klisea: st.session_state.cena_klisea_po_boji = cena_klisea_input
-
-st.sidebar.markdown("---"); st.sidebar.subheader("Mašina")
-brzina_masine_m_min = st.sidebar.slider("Prosečna brzina mašine (m/min):", BRZINA_MASINE_MIN, BRZINA_MASINE_MAX, BRZINA_MASINE_DEFAULT, 5)
-trenutna_cena_rada = st.session_state.cena_rada_masine_po_satu; cena_rada_h_input = st.sidebar.number_input("Cena rada mašine (RSD/h):", 0.0, value=trenutna_cena_rada, step=50.0, format="%.2f", help=f"Def: {CENA_RADA_MASINE_PO_SATU_DEFAULT:.2f}")
-if cena_rada_h_input != trenutna_cena_rada: st.session_state.cena_rada_masine_po_satu = cena_rada_h_input
-
-st.sidebar.markdown("---"); st.sidebar.subheader("Alat za Isecanje")
-tip_alata_options_keys = ["Nijedan", "Polurotacioni", "Rotacioni"]; izabrani_alat_kljuc = st.sidebar.radio("Izaberite tip alata:", options=tip_alata_options_keys, index=0, key="tip_alata_radio")
-postojeci_alat_info = ""
-if izabrani_alat_kljuc == "Nijedan":
-    st.session_state.postojeci_alat_info = st.sidebar.text_input("Broj/Naziv postojećeg alata:", value=st.session_state.postojeci_alat_info, help="Unesite oznaku alata koji već imate.")
-    postojeci_alat_info = st.session_state.postojeci_alat_info
-trenutna_cena_polu = st.session_state.cena_alata_polurotacioni; cena_alata_polu_input = st.sidebar.number_input("Cena polurotacionog alata (RSD):", 0.0, value=trenutna_cena_polu, step=100.0, format="%.2f", help=f"Def: {CENA_ALATA_POLUROTACIONI_DEFAULT:.2f}")
-if cena_alata_polu_input != trenutna_cena_polu: st.session_state.cena_alata_polurotacioni = cena_alata_polu_input
-trenutna_cena_rot = st.session_state.cena_alata_rotacioni; cena_alata_rot_input = st.sidebar.number_input("Cena rotacionog alata (RSD):", 0.0, value=trenutna_cena_rot, step=100.0, format="%.2f", help=f"Def: {CENA_ALATA_ROTACIONI_DEFAULT:.2f}")
-if cena_alata_rot_input != trenutna_cena_rot: st.session_state.cena_alata_rotacioni = cena_alata_rot_input
-
-st.sidebar.markdown("---"); st.sidebar.subheader("Materijal")
-lista_materijala = list(st.session_state.materijali_cene.keys()); izabrani_materijal = st.sidebar.selectbox("Izaberite vrstu materijala:", options=lista_materijala, index=0)
-trenutna_cena_materijala = st.session_state.materijali_cene.get(izabrani_materijal, 0.0); material_price_label_formatted = f"Cena za '{izabrani_materijal}' (RSD/m²):"
-cena_po_m2_input = st.sidebar.number_input(material_price_label_formatted, 0.0, value=trenutna_cena_materijala, step=0.1, format="%.2f")
-if cena_po_m2_input != trenutna_cena_materijala: st.session_state.materijali_cene[izabrani_materijal] = cena_po_m2_input
-
-st.sidebar.markdown("---"); st.sidebar.subheader("Koeficijent Zarade")
-koeficijent_zarade_input = st.sidebar.slider("Koeficijent zarade (na cenu materijala):", 0.01, 2.00, KOEFICIJENT_ZARADE_DEFAULT, 0.01, format="%.2f", help=f"Def: {KOEFICIJENT_ZARADE_DEFAULT:.2f}")
-
-# --- Proračun i Prikaz Rezultata ---
-inputs_valid = sirina_W_input and visina_H_input and tiraz_input > 0 and brzina_masine_m_min and izabrani_materijal and cena_po_m2_input is not None and cena_rada_h_input is not None and izabrani_alat_kljuc is not None and koeficijent_zarade_input is not None
-
-if inputs_valid:
-
-    # 1. Obim; 2. Širina ('y')
-    best_solution_obim, all_solutions_obim, message_obim = pronadji_specifikacije_cilindra(sirina_W_input)
-    broj_po_sirini_y = izracunaj_broj_po_sirini(visina_H_input, SIRINA_RADNA, RAZMAK_SIRINA)
-
-    if best_solution_obim:
-        st.header("📊 Rezultati Kalkulacije")
-
-        # Vrednosti iz rešenja
-        broj_po_obimu_x = best_solution_obim['broj_sablona_N_obim']; razmak_G_obim_mm = best_solution_obim['razmak_G_obim_mm']
-        ukupno_sablona_po_ciklusu = broj_po_sirini_y * broj_po_obimu_x
-        valid_broj_boja_za_calc = 0 if is_blanko else (broj_boja_input if broj_boja_input is not None and broj_boja_input >= 1 else 1)
-
-        # 3. Širina Materijala
-        sirina_materijala_potrebna_mm = izracunaj_sirinu_materijala(broj_po_sirini_y, visina_H_input, RAZMAK_SIRINA, OTPAD_SIRINA)
-        prekoracena_sirina_materijala = sirina_materijala_potrebna_mm > MAX_SIRINA_MATERIJALA
-
-        # 4. Potrošnja Materijala za PROIZVODNJU
-        ukupna_duzina_proizvodnja_m = 0.0; ukupna_kvadratura_proizvodnja_m2 = 0.0; poruka_potrosnja_proizvodnja = ""
-        if broj_po_sirini_y > 0: duzina_segmenta_mm = sirina_W_input + razmak_G_obim_mm; ukupna_duzina_proizvodnja_m = (tiraz_input / broj_po_sirini_y) * duzina_segmenta_mm / 1000
-        if sirina_materijala_potrebna_mm > 0 and broj_po_sirini_y > 0: ukupna_kvadratura_proizvodnja_m2 = ukupna_duzina_proizvodnja_m * (sirina_materijala_potrebna_mm / 1000)
-        elif broj_po_sirini_y > 0 : poruka_potrosnja_proizvodnja = "Širina=0, kvadratura N/A."
-        else: poruka_potrosnja_proizvodnja = "y=0, potrošnja N/A."
-
-        # 5. Potrošnja Materijala za ŠKART
-        duzina_skart_m = 0.0; kvadratura_skart_m2 = 0.0; opis_skarta = ""; broj_boja_za_skart_vreme = 1 if is_blanko else valid_broj_boja_za_calc
-        if is_blanko: duzina_skart_m = DUZINA_SKART_OSNOVA; opis_skarta = f"Blanko ({DUZINA_SKART_OSNOVA}m)"
-        else: duzina_skart_m = DUZINA_SKART_OSNOVA + (valid_broj_boja_za_calc * DUZINA_SKART_PO_BOJI); opis_skarta = f"{valid_broj_boja_za_calc} boj{'a' if valid_broj_boja_za_calc==1 else 'e'} ({DUZINA_SKART_OSNOVA}+{valid_broj_boja_za_calc}×{DUZINA_SKART_PO_BOJI}m)"
-        if sirina_materijala_potrebna_mm > 0: kvadratura_skart_m2 = duzina_skart_m * (sirina_materijala_potrebna_mm / 1000)
-
-        # 6. UKUPNA Potrošnja Materijala
-        ukupna_duzina_final_m = ukupna_duzina_proizvodnja_m + duzina_skart_m
-        ukupna_kvadratura_final_m2 = ukupna_kvadratura_proizvodnja_m2 + kvadratura_skart_m2
-
-        # 7. Proračun Vremena
-        vreme_pripreme_min = broj_boja_za_skart_vreme * VREME_PRIPREME_PO_BOJI_ILI_OSNOVA
-        vreme_proizvodnje_min = (ukupna_duzina_proizvodnja_m / brzina_masine_m_min) if ukupna_duzina_proizvodnja_m > 0 and brzina_masine_m_min > 0 else 0.0
-        vreme_raspreme_min = VREME_RASPREME_MIN; ukupno_vreme_min = vreme_pripreme_min + vreme_proizvodnje_min + vreme_raspreme_min
-
-        # --- Proračuni Troškova ---
-        # 8. Cena Boje i Laka
-        cena_boje_rsd = 0.0; potrosnja_boje_kg = 0.0; cena_laka_rsd = 0.0; potrosnja_laka_kg = 0.0
-        if not is_blanko and valid_broj_boja_za_calc > 0 and ukupna_kvadratura_proizvodnja_m2 > 0: potrosnja_boje_g = ukupna_kvadratura_proizvodnja_m2 * valid_broj_boja_za_calc * GRAMA_BOJE_PO_M2; potrosnja_boje_kg = potrosnja_boje_g / 1000.0; cena_boje_rsd = potrosnja_boje_kg * st.session_state.cena_boje_po_kg
-        if is_uv_lak_input and ukupna_kvadratura_proizvodnja_m2 > 0: potrosnja_laka_g = ukupna_kvadratura_proizvodnja_m2 * GRAMA_LAKA_PO_M2; potrosnja_laka_kg = potrosnja_laka_g / 1000.0; cena_laka_rsd = potrosnja_laka_kg * st.session_state.cena_laka_po_kg
-        ukupna_cena_boja_lak_rsd = cena_boje_rsd + cena_laka_rsd
-
-        # 9. Cena Klišea
-        ukupna_cena_klisea_rsd = 0.0
-        if not is_blanko and valid_broj_boja_za_calc > 0:
-            ukupna_cena_klisea_rsd = valid_broj_boja_za_calc * st.session_state.cena_klisea_po_boji
-
-        # 10. Cena Materijala
-        ukupna_cena_materijala_rsd = 0.0
-        if ukupna_kvadratura_final_m2 > 0 and cena_po_m2_input >= 0: ukupna_cena_materijala_rsd = ukupna_kvadratura_final_m2 * cena_po_m2_input
-
-        # 11. Cena Rada Mašine
-        ukupna_cena_rada_masine_rsd = 0.0
-        if ukupno_vreme_min > 0 and st.session_state.cena_rada_masine_po_satu >= 0: ukupno_vreme_h = ukupno_vreme_min / 60.0; ukupna_cena_rada_masine_rsd = ukupno_vreme_h * st.session_state.cena_rada_masine_po_satu
-
-        # 12. Cena Alata
-        ukupna_cena_alata_rsd = 0.0; opis_alata_za_prikaz = "Nije izabran"
-        if izabrani_alat_kljuc == "Polurotacioni": ukupna_cena_alata_rsd = st.session_state.cena_alata_polurotacioni; opis_alata_za_prikaz = f"Polurotacioni ({st.session_state.cena_alata_polurotacioni:,.2f} RSD)"
-        elif izabrani_alat_kljuc == "Rotacioni": ukupna_cena_alata_rsd = st.session_state.cena_alata_rotacioni; opis_alata_za_prikaz = f"Rotacioni ({st.session_state.cena_alata_rotacioni:,.2f} RSD)"
-        elif izabrani_alat_kljuc == "Nijedan": opis_alata_za_prikaz = f"Postojeći: {postojeci_alat_info}" if postojeci_alat_info else "Nije izabran"
-        alat_info_string = f"Postojeći: {postojeci_alat_info}" if izabrani_alat_kljuc == "Nijedan" and postojeci_alat_info else izabrani_alat_kljuc # Koristi ključ
-
-        # 13. Ukupan Trošak Proizvodnje (Sada uključuje i kliše)
-        ukupni_trosak_proizvodnje_rsd = (
-            ukupna_cena_boja_lak_rsd +
-            ukupna_cena_klisea_rsd + # Dodat trošak klišea
-            ukupna_cena_materijala_rsd +
-            ukupna_cena_rada_masine_rsd +
-            ukupna_cena_alata_rsd
-        )
-
-        # 14. Proračun Zarade
-        zarada_rsd = 0.0
-        if ukupna_cena_materijala_rsd > 0 and koeficijent_zarade_input > 0: zarada_rsd = ukupna_cena_materijala_rsd * koeficijent_zarade_input
-
-        # 15. Finalna Prodajna Cena
-        ukupna_cena_prodajna_rsd = ukupni_trosak_proizvodnje_rsd + zarada_rsd
-        prodajna_cena_po_komadu_rsd = (ukupna_cena_prodajna_rsd / tiraz_input) if tiraz_input > 0 else 0.0
-
-
-        # --- Prikaz Rezultata ---
-        st.subheader(f"Proračun za: {product_name if product_name else '[Proizvod]'} | Klijent: {client_name if client_name else '[Klijent]'}")
-        st.markdown("---")
-
-        with st.expander("Detalji Proračuna (Konfiguracija, Potrošnja, Vreme)"):
-            params_dims = f"Š:{sirina_W_input:.2f}×V:{visina_H_input:.2f}mm"; params_qty = f"Tiraž:{tiraz_input:,}"
-            params_colors = 'Blanko' if is_blanko else str(valid_broj_boja_za_calc)+'B'; params_varnish = '+L' if is_uv_lak_input else ''
-            params_mat = f"Mat:'{izabrani_materijal}'"; params_tool = f"Alat:'{alat_info_string}'"; params_speed = f"Brz:{brzina_masine_m_min}m/min"; params_profit = f"Koef.Zar:{koeficijent_zarade_input:.2f}"
-            st.write(f"**Parametri:** {params_dims} | {params_qty} | {params_colors}{params_varnish} | {params_mat} | {params_tool} | {params_speed} | {params_profit}")
-            st.markdown("---")
-
-            st.subheader("1. Konfiguracija Cilindra i Šablona"); col1, col2 = st.columns(2);
-            with col1: st.metric("Broj Zuba (Z)", f"{best_solution_obim['broj_zuba_Z']}"); st.metric("Obim Cilindra", f"{best_solution_obim['obim_mm']:.3f} mm"); st.metric("Razmak Obim (G)", f"{razmak_G_obim_mm:.3f} mm", help=f"{GAP_MIN:.1f}-{GAP_MAX:.1f} mm")
-            with col2: st.metric("Šablona Obim (x)", f"{broj_po_obimu_x}"); st.metric("Šablona Širina (y)", f"{broj_po_sirini_y}", help=f"Na {SIRINA_RADNA}mm"); st.metric("Format (y × x)", f"{broj_po_sirini_y} × {broj_po_obimu_x}", help="/ciklus")
-
-            st.subheader("2. Proračun Širine Materijala");
-            if broj_po_sirini_y > 0:
-                mat_col1, mat_col2 = st.columns([2,1]); help_sirina = f"({broj_po_sirini_y}×{visina_H_input:.2f}mm)+({max(0, broj_po_sirini_y-1)}×{RAZMAK_SIRINA}mm)+{OTPAD_SIRINA}mm";
-                with mat_col1: st.metric("Potrebna Širina Materijala", f"{sirina_materijala_potrebna_mm:.2f} mm", help=help_sirina)
-                with mat_col2:
-                    if not prekoracena_sirina_materijala: st.success(f"✅ OK (≤ {MAX_SIRINA_MATERIJALA} mm)")
-                    else: st.error(f"⚠️ PREKORAČENO! >{MAX_SIRINA_MATERIJALA} mm")
-            else: st.warning("y=0, širina materijala N/A.")
-
-            st.subheader(f"3. Potrošnja Materijala za PROIZVODNJU ({tiraz_input:,} kom)");
-            if broj_po_sirini_y > 0:
-                pro_col1, pro_col2 = st.columns(2)
-                with pro_col1: st.metric("Dužina (Proizvodnja)", f"{ukupna_duzina_proizvodnja_m:,.2f} m")
-                with pro_col2: st.metric("Kvadratura (Proizvodnja)", f"{ukupna_kvadratura_proizvodnja_m2:,.2f} m²")
-                if poruka_potrosnja_proizvodnja and "N/A" not in poruka_potrosnja_proizvodnja: st.warning(poruka_potrosnja_proizvodnja)
-            else: st.warning(poruka_potrosnja_proizvodnja)
-
-            st.subheader(f"4. Potrošnja Materijala za ŠKART (Štelovanje)");
-            ska_col1, ska_col2 = st.columns(2);
-            with ska_col1: st.metric("Dužina (Škart)", f"{duzina_skart_m:,.2f} m", help=opis_skarta)
-            with ska_col2:
-                if sirina_materijala_potrebna_mm > 0: help_kvadratura_skart = f"= {duzina_skart_m:,.2f}m*({sirina_materijala_potrebna_mm:.2f}mm/1000)"; st.metric("Kvadratura (Škart)", f"{kvadratura_skart_m2:,.2f} m²", help=help_kvadratura_skart)
-                else: st.info("Kvadratura Škarta N/A (širina=0)")
-
-            st.subheader(f"5. UKUPNA Predviđena Potrošnja Materijala");
-            tot_col1, tot_col2 = st.columns(2);
-            with tot_col1: st.metric("UKUPNA Dužina", f"{ukupna_duzina_final_m:,.2f} m", help="Proizvodnja + Škart")
-            with tot_col2: st.metric("UKUPNA Kvadratura", f"{ukupna_kvadratura_final_m2:,.2f} m²", help="Proizvodnja + Škart")
-
-            st.subheader("6. Procena Vremena Izrade"); time_col1, time_col2, time_col3, time_col4 = st.columns(4);
-            with time_col1: st.metric("Vreme Pripreme", format_time(vreme_pripreme_min), help=f"{broj_boja_za_skart_vreme} × {VREME_PRIPREME_PO_BOJI_ILI_OSNOVA}min")
-            with time_col2: st.metric("Vreme Proizvodnje", format_time(vreme_proizvodnje_min), help=f"{ukupna_duzina_proizvodnja_m:,.1f}m / {brzina_masine_m_min}m/min")
-            with time_col3: st.metric("Vreme Raspreme", format_time(vreme_raspreme_min), help="Fiksno")
-            with time_col4: st.metric("UKUPNO Vreme Rada", format_time(ukupno_vreme_min), help="Σ Priprema+Proizvodnja+Rasprema")
-
-            if len(all_solutions_obim) > 1:
-                st.subheader("Ostala moguća rešenja za Obim Cilindra")
-                st.caption("(Sortirano po Z ↑, zatim po x ↓)")
-                other_solutions_data = [sol for sol in all_solutions_obim if sol != best_solution_obim];
-                if other_solutions_data: df_others = pd.DataFrame(other_solutions_data); df_others = df_others.rename(columns={"broj_zuba_Z": "Z", "obim_mm": "Obim", "broj_sablona_N_obim": "x", "razmak_G_obim_mm": "G Obim"}); df_others['Obim'] = df_others['Obim'].map('{:.3f}'.format); df_others['G Obim'] = df_others['G Obim'].map('{:.3f}'.format); st.dataframe(df_others, use_container_width=True)
-
-        st.markdown("---")
-
-        # Kalkulacija Troškova - podeljeno u redove radi preglednosti
-        st.subheader("📊 Kalkulacija Troškova")
-        cost_row1_cols = st.columns(4)
-        with cost_row1_cols[0]: st.metric("Trošak: Boja + Lak", f"{ukupna_cena_boja_lak_rsd:,.2f} RSD", help=f"Boja:{cena_boje_rsd:,.2f}, Lak:{cena_laka_rsd:,.2f}")
-        with cost_row1_cols[1]: st.metric("Trošak: Kliše", f"{ukupna_cena_klisea_rsd:,.2f} RSD", help=f"{valid_broj_boja_za_calc} × {st.session_state.cena_klisea_po_boji:.2f} RSD/boji")
-        with cost_row1_cols[2]: st.metric("Trošak: Materijal", f"{ukupna_cena_materijala_rsd:,.2f} RSD", help=f"{ukupna_kvadratura_final_m2:,.2f}m²×{cena_po_m2_input:.2f}RSD/m²")
-        with cost_row1_cols[3]: st.metric("Trošak: Alat", f"{ukupna_cena_alata_rsd:,.2f} RSD", help=opis_alata_za_prikaz)
-
-        cost_row2_cols = st.columns(4) # Drugi red za rad mašine da stane help tekst
-        with cost_row2_cols[0]:
-            ukupno_vreme_h_za_help = ukupno_vreme_min / 60.0
-            st.metric("Trošak: Rad Mašine", f"{ukupna_cena_rada_masine_rsd:,.2f} RSD", help=f"{format_time(ukupno_vreme_min)}({ukupno_vreme_h_za_help:.2f}h)×{st.session_state.cena_rada_masine_po_satu:.2f}RSD/h")
-        # Ostatak kolona u drugom redu može biti prazan ili za druge stvari
-
-        st.subheader("💰 Zarada i Finalna Prodajna Cena")
-        final_col1, final_col2, final_col3 = st.columns(3)
-        # Ažuriran help za ukupan trošak
-        with final_col1: st.metric("Ukupan Trošak Proizvodnje", f"{ukupni_trosak_proizvodnje_rsd:,.2f} RSD", help="Σ (Boja/Lak + Kliše + Materijal + Rad + Alat)")
-        with final_col2: st.metric("Zarada", f"{zarada_rsd:,.2f} RSD", help=f"({koeficijent_zarade_input:.2f} × Cena Materijala)", delta=f"{koeficijent_zarade_input*100:.0f}%")
-        with final_col3: st.metric("UKUPNA CENA (Prodajna)", f"{ukupna_cena_prodajna_rsd:,.2f} RSD", delta=f"{zarada_rsd:,.2f} RSD", help="Trošak Proizvodnje + Zarada")
-
-        st.metric("Prodajna Cena po Komadu", f"{prodajna_cena_po_komadu_rsd:.4f} RSD", help=f"= {ukupna_cena_prodajna_rsd:,.2f} RSD / {tiraz_input:,} kom")
-
-        # --- PDF Download Dugme (Uklonjeno) ---
-
-    else: # Ako nije nađeno rešenje za obim
-        error_msg = f"Nije pronađen cilindar ({Z_MIN}-{Z_MAX} zuba) za W={sirina_W_input:.3f}mm sa G={GAP_MIN:.1f}-{GAP_MAX:.1f}mm." if message_obim and 'Nije pronađen cilindar' in message_obim else f"Greška u proračunu: {message_obim}"
-        if "Greška" in message_obim: st.error(f"❌ {error_msg}")
-        else: st.warning(f"⚠️ {error_msg}")
-
-else: # Ako nisu uneti svi potrebni podaci
-    st.info("Unesite sve parametre u panelu sa leve strane (minimalno Širina, Visina i Tiraž > 0).")
-
-# ISPRAVKA INDENTACIJE
-st.markdown("---")
-settings_str = f"MaxMat={MAX_SIRINA_MATERIJALA}mm | CenaRada={st.session_state.cena_rada_masine_po_satu:.2f}RSD/h | Alati: Polu={st.session_state.cena_alata_polurotacioni:.2f}, Rot={st.session_state.cena_alata_rotacioni:.2f} | Kliše={st.session_state.cena_klisea_po_boji:.2f}RSD/boji"
-st.caption(settings_str)
+from merenje import PROFIL, meri, pokreni_izvoz # Prvi uvoz: meri se vreme uvoza ostalih modula
+import os
+import uuid
+import streamlit as st
+import pandas as pd
+import numpy as np
+import datetime # Za formatiranje vremena
+# Nema PDF/OS importa
+
+from kalkulacija import (
+    GAP_MIN, GAP_MAX, Z_MIN, Z_MAX, SIRINA_RADNA, RAZMAK_SIRINA, OTPAD_SIRINA, MAX_SIRINA_MATERIJALA,
+    DUZINA_SKART_OSNOVA, DUZINA_SKART_PO_BOJI, VREME_PRIPREME_PO_BOJI_ILI_OSNOVA,
+    BRZINA_MASINE_DEFAULT, BRZINA_MASINE_MIN, BRZINA_MASINE_MAX, GRAMA_LAKA_PO_M2,
+    CENA_BOJE_PO_KG_DEFAULT, CENA_LAKA_PO_KG_DEFAULT, CENA_RADA_MASINE_PO_SATU_DEFAULT,
+    CENA_ALATA_POLUROTACIONI_DEFAULT, CENA_ALATA_ROTACIONI_DEFAULT, KOEFICIJENT_ZARADE_DEFAULT,
+    CENA_KLISEA_PO_BOJI_DEFAULT, DEFAULT_MATERIJALI_CENE, TIPOVI_ALATA,
+    pronadji_specifikacije_cilindra_kes, izracunaj_ponudu, format_time,
+)
+from kes import napravi_kes, statistika_keseva
+from gang_run import planiraj_gang_run
+from raspored import KRITERIJUMI, najbolji_rasporedi
+from osetljivost import PODRAZUMEVANI_TIRAZI, log_tirazi, izracunaj_mrezu, prelomni_tiraz
+from skladiste import otvori_skladiste, kljucevi_alata
+from masine import KRITERIJUMI_PREPORUKE, ucitaj_flotu_kes, uporedi_masine
+from rizik import PODRAZUMEVANE_RASPODELE, simuliraj_ponudu
+
+# --- Merenje (podrazumevano isključeno; ?debug=1 otvara panel) ---
+PROFIL.zabelezi_uvoz()
+if os.environ.get("LABEL_METRIKE_PORT"): pokreni_izvoz(int(os.environ["LABEL_METRIKE_PORT"]))
+if 'id_sesije' not in st.session_state: st.session_state.id_sesije = uuid.uuid4().hex[:8]
+st.session_state.broj_rerunova_sesije = st.session_state.get('broj_rerunova_sesije', 0) + 1
+PROFIL.pocni_rerun(st.session_state.id_sesije)
+PROFIL.deo("inicijalizacija i baza")
+
+# --- Inicijalizacija Session State ---
+baza = otvori_skladiste()
+if 'sacuvane_cene' not in st.session_state: # Cene iz baze (jednom po sesiji); nesačuvane ostaju podrazumevane
+    st.session_state.sacuvane_cene = baza.ucitaj_cene()
+    for kljuc, vrednost in st.session_state.sacuvane_cene.items(): st.session_state[kljuc] = dict(vrednost) if isinstance(vrednost, dict) else vrednost
+if 'materijali_cene' not in st.session_state: st.session_state.materijali_cene = DEFAULT_MATERIJALI_CENE.copy()
+if 'cena_boje_po_kg' not in st.session_state: st.session_state.cena_boje_po_kg = CENA_BOJE_PO_KG_DEFAULT
+if 'cena_laka_po_kg' not in st.session_state: st.session_state.cena_laka_po_kg = CENA_LAKA_PO_KG_DEFAULT
+if 'cena_rada_masine_po_satu' not in st.session_state: st.session_state.cena_rada_masine_po_satu = CENA_RADA_MASINE_PO_SATU_DEFAULT
+if 'cena_alata_polurotacioni' not in st.session_state: st.session_state.cena_alata_polurotacioni = CENA_ALATA_POLUROTACIONI_DEFAULT
+if 'cena_alata_rotacioni' not in st.session_state: st.session_state.cena_alata_rotacioni = CENA_ALATA_ROTACIONI_DEFAULT
+if 'postojeci_alat_info' not in st.session_state: st.session_state.postojeci_alat_info = ""
+# Inicijalizacija za cenu klišea
+if 'cena_klisea_po_boji' not in st.session_state: st.session_state.cena_klisea_po_boji = CENA_KLISEA_PO_BOJI_DEFAULT
+
+
+def trenutne_cene():
+    return {k: st.session_state[k] for k in ["materijali_cene", "cena_boje_po_kg", "cena_laka_po_kg", "cena_rada_masine_po_satu", "cena_alata_polurotacioni", "cena_alata_rotacioni", "cena_klisea_po_boji"]}
+
+@meri("tabela ostalih rešenja: DataFrame")
+def _napravi_tabelu_ostalih_resenja(sirina_W):
+    best_solution, all_solutions, _ = pronadji_specifikacije_cilindra_kes(sirina_W)
+    other_solutions_data = [sol for sol in all_solutions if sol != best_solution]
+    if not other_solutions_data: return None
+    df_others = pd.DataFrame(other_solutions_data); df_others = df_others.rename(columns={"broj_zuba_Z": "Z", "obim_mm": "Obim", "broj_sablona_N_obim": "x", "razmak_G_obim_mm": "G Obim"}); df_others['Obim'] = df_others['Obim'].map('{:.3f}'.format); df_others['G Obim'] = df_others['G Obim'].map('{:.3f}'.format)
+    return df_others
+
+def tabela_ostalih_resenja(sirina_W):
+    # Keš je na nivou procesa (deljen između sesija); tabela se ne menja posle pravljenja
+    return napravi_kes("tabela_ostalih_resenja", 256).dohvati_ili_izracunaj(float(sirina_W), lambda: _napravi_tabelu_ostalih_resenja(sirina_W))
+
+PROFIL.deo("zaglavlje")
+# --- Streamlit Aplikacija ---
+st.set_page_config(page_title="Kalkulacija Štampe", layout="wide")
+st.title("📊 Kalkulator Troškova Štampe Etiketa")
+
+col_info1, col_info2 = st.columns(2)
+with col_info1: client_name = st.text_input("Ime Klijenta:")
+with col_info2: product_name = st.text_input("Naziv Proizvoda/Etikete:")
+st.markdown("---")
+st.markdown("Unesite parametre štampe i podesite cene/koeficijente u **sidebar-u levo**. Aplikacija računa sve potrebne vrednosti za kalkulaciju.")
+
+PROFIL.deo("sidebar")
+# --- Sidebar ---
+# Uklonjen izbor jezika
+st.sidebar.header("Parametri Unosa")
+sirina_W_input = st.sidebar.number_input("Širina šablona (po obimu, mm):", 0.1, value=76.0, step=0.1, format="%.3f")
+visina_H_input = st.sidebar.number_input("Visina šablona (po širini cil., mm):", 0.1, value=76.0, step=0.1, format="%.3f")
+tiraz_input = st.sidebar.number_input("Željeni Tiraž (komada):", 1, value=100000, step=1000, format="%d")
+
+st.sidebar.markdown("---"); st.sidebar.subheader("Podešavanje Boja, Laka i Klišea") # Promenjen naslov
+is_blanko = st.sidebar.checkbox("Blanko Šablon (bez boje)", value=False, help="Bez troška boje i klišea.")
+broj_boja_input = st.sidebar.number_input("Broj Boja:", 1, 8, value=1, step=1, format="%d", disabled=is_blanko)
+is_uv_lak_input = st.sidebar.checkbox("UV Lak", value=False, help=f"Dodaje trošak UV laka ({GRAMA_LAKA_PO_M2}g/m²).")
+trenutna_cena_boje = st.session_state.cena_boje_po_kg; cena_boje_kg_input = st.sidebar.number_input("Cena boje (RSD/kg):", 0.0, value=trenutna_cena_boje, step=10.0, format="%.2f", help=f"Def: {CENA_BOJE_PO_KG_DEFAULT:.2f}")
+if cena_boje_kg_input != trenutna_cena_boje: st.session_state.cena_boje_po_kg = cena_boje_kg_input
+trenutna_cena_laka = st.session_state.cena_laka_po_kg; cena_laka_kg_input = st.sidebar.number_input("Cena UV laka (RSD/kg):", 0.0, value=trenutna_cena_laka, step=10.0, format="%.2f", help=f"Def: {CENA_LAKA_PO_KG_DEFAULT:.2f}")
+if cena_laka_kg_input != trenutna_cena_laka: st.session_state.cena_laka_po_kg = cena_laka_kg_input
+# Novi unos za cenu klišea
+trenutna_cena_klisea = st.session_state.cena_klisea_po_boji
+cena_klisea_input = st.sidebar.number_input("Cena klišea po boji (RSD):", 0.0, value=trenutna_cena_klisea, step=50.0, format="%.2f", help=f"Jednokratni trošak po boji štampe. Def: {CENA_KLISEA_PO_BOJI_DEFAULT:.2f}")
+if cena_klisea_input != trenutna_cena_klisea: st.session_state.cena_klisea_po_boji = cena_klisea_input
+
+st.sidebar.markdown("---"); st.sidebar.subheader("Mašina")
+brzina_masine_m_min = st.sidebar.slider("Prosečna brzina mašine (m/min):", BRZINA_MASINE_MIN, BRZINA_MASINE_MAX, BRZINA_MASINE_DEFAULT, 5)
+trenutna_cena_rada = st.session_state.cena_rada_masine_po_satu; cena_rada_h_input = st.sidebar.number_input("Cena rada mašine (RSD/h):", 0.0, value=trenutna_cena_rada, step=50.0, format="%.2f", help=f"Def: {CENA_RADA_MASINE_PO_SATU_DEFAULT:.2f}")
+if cena_rada_h_input != trenutna_cena_rada: st.session_state.cena_rada_masine_po_satu = cena_rada_h_input
+
+st.sidebar.markdown("---"); st.sidebar.subheader("Alat za Isecanje")
+tip_alata_options_keys = TIPOVI_ALATA; izabrani_alat_kljuc = st.sidebar.radio("Izaberite tip alata:", options=tip_alata_options_keys, index=0, key="tip_alata_radio")
+postojeci_alat_info = ""
+if izabrani_alat_kljuc == "Nijedan":
+    st.session_state.postojeci_alat_info = st.sidebar.text_input("Broj/Naziv postojećeg alata:", value=st.session_state.postojeci_alat_info, help="Unesite oznaku alata koji već imate.")
+    postojeci_alat_info = st.session_state.postojeci_alat_info
+alati_za_format = baza.pronadji_alate(sirina_W_input, visina_H_input)
+if not alati_za_format.empty: st.sidebar.caption(f"🗂️ U inventaru za ovaj format: {', '.join(alati_za_format['oznaka'])}")
+trenutna_cena_polu = st.session_state.cena_alata_polurotacioni; cena_alata_polu_input = st.sidebar.number_input("Cena polurotacionog alata (RSD):", 0.0, value=trenutna_cena_polu, step=100.0, format="%.2f", help=f"Def: {CENA_ALATA_POLUROTACIONI_DEFAULT:.2f}")
+if cena_alata_polu_input != trenutna_cena_polu: st.session_state.cena_alata_polurotacioni = cena_alata_polu_input
+trenutna_cena_rot = st.session_state.cena_alata_rotacioni; cena_alata_rot_input = st.sidebar.number_input("Cena rotacionog alata (RSD):", 0.0, value=trenutna_cena_rot, step=100.0, format="%.2f", help=f"Def: {CENA_ALATA_ROTACIONI_DEFAULT:.2f}")
+if cena_alata_rot_input != trenutna_cena_rot: st.session_state.cena_alata_rotacioni = cena_alata_rot_input
+
+st.sidebar.markdown("---"); st.sidebar.subheader("Materijal")
+lista_materijala = list(st.session_state.materijali_cene.keys()); izabrani_materijal = st.sidebar.selectbox("Izaberite vrstu materijala:", options=lista_materijala, index=0)
+trenutna_cena_materijala = st.session_state.materijali_cene.get(izabrani_materijal, 0.0); material_price_label_formatted = f"Cena za '{izabrani_materijal}' (RSD/m²):"
+cena_po_m2_input = st.sidebar.number_input(material_price_label_formatted, 0.0, value=trenutna_cena_materijala, step=0.1, format="%.2f")
+if cena_po_m2_input != trenutna_cena_materijala: st.session_state.materijali_cene[izabrani_materijal] = cena_po_m2_input
+
+st.sidebar.markdown("---"); st.sidebar.subheader("Koeficijent Zarade")
+koeficijent_zarade_input = st.sidebar.slider("Koeficijent zarade (na cenu materijala):", 0.01, 2.00, KOEFICIJENT_ZARADE_DEFAULT, 0.01, format="%.2f", help=f"Def: {KOEFICIJENT_ZARADE_DEFAULT:.2f}")
+
+# --- Proračun i Prikaz Rezultata ---
+inputs_valid = sirina_W_input and visina_H_input and tiraz_input > 0 and brzina_masine_m_min and izabrani_materijal and cena_po_m2_input is not None and cena_rada_h_input is not None and izabrani_alat_kljuc is not None and koeficijent_zarade_input is not None
+
+if inputs_valid:
+
+    PROFIL.deo("1. obim (sva rešenja)")
+    # 1. Obim (sva rešenja za tabelu alternativa)
+    best_solution_obim, all_solutions_obim, message_obim = pronadji_specifikacije_cilindra_kes(sirina_W_input)
+
+    if best_solution_obim:
+        st.header("📊 Rezultati Kalkulacije")
+
+        PROFIL.deo("1-15 proračun ponude")
+        # 1-15. Kompletan proračun (kalkulacija.py)
+        rez = izracunaj_ponudu(sirina_W_input, visina_H_input, tiraz_input, broj_boja_input, is_blanko, is_uv_lak_input, cena_po_m2_input,
+                               izabrani_alat_kljuc, brzina_masine_m_min, koeficijent_zarade_input, cene=trenutne_cene())
+        broj_po_obimu_x = rez['broj_po_obimu_x']; razmak_G_obim_mm = rez['razmak_G_obim_mm']; broj_po_sirini_y = rez['broj_po_sirini_y']
+        valid_broj_boja_za_calc = rez['broj_boja']
+        sirina_materijala_potrebna_mm = rez['sirina_materijala_potrebna_mm']; prekoracena_sirina_materijala = rez['prekoracena_sirina_materijala']
+        ukupna_duzina_proizvodnja_m = rez['ukupna_duzina_proizvodnja_m']; ukupna_kvadratura_proizvodnja_m2 = rez['ukupna_kvadratura_proizvodnja_m2']
+        duzina_skart_m = rez['duzina_skart_m']; kvadratura_skart_m2 = rez['kvadratura_skart_m2']; broj_boja_za_skart_vreme = rez['broj_boja_za_skart_vreme']
+        ukupna_duzina_final_m = rez['ukupna_duzina_final_m']; ukupna_kvadratura_final_m2 = rez['ukupna_kvadratura_final_m2']
+        vreme_pripreme_min = rez['vreme_pripreme_min']; vreme_proizvodnje_min = rez['vreme_proizvodnje_min']; vreme_raspreme_min = rez['vreme_raspreme_min']; ukupno_vreme_min = rez['ukupno_vreme_min']
+        cena_boje_rsd = rez['cena_boje_rsd']; cena_laka_rsd = rez['cena_laka_rsd']; ukupna_cena_boja_lak_rsd = rez['ukupna_cena_boja_lak_rsd']
+        ukupna_cena_klisea_rsd = rez['ukupna_cena_klisea_rsd']; ukupna_cena_materijala_rsd = rez['ukupna_cena_materijala_rsd']
+        ukupna_cena_rada_masine_rsd = rez['ukupna_cena_rada_masine_rsd']; ukupna_cena_alata_rsd = rez['ukupna_cena_alata_rsd']
+        ukupni_trosak_proizvodnje_rsd = rez['ukupni_trosak_proizvodnje_rsd']; zarada_rsd = rez['zarada_rsd']
+        ukupna_cena_prodajna_rsd = rez['ukupna_cena_prodajna_rsd']; prodajna_cena_po_komadu_rsd = rez['prodajna_cena_po_komadu_rsd']
+
+        PROFIL.deo("upis ponude u istoriju")
+        # Istorija: svaka različita ponuda se upisuje jednom (rerun sa istim ulazom ne pravi duplikat)
+        ulaz_ponude = {"sirina_W": sirina_W_input, "visina_H": visina_H_input, "tiraz": tiraz_input, "broj_boja": broj_boja_input, "is_blanko": is_blanko, "is_uv_lak": is_uv_lak_input,
+                       "materijal": izabrani_materijal, "cena_po_m2": cena_po_m2_input, "tip_alata": izabrani_alat_kljuc, "brzina_masine_m_min": brzina_masine_m_min,
+                       "koeficijent_zarade": koeficijent_zarade_input, "postojeci_alat_info": postojeci_alat_info}
+        kljuc_ponude = (client_name, product_name, ukupni_trosak_proizvodnje_rsd, ukupna_cena_prodajna_rsd, *ulaz_ponude.values())
+        if st.session_state.get("poslednja_sacuvana_ponuda") != kljuc_ponude:
+            baza.zapisi_ponudu(ulaz_ponude, rez, klijent=client_name, proizvod=product_name); st.session_state.poslednja_sacuvana_ponuda = kljuc_ponude
+
+        # Opisi za prikaz
+        poruka_potrosnja_proizvodnja = "" if broj_po_sirini_y > 0 else "y=0, potrošnja N/A."
+        if is_blanko: opis_skarta = f"Blanko ({DUZINA_SKART_OSNOVA}m)"
+        else: opis_skarta = f"{valid_broj_boja_za_calc} boj{'a' if valid_broj_boja_za_calc==1 else 'e'} ({DUZINA_SKART_OSNOVA}+{valid_broj_boja_za_calc}×{DUZINA_SKART_PO_BOJI}m)"
+        opis_alata_za_prikaz = "Nije izabran"
+        if izabrani_alat_kljuc == "Polurotacioni": opis_alata_za_prikaz = f"Polurotacioni ({st.session_state.cena_alata_polurotacioni:,.2f} RSD)"
+        elif izabrani_alat_kljuc == "Rotacioni": opis_alata_za_prikaz = f"Rotacioni ({st.session_state.cena_alata_rotacioni:,.2f} RSD)"
+        elif izabrani_alat_kljuc == "Nijedan": opis_alata_za_prikaz = f"Postojeći: {postojeci_alat_info}" if postojeci_alat_info else "Nije izabran"
+        alat_info_string = f"Postojeći: {postojeci_alat_info}" if izabrani_alat_kljuc == "Nijedan" and postojeci_alat_info else izabrani_alat_kljuc # Koristi ključ
+
+
+        PROFIL.deo("detalji proračuna (metrike 1-6)")
+        # --- Prikaz Rezultata ---
+        st.subheader(f"Proračun za: {product_name if product_name else '[Proizvod]'} | Klijent: {client_name if client_name else '[Klijent]'}")
+        st.markdown("---")
+
+        with st.expander("Detalji Proračuna (Konfiguracija, Potrošnja, Vreme)"):
+            params_dims = f"Š:{sirina_W_input:.2f}×V:{visina_H_input:.2f}mm"; params_qty = f"Tiraž:{tiraz_input:,}"
+            params_colors = 'Blanko' if is_blanko else str(valid_broj_boja_za_calc)+'B'; params_varnish = '+L' if is_uv_lak_input else ''
+            params_mat = f"Mat:'{izabrani_materijal}'"; params_tool = f"Alat:'{alat_info_string}'"; params_speed = f"Brz:{brzina_masine_m_min}m/min"; params_profit = f"Koef.Zar:{koeficijent_zarade_input:.2f}"
+            st.write(f"**Parametri:** {params_dims} | {params_qty} | {params_colors}{params_varnish} | {params_mat} | {params_tool} | {params_speed} | {params_profit}")
+            st.markdown("---")
+
+            st.subheader("1. Konfiguracija Cilindra i Šablona"); col1, col2 = st.columns(2);
+            with col1: st.metric("Broj Zuba (Z)", f"{best_solution_obim['broj_zuba_Z']}"); st.metric("Obim Cilindra", f"{best_solution_obim['obim_mm']:.3f} mm"); st.metric("Razmak Obim (G)", f"{razmak_G_obim_mm:.3f} mm", help=f"{GAP_MIN:.1f}-{GAP_MAX:.1f} mm")
+            with col2: st.metric("Šablona Obim (x)", f"{broj_po_obimu_x}"); st.metric("Šablona Širina (y)", f"{broj_po_sirini_y}", help=f"Na {SIRINA_RADNA}mm"); st.metric("Format (y × x)", f"{broj_po_sirini_y} × {broj_po_obimu_x}", help="/ciklus")
+
+            st.subheader("2. Proračun Širine Materijala");
+            if broj_po_sirini_y > 0:
+                mat_col1, mat_col2 = st.columns([2,1]); help_sirina = f"({broj_po_sirini_y}×{visina_H_input:.2f}mm)+({max(0, broj_po_sirini_y-1)}×{RAZMAK_SIRINA}mm)+{OTPAD_SIRINA}mm";
+                with mat_col1: st.metric("Potrebna Širina Materijala", f"{sirina_materijala_potrebna_mm:.2f} mm", help=help_sirina)
+                with mat_col2:
+                    if not prekoracena_sirina_materijala: st.success(f"✅ OK (≤ {MAX_SIRINA_MATERIJALA} mm)")
+                    else: st.error(f"⚠️ PREKORAČENO! >{MAX_SIRINA_MATERIJALA} mm")
+            else: st.warning("y=0, širina materijala N/A.")
+
+            st.subheader(f"3. Potrošnja Materijala za PROIZVODNJU ({tiraz_input:,} kom)");
+            if broj_po_sirini_y > 0:
+                pro_col1, pro_col2 = st.columns(2)
+                with pro_col1: st.metric("Dužina (Proizvodnja)", f"{ukupna_duzina_proizvodnja_m:,.2f} m")
+                with pro_col2: st.metric("Kvadratura (Proizvodnja)", f"{ukupna_kvadratura_proizvodnja_m2:,.2f} m²")
+                if poruka_potrosnja_proizvodnja and "N/A" not in poruka_potrosnja_proizvodnja: st.warning(poruka_potrosnja_proizvodnja)
+            else: st.warning(poruka_potrosnja_proizvodnja)
+
+            st.subheader(f"4. Potrošnja Materijala za ŠKART (Štelovanje)");
+            ska_col1, ska_col2 = st.columns(2);
+            with ska_col1: st.metric("Dužina (Škart)", f"{duzina_skart_m:,.2f} m", help=opis_skarta)
+            with ska_col2:
+                if sirina_materijala_potrebna_mm > 0: help_kvadratura_skart = f"= {duzina_skart_m:,.2f}m*({sirina_materijala_potrebna_mm:.2f}mm/1000)"; st.metric("Kvadratura (Škart)", f"{kvadratura_skart_m2:,.2f} m²", help=help_kvadratura_skart)
+                else: st.info("Kvadratura Škarta N/A (širina=0)")
+
+            st.subheader(f"5. UKUPNA Predviđena Potrošnja Materijala");
+            tot_col1, tot_col2 = st.columns(2);
+            with tot_col1: st.metric("UKUPNA Dužina", f"{ukupna_duzina_final_m:,.2f} m", help="Proizvodnja + Škart")
+            with tot_col2: st.metric("UKUPNA Kvadratura", f"{ukupna_kvadratura_final_m2:,.2f} m²", help="Proizvodnja + Škart")
+
+            st.subheader("6. Procena Vremena Izrade"); time_col1, time_col2, time_col3, time_col4 = st.columns(4);
+            with time_col1: st.metric("Vreme Pripreme", format_time(vreme_pripreme_min), help=f"{broj_boja_za_skart_vreme} × {VREME_PRIPREME_PO_BOJI_ILI_OSNOVA}min")
+            with time_col2: st.metric("Vreme Proizvodnje", format_time(vreme_proizvodnje_min), help=f"{ukupna_duzina_proizvodnja_m:,.1f}m / {brzina_masine_m_min}m/min")
+            with time_col3: st.metric("Vreme Raspreme", format_time(vreme_raspreme_min), help="Fiksno")
+            with time_col4: st.metric("UKUPNO Vreme Rada", format_time(ukupno_vreme_min), help="Σ Priprema+Proizvodnja+Rasprema")
+
+            PROFIL.deo("tabela ostalih rešenja")
+            if len(all_solutions_obim) > 1:
+                st.subheader("Ostala moguća rešenja za Obim Cilindra")
+                st.caption("(Sortirano po Z ↑, zatim po x ↓)")
+                df_others = tabela_ostalih_resenja(sirina_W_input)
+                if df_others is not None: st.dataframe(df_others, use_container_width=True)
+
+        st.markdown("---")
+
+        PROFIL.deo("metrike troškova i cene")
+        # Kalkulacija Troškova - podeljeno u redove radi preglednosti
+        st.subheader("📊 Kalkulacija Troškova")
+        cost_row1_cols = st.columns(4)
+        with cost_row1_cols[0]: st.metric("Trošak: Boja + Lak", f"{ukupna_cena_boja_lak_rsd:,.2f} RSD", help=f"Boja:{cena_boje_rsd:,.2f}, Lak:{cena_laka_rsd:,.2f}")
+        with cost_row1_cols[1]: st.metric("Trošak: Kliše", f"{ukupna_cena_klisea_rsd:,.2f} RSD", help=f"{valid_broj_boja_za_calc} × {st.session_state.cena_klisea_po_boji:.2f} RSD/boji")
+        with cost_row1_cols[2]: st.metric("Trošak: Materijal", f"{ukupna_cena_materijala_rsd:,.2f} RSD", help=f"{ukupna_kvadratura_final_m2:,.2f}m²×{cena_po_m2_input:.2f}RSD/m²")
+        with cost_row1_cols[3]: st.metric("Trošak: Alat", f"{ukupna_cena_alata_rsd:,.2f} RSD", help=opis_alata_za_prikaz)
+
+        cost_row2_cols = st.columns(4) # Drugi red za rad mašine da stane help tekst
+        with cost_row2_cols[0]:
+            ukupno_vreme_h_za_help = ukupno_vreme_min / 60.0
+            st.metric("Trošak: Rad Mašine", f"{ukupna_cena_rada_masine_rsd:,.2f} RSD", help=f"{format_time(ukupno_vreme_min)}({ukupno_vreme_h_za_help:.2f}h)×{st.session_state.cena_rada_masine_po_satu:.2f}RSD/h")
+        # Ostatak kolona u drugom redu može biti prazan ili za druge stvari
+
+        st.subheader("💰 Zarada i Finalna Prodajna Cena")
+        final_col1, final_col2, final_col3 = st.columns(3)
+        # Ažuriran help za ukupan trošak
+        with final_col1: st.metric("Ukupan Trošak Proizvodnje", f"{ukupni_trosak_proizvodnje_rsd:,.2f} RSD", help="Σ (Boja/Lak + Kliše + Materijal + Rad + Alat)")
+        with final_col2: st.metric("Zarada", f"{zarada_rsd:,.2f} RSD", help=f"({koeficijent_zarade_input:.2f} × Cena Materijala)", delta=f"{koeficijent_zarade_input*100:.0f}%")
+        with final_col3: st.metric("UKUPNA CENA (Prodajna)", f"{ukupna_cena_prodajna_rsd:,.2f} RSD", delta=f"{zarada_rsd:,.2f} RSD", help="Trošak Proizvodnje + Zarada")
+
+        st.metric("Prodajna Cena po Komadu", f"{prodajna_cena_po_komadu_rsd:.4f} RSD", help=f"= {ukupna_cena_prodajna_rsd:,.2f} RSD / {tiraz_input:,} kom")
+
+        PROFIL.deo("optimalni raspored")
+        # --- Optimalni Raspored ---
+        st.markdown("---")
+        with st.expander("🔎 Optimalni Raspored (svi cilindri, orijentacije i y)"):
+            opt_col1, opt_col2, opt_col3 = st.columns(3)
+            with opt_col1:
+                opt_top_k = st.slider("Broj predloga:", 1, 30, 5, 1, key="opt_top_k")
+                opt_kriterijum = st.radio("Rangiraj po:", KRITERIJUMI, format_func=lambda k: {"ukupni_trosak_proizvodnje_rsd": "Ukupan trošak", "prodajna_cena_po_komadu_rsd": "Cena po komadu"}[k], key="opt_kriterijum")
+            with opt_col2:
+                opt_rotacija = st.checkbox("Dozvoli rotiranu etiketu (W↔H)", value=True, key="opt_rotacija")
+                opt_max_sirina = st.number_input("Maks. širina materijala (mm):", 1.0, value=float(MAX_SIRINA_MATERIJALA), step=5.0, format="%.1f", key="opt_max_sirina")
+            with opt_col3:
+                opt_samo_postojeci = st.checkbox("Samo postojeći alat", value=False, key="opt_samo_postojeci")
+                opt_alat_z = st.number_input("Postojeći alat Z (0 = nema):", 0, Z_MAX, 0, 1, key="opt_alat_z")
+                opt_alat_x = st.number_input("Postojeći alat x:", 1, 200, 1, 1, key="opt_alat_x"); opt_alat_y = st.number_input("Postojeći alat y:", 1, 50, 1, 1, key="opt_alat_y")
+                opt_alat_rotiran = st.checkbox("Alat je za rotiranu etiketu", value=False, key="opt_alat_rotiran")
+            opt_postojeci_alati = kljucevi_alata(alati_za_format)
+            if opt_alat_z:
+                alat_W, alat_H = (visina_H_input, sirina_W_input) if opt_alat_rotiran else (sirina_W_input, visina_H_input)
+                opt_postojeci_alati.append((opt_alat_z, alat_W, alat_H, opt_alat_x, opt_alat_y))
+            df_opt = najbolji_rasporedi(sirina_W_input, visina_H_input, tiraz_input, broj_boja_input, is_blanko, is_uv_lak_input, cena_po_m2_input,
+                                        izabrani_alat_kljuc, brzina_masine_m_min, koeficijent_zarade_input, cene=trenutne_cene(),
+                                        top_k=opt_top_k, kriterijum=opt_kriterijum, rotacija=opt_rotacija, max_sirina_materijala=opt_max_sirina,
+                                        postojeci_alati=opt_postojeci_alati, samo_postojeci_alat=opt_samo_postojeci)
+            if df_opt.empty: st.warning("Nema rasporeda koji zadovoljava ograničenja.")
+            else:
+                df_opt["Ušteda"] = ukupni_trosak_proizvodnje_rsd - df_opt["ukupni_trosak_proizvodnje_rsd"]
+                df_opt["Orijentacija"] = df_opt["rotiran"].map({False: "W po obimu", True: "Rotirana"})
+                df_opt = df_opt.rename(columns={"broj_zuba_Z": "Z", "broj_po_obimu_x": "x", "broj_po_sirini_y": "y", "razmak_G_obim_mm": "G Obim", "sirina_materijala_potrebna_mm": "Širina mat. (mm)",
+                                                "ukupna_duzina_final_m": "Dužina (m)", "ukupna_kvadratura_final_m2": "Kvadratura (m²)", "postojeci_alat": "Postojeći alat",
+                                                "ukupni_trosak_proizvodnje_rsd": "Trošak (RSD)", "prodajna_cena_po_komadu_rsd": "Cena/kom (RSD)"})
+                st.dataframe(df_opt[["Orijentacija", "Z", "x", "y", "G Obim", "Širina mat. (mm)", "Dužina (m)", "Kvadratura (m²)", "Postojeći alat", "Trošak (RSD)", "Cena/kom (RSD)", "Ušteda"]]
+                             .style.format({"G Obim": "{:.3f}", "Širina mat. (mm)": "{:.2f}", "Dužina (m)": "{:,.2f}", "Kvadratura (m²)": "{:,.2f}", "Trošak (RSD)": "{:,.2f}", "Cena/kom (RSD)": "{:.4f}", "Ušteda": "{:,.2f}"}),
+                             use_container_width=True, hide_index=True)
+                st.caption(f"Ušteda je u odnosu na trenutni raspored (Z={best_solution_obim['broj_zuba_Z']}, x={broj_po_obimu_x}, y={broj_po_sirini_y}).")
+
+        PROFIL.deo("poređenje mašina")
+        # --- Poređenje Mašina ---
+        st.markdown("---")
+        with st.expander("🏭 Poređenje Mašina (flota)"):
+            try: flota = ucitaj_flotu_kes()
+            except (OSError, ValueError) as e: st.error(f"❌ Profili mašina: {e}")
+            else:
+                masine_kriterijum = st.radio("Preporuka po:", KRITERIJUMI_PREPORUKE, horizontal=True, key="masine_kriterijum",
+                                             format_func=lambda k: {"ukupni_trosak_proizvodnje_rsd": "Ukupan trošak", "ukupno_vreme_min": "Vreme rada", "ukupna_cena_prodajna_rsd": "Prodajna cena"}[k])
+                df_masine = uporedi_masine(sirina_W_input, visina_H_input, tiraz_input, broj_boja_input, is_blanko, is_uv_lak_input, cena_po_m2_input,
+                                           izabrani_alat_kljuc, koeficijent_zarade_input, flota=flota, cene=trenutne_cene(), kriterijum=masine_kriterijum)
+                preporuka = df_masine[df_masine["preporucena"]]
+                if preporuka.empty: st.warning("Nijedna mašina iz flote nije kompatibilna sa ovim formatom.")
+                else: st.success(f"✅ Preporučena mašina: **{preporuka['masina'].iat[0]}** ({preporuka['ukupni_trosak_proizvodnje_rsd'].iat[0]:,.2f} RSD, {format_time(preporuka['ukupno_vreme_min'].iat[0])})")
+                df_masine = df_masine.rename(columns={"masina": "Mašina", "kompatibilna": "Kompatibilna", "preporucena": "Preporučena", "brzina_masine_m_min": "Brzina (m/min)",
+                                                      "broj_zuba_Z": "Z", "broj_po_obimu_x": "x", "broj_po_sirini_y": "y", "sirina_materijala_potrebna_mm": "Širina mat. (mm)",
+                                                      "ukupna_duzina_final_m": "Dužina (m)", "ukupno_vreme_min": "Vreme (min)", "ukupna_cena_rada_masine_rsd": "Rad (RSD)",
+                                                      "ukupni_trosak_proizvodnje_rsd": "Trošak (RSD)", "ukupna_cena_prodajna_rsd": "Prodajna (RSD)", "prodajna_cena_po_komadu_rsd": "Cena/kom (RSD)"})
+                st.dataframe(df_masine[["Mašina", "Preporučena", "Kompatibilna", "Brzina (m/min)", "Z", "x", "y", "Širina mat. (mm)", "Dužina (m)", "Vreme (min)", "Rad (RSD)", "Trošak (RSD)", "Prodajna (RSD)", "Cena/kom (RSD)"]]
+                             .style.format({"Širina mat. (mm)": "{:.2f}", "Dužina (m)": "{:,.2f}", "Vreme (min)": "{:,.1f}", "Rad (RSD)": "{:,.2f}", "Trošak (RSD)": "{:,.2f}", "Prodajna (RSD)": "{:,.2f}", "Cena/kom (RSD)": "{:.4f}"}, na_rep="N/A"),
+                             use_container_width=True, hide_index=True)
+                st.caption("Brzina i cena rada su iz profila mašina (masine.json), ne iz sidebar-a; ostale cene su trenutne.")
+
+        PROFIL.deo("analiza rizika")
+        # --- Analiza Rizika (Monte Carlo) ---
+        st.markdown("---")
+        with st.expander("🎲 Analiza Rizika (Monte Carlo)"):
+            rizik_ukljucen = st.checkbox("Izračunaj analizu rizika", value=False, key="rizik_ukljucen")
+            st.caption("Faktori na nominalne vrednosti (1.0 = vrednost iz proračuna), trougaona raspodela min/mod/max.")
+            df_raspodele = pd.DataFrame([{"Parametar": ime, "Min": r[1], "Mod": r[2], "Max": r[3]} for ime, r in PODRAZUMEVANE_RASPODELE.items()])
+            df_raspodele = st.data_editor(df_raspodele, disabled=["Parametar"], hide_index=True, use_container_width=True, key="rizik_raspodele")
+            rz_col1, rz_col2 = st.columns(2)
+            with rz_col1: rizik_uzoraka = st.select_slider("Broj uzoraka:", options=[10_000, 50_000, 100_000, 200_000], value=100_000, key="rizik_uzoraka")
+            with rz_col2: rizik_percentil = st.slider("Pokriti trošak do percentila:", min_value=50, max_value=99, value=90, key="rizik_percentil")
+            if rizik_ukljucen:
+                raspodele = {red["Parametar"]: ("trougaona", float(red["Min"]), float(red["Mod"]), float(red["Max"])) if red["Min"] != red["Max"] else ("fiksno", float(red["Min"]))
+                             for red in df_raspodele.to_dict("records")}
+                try:
+                    rizik, uzorci_rizika = simuliraj_ponudu(sirina_W_input, visina_H_input, tiraz_input, broj_boja_input, is_blanko, is_uv_lak_input, cena_po_m2_input,
+                                                            izabrani_alat_kljuc, brzina_masine_m_min, koeficijent_zarade_input, raspodele=raspodele,
+                                                            broj_uzoraka=rizik_uzoraka, percentil=rizik_percentil, cene=trenutne_cene(), vrati_uzorke=True)
+                except ValueError as e: st.error(f"❌ Raspodele: {e}")
+                else:
+                    rz_m1, rz_m2, rz_m3, rz_m4 = st.columns(4)
+                    rz_m1.metric("Trošak P50 / P90 (RSD)", f"{rizik['trosak_p50_rsd']:,.0f} / {rizik['trosak_p90_rsd']:,.0f}", f"{rizik['trosak_p90_rsd'] - ukupni_trosak_proizvodnje_rsd:+,.0f} P90 vs. nominalno", delta_color="inverse")
+                    rz_m2.metric("Trošak po kom. P50 / P90", f"{rizik['trosak_po_komadu_p50_rsd']:.4f} / {rizik['trosak_po_komadu_p90_rsd']:.4f}")
+                    rz_m3.metric("Verovatnoća gubitka", f"{rizik['verovatnoca_gubitka']:.1%}", help="Udeo uzoraka u kojima je trošak veći od prodajne cene iz ponude.")
+                    rz_m4.metric(f"Predlog koef. zarade (P{rizik_percentil})", f"{rizik['predlog_koeficijenta_zarade']:.3f}", f"{rizik['predlog_koeficijenta_zarade'] - koeficijent_zarade_input:+.3f}")
+                    st.info(f"Sa koeficijentom **{rizik['predlog_koeficijenta_zarade']:.3f}** prodajna cena je **{rizik['predlog_prodajne_rsd']:,.2f} RSD**: pokriva trošak do P{rizik_percentil} "
+                            f"({rizik['trosak_na_percentilu_rsd']:,.2f} RSD) i zadržava planiranu zaradu. Vreme rada P50 / P90: {format_time(rizik['vreme_p50_min'])} / {format_time(rizik['vreme_p90_min'])}.")
+                    broj_u_korpi, ivice = np.histogram(uzorci_rizika["ukupni_trosak_proizvodnje_rsd"], bins=40)
+                    st.bar_chart(pd.DataFrame({"Broj uzoraka": broj_u_korpi}, index=pd.Index(np.round((ivice[:-1] + ivice[1:]) / 2, 0), name="Trošak (RSD)")))
+
+        PROFIL.deo("analiza osetljivosti")
+        # --- Analiza Osetljivosti ---
+        st.markdown("---")
+        with st.expander("📈 Analiza Osetljivosti (Tiraž × Boje × Brzina × Materijal)"):
+            sweep_ukljucen = st.checkbox("Izračunaj analizu osetljivosti", value=False, key="sweep_ukljucen")
+            sw_col1, sw_col2, sw_col3 = st.columns(3)
+            with sw_col1:
+                sweep_tiraz_od = st.number_input("Tiraž od:", 1, value=1000, step=1000, format="%d", key="sweep_tiraz_od")
+                sweep_tiraz_do = st.number_input("Tiraž do:", 1, value=1000000, step=10000, format="%d", key="sweep_tiraz_do")
+                sweep_broj_tacaka = st.slider("Broj tačaka po tiražu:", 5, 200, 40, 5, key="sweep_broj_tacaka")
+            with sw_col2:
+                sweep_boje = st.multiselect("Broj boja:", list(range(1, 9)), default=[valid_broj_boja_za_calc or 1], disabled=is_blanko, key="sweep_boje")
+                sweep_brzine = st.multiselect("Brzina mašine (m/min):", list(range(BRZINA_MASINE_MIN, BRZINA_MASINE_MAX + 1, 5)), default=[brzina_masine_m_min], key="sweep_brzine")
+                sweep_materijali = st.multiselect("Materijal:", lista_materijala, default=[izabrani_materijal], key="sweep_materijali")
+            with sw_col3:
+                brzina_polu_input = st.slider("Brzina sa polurotacionim alatom (m/min):", BRZINA_MASINE_MIN, BRZINA_MASINE_MAX, brzina_masine_m_min, 5, key="sweep_brzina_polu")
+                brzina_rot_input = st.slider("Brzina sa rotacionim alatom (m/min):", BRZINA_MASINE_MIN, BRZINA_MASINE_MAX, min(BRZINA_MASINE_MAX, brzina_masine_m_min + 20), 5, key="sweep_brzina_rot", help="Rotacioni alat je skuplji; isplati se tek ako mašina sa njim radi brže.")
+
+            if sweep_ukljucen and sweep_boje and sweep_brzine and sweep_materijali and sweep_tiraz_do > sweep_tiraz_od:
+                zajednicko = dict(is_blanko=is_blanko, is_uv_lak=is_uv_lak_input, tip_alata=izabrani_alat_kljuc, koeficijent_zarade=koeficijent_zarade_input)
+                sweep_tirazi = log_tirazi(sweep_tiraz_od, sweep_tiraz_do, sweep_broj_tacaka)
+                df_sweep = izracunaj_mrezu(sirina_W_input, visina_H_input, sweep_tirazi, sweep_boje, sweep_brzine, sweep_materijali, cene=trenutne_cene(), **zajednicko)
+                df_sweep["Serija"] = df_sweep["broj_boja"].astype(str) + "B | " + df_sweep["brzina_masine_m_min"].astype(str) + " m/min | " + df_sweep["materijal"]
+                st.caption(f"{len(df_sweep):,} kombinacija, {df_sweep['Serija'].nunique()} krivih")
+                st.line_chart(df_sweep.pivot(index="tiraz", columns="Serija", values="prodajna_cena_po_komadu_rsd"), x_label="Tiraž (kom)", y_label="Cena po komadu (RSD)")
+
+                df_tacke = izracunaj_mrezu(sirina_W_input, visina_H_input, PODRAZUMEVANI_TIRAZI, sweep_boje, sweep_brzine, sweep_materijali, cene=trenutne_cene(), **zajednicko)
+                df_tacke["Serija"] = df_tacke["broj_boja"].astype(str) + "B | " + df_tacke["brzina_masine_m_min"].astype(str) + " m/min | " + df_tacke["materijal"]
+                st.dataframe(df_tacke.pivot(index="tiraz", columns="Serija", values="prodajna_cena_po_komadu_rsd").style.format("{:.4f}"), use_container_width=True)
+
+                st.subheader("Rotacioni vs Polurotacioni alat")
+                df_prelom = prelomni_tiraz(sirina_W_input, visina_H_input, sweep_boje, sweep_materijali, brzina_polu_input, brzina_rot_input, cene=trenutne_cene(),
+                                           is_blanko=is_blanko, is_uv_lak=is_uv_lak_input, koeficijent_zarade=koeficijent_zarade_input)
+                df_prelom["Prelomni tiraž"] = df_prelom["prelomni_tiraz"].map(lambda t: f"{t:,.0f} kom" if t == t else "Nema (polurotacioni uvek jeftiniji)")
+                st.dataframe(df_prelom[["broj_boja", "materijal", "Prelomni tiraž"]].rename(columns={"broj_boja": "Boje", "materijal": "Materijal"}), use_container_width=True, hide_index=True)
+                st.caption(f"Iznad prelomnog tiraža rotacioni alat ({brzina_rot_input} m/min) daje nižu ukupnu cenu od polurotacionog ({brzina_polu_input} m/min).")
+
+        # --- PDF Download Dugme (Uklonjeno) ---
+
+    else: # Ako nije nađeno rešenje za obim
+        error_msg = f"Nije pronađen cilindar ({Z_MIN}-{Z_MAX} zuba) za W={sirina_W_input:.3f}mm sa G={GAP_MIN:.1f}-{GAP_MAX:.1f}mm." if message_obim and 'Nije pronađen cilindar' in message_obim else f"Greška u proračunu: {message_obim}"
+        if "Greška" in message_obim: st.error(f"❌ {error_msg}")
+        else: st.warning(f"⚠️ {error_msg}")
+
+else: # Ako nisu uneti svi potrebni podaci
+    st.info("Unesite sve parametre u panelu sa leve strane (minimalno Širina, Visina i Tiraž > 0).")
+
+PROFIL.deo("gang-run planer")
+# --- Gang-run Planer ---
+st.markdown("---")
+with st.expander("🧩 Gang-run Planer (više poslova na istom cilindru)"):
+    st.caption("Tabela poslova (CSV/Parquet) sa kolonama: sirina_W, visina_H, tiraz, broj_boja, is_blanko, is_uv_lak, materijal, tip_alata, brzina_masine_m_min, koeficijent_zarade. Koriste se trenutne cene iz sidebar-a.")
+    gang_fajl = st.file_uploader("Tabela poslova:", type=["csv", "parquet"], key="gang_fajl")
+    if gang_fajl is not None:
+        gang_poslovi = pd.read_parquet(gang_fajl) if gang_fajl.name.lower().endswith(".parquet") else pd.read_csv(gang_fajl)
+        try: gang_plan, gang_grupe = planiraj_gang_run(gang_poslovi, cene=trenutne_cene())
+        except ValueError as e: st.error(f"❌ {e}")
+        else:
+            gang_col1, gang_col2, gang_col3 = st.columns(3)
+            with gang_col1: st.metric("Grupa (štampi)", f"{len(gang_grupe)}", help=f"{len(gang_poslovi)} poslova")
+            with gang_col2: st.metric("Trošak pojedinačno", f"{gang_grupe['samostalni_trosak_rsd'].sum():,.2f} RSD")
+            with gang_col3: st.metric("Ušteda Gang-run", f"{gang_grupe['usteda_rsd'].sum():,.2f} RSD", help="Σ pojedinačni troškovi − Σ troškovi grupa")
+            st.dataframe(gang_grupe.rename(columns={"broj_poslova": "Poslova", "poslovi": "Poslovi (red)", "broj_zuba_Z": "Z", "duzina_proizvodnje_m": "Dužina (m)", "sirina_materijala_mm": "Širina mat. (mm)",
+                                                    "trosak_rsd": "Trošak (RSD)", "samostalni_trosak_rsd": "Pojedinačno (RSD)", "usteda_rsd": "Ušteda (RSD)"}), use_container_width=True, hide_index=True)
+            st.dataframe(gang_plan, use_container_width=True)
+
+PROFIL.deo("istorija i inventar")
+# --- Istorija Ponuda i Inventar Alata ---
+with st.expander("🗂️ Istorija Ponuda i Inventar Alata"):
+    ist_col1, ist_col2, ist_col3 = st.columns(3)
+    with ist_col1: ist_klijent = st.text_input("Klijent (prazno = svi):", value=client_name, key="ist_klijent")
+    with ist_col2: ist_proizvod = st.text_input("Proizvod (prazno = svi):", value=product_name, key="ist_proizvod")
+    with ist_col3: ist_limit = st.number_input("Broj ponuda:", 1, 1000, 50, 10, key="ist_limit")
+    df_istorija = baza.ponude(klijent=ist_klijent or None, proizvod=ist_proizvod or None, limit=ist_limit)
+    if df_istorija.empty: st.info("Nema sačuvanih ponuda za izabrani filter.")
+    else: st.dataframe(df_istorija.rename(columns={"broj_zuba_Z": "Z", "broj_po_obimu_x": "x", "broj_po_sirini_y": "y", "ukupni_trosak_proizvodnje_rsd": "Trošak (RSD)",
+                                                   "ukupna_cena_prodajna_rsd": "Prodajna (RSD)", "prodajna_cena_po_komadu_rsd": "Cena/kom (RSD)"}), use_container_width=True, hide_index=True)
+
+    st.markdown("**Inventar alata za isecanje** (W po obimu, H po širini cilindra)")
+    with st.form("forma_alat", clear_on_submit=True):
+        alat_col1, alat_col2, alat_col3, alat_col4 = st.columns(4)
+        with alat_col1: novi_oznaka = st.text_input("Oznaka alata:"); novi_tip = st.selectbox("Tip:", TIPOVI_ALATA[1:])
+        with alat_col2: novi_Z = st.number_input("Z:", Z_MIN, Z_MAX, Z_MIN, 1); novi_napomena = st.text_input("Napomena:")
+        with alat_col3: novi_W = st.number_input("W (mm):", 0.1, value=float(sirina_W_input), step=0.1, format="%.3f"); novi_H = st.number_input("H (mm):", 0.1, value=float(visina_H_input), step=0.1, format="%.3f")
+        with alat_col4: novi_x = st.number_input("x:", 1, 200, 1, 1); novi_y = st.number_input("y:", 1, 50, 1, 1)
+        if st.form_submit_button("Dodaj alat"):
+            try: baza.dodaj_alate([{"oznaka": novi_oznaka.strip(), "tip_alata": novi_tip, "broj_zuba_Z": novi_Z, "sirina_W": novi_W, "visina_H": novi_H,
+                                    "broj_po_obimu_x": novi_x, "broj_po_sirini_y": novi_y, "napomena": novi_napomena}])
+            except ValueError as e: st.error(f"❌ {e}")
+            else: st.success(f"Alat '{novi_oznaka.strip()}' dodat.")
+    alati_fajl = st.file_uploader("Uvoz alata (CSV/Parquet, kolone: " + ", ".join(["oznaka", "tip_alata", "broj_zuba_Z", "sirina_W", "visina_H", "broj_po_obimu_x", "broj_po_sirini_y"]) + "):", type=["csv", "parquet"], key="alati_fajl")
+    if alati_fajl is not None and st.session_state.get("uvezen_alati_fajl") != alati_fajl.file_id:
+        alati_uvoz = pd.read_parquet(alati_fajl) if alati_fajl.name.lower().endswith(".parquet") else pd.read_csv(alati_fajl)
+        try: baza.dodaj_alate(alati_uvoz.to_dict("records"))
+        except (KeyError, ValueError) as e: st.error(f"❌ Neispravan fajl alata: {e}")
+        else: st.session_state.uvezen_alati_fajl = alati_fajl.file_id; st.success(f"Uvezeno alata: {len(alati_uvoz)}")
+    alati_prikaz = baza.pronadji_alate(sirina_W_input, visina_H_input)
+    st.caption(f"Alati za format {sirina_W_input:.3f}×{visina_H_input:.3f} mm (uključujući rotirane): {len(alati_prikaz)}")
+    if not alati_prikaz.empty: st.dataframe(alati_prikaz, use_container_width=True, hide_index=True)
+    st.caption(" | ".join(f"{k}: {v}" for k, v in baza.statistika().items() if v is not None))
+
+PROFIL.deo("podnožje i čuvanje cena")
+# ISPRAVKA INDENTACIJE
+st.markdown("---")
+settings_str = f"MaxMat={MAX_SIRINA_MATERIJALA}mm | CenaRada={st.session_state.cena_rada_masine_po_satu:.2f}RSD/h | Alati: Polu={st.session_state.cena_alata_polurotacioni:.2f}, Rot={st.session_state.cena_alata_rotacioni:.2f} | Kliše={st.session_state.cena_klisea_po_boji:.2f}RSD/boji"
+st.caption(settings_str)
+
+# Izmenjene cene se čuvaju u bazi (upis ide u red, ne čeka se)
+if trenutne_cene() != st.session_state.sacuvane_cene:
+    baza.sacuvaj_cene(trenutne_cene()); st.session_state.sacuvane_cene = {k: dict(v) if isinstance(v, dict) else v for k, v in trenutne_cene().items()}
+
+with st.sidebar.expander("Keš proračuna"):
+    st.dataframe(pd.DataFrame(statistika_keseva()), use_container_width=True, hide_index=True)
+
+# --- Debug panel (skriven; otvara se sa ?debug=1 u adresi) ---
+rerun_zapis = PROFIL.zavrsi_rerun()
+if st.query_params.get("debug") == "1":
+    with st.sidebar.expander("🛠️ Debug: merenje", expanded=True):
+        debug_profil = st.checkbox("Merenje uključeno (ceo proces)", value=PROFIL.ukljuceno, key="debug_profil")
+        if debug_profil != PROFIL.ukljuceno: PROFIL.ukljuceno = debug_profil; st.rerun()
+        dbg_col1, dbg_col2 = st.columns(2)
+        with dbg_col1: st.metric("Rerun-ova (proces)", f"{PROFIL.broj_rerunova}"); st.metric("Uvoz modula", f"{PROFIL.vreme_uvoza_s * 1000:.0f} ms")
+        with dbg_col2: st.metric("Rerun-ova (sesija)", f"{st.session_state.broj_rerunova_sesije}"); st.metric("Prvi rerun (hladan)", f"{PROFIL.prvi_rerun_s * 1000:.0f} ms" if PROFIL.prvi_rerun_s is not None else "N/A", help="Meri se samo ako je merenje uključeno od starta (LABEL_PROFIL=1)")
+        if rerun_zapis:
+            st.caption(f"Ovaj rerun: {rerun_zapis['ukupno_s'] * 1000:.1f} ms (faze proračuna su uključene u delove stranice u kojima su pozvane)")
+            st.dataframe(pd.DataFrame([(ime, trajanje * 1000) for ime, trajanje in rerun_zapis["etape"]], columns=["Etapa", "ms"]).style.format({"ms": "{:.3f}"}), use_container_width=True, hide_index=True)
+        else: st.caption("Merenje je isključeno; uključite ga za prikaz faza.")
+        debug_statistika = PROFIL.statistika()
+        if debug_statistika: st.dataframe(pd.DataFrame(debug_statistika).round(3), use_container_width=True, hide_index=True)
+        st.download_button("Prometheus tekst", PROFIL.prometheus_tekst(), file_name="metrics.txt", mime="text/plain")
+        st.download_button("Log rerun-ova (JSON linije)", PROFIL.json_linije(), file_name="rerunovi.jsonl", mime="application/x-ndjson")
+        if st.button("Isprazni merenja", key="debug_isprazni"): PROFIL.isprazni()
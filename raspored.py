@@ -0,0 +1,81 @@
+"""Pretraga rasporeda sa najnižom cenom.
+
+Podrazumevani proračun uzima najmanji Z sa najviše šablona po obimu i najveći
+mogući y, uvek sa W po obimu. Ovde se svaka kombinacija
+(orijentacija, Z, x, y) boduje punim proračunom troškova i vraća se top-k.
+"""
+import numpy as np
+import pandas as pd
+from kalkulacija import (
+    MAX_SIRINA_MATERIJALA, BRZINA_MASINE_DEFAULT, KOEFICIJENT_ZARADE_DEFAULT, ULAZNE_KOLONE, INDEKS_CILINDARA,
+    broj_po_sirini_niz, sirina_materijala_niz, izracunaj_potrosnju, izracunaj_troskove, svedi_broj_boja, podrazumevane_cene,
+)
+
+KRITERIJUMI = ["ukupni_trosak_proizvodnje_rsd", "prodajna_cena_po_komadu_rsd"]
+
+
+def kljuc_alata(broj_zuba_Z, sirina_W, visina_H, x, y):
+    """Ključ alata za isecanje: Z, W (po obimu), H (po širini), x, y; dimenzije zaokružene na 0.001 mm."""
+    return (int(broj_zuba_Z), round(float(sirina_W), 3), round(float(visina_H), 3), int(x), int(y))
+
+def svi_rasporedi(sirina_W, visina_H, rotacija=True, max_sirina_materijala=MAX_SIRINA_MATERIJALA, indeks=None):
+    """Sve validne kombinacije orijentacije, cilindra (Z, x) i broja šablona po širini (y)."""
+    indeks = indeks or INDEKS_CILINDARA
+    obim = [sirina_W]; sirina = [visina_H]
+    if rotacija and sirina_W != visina_H: obim.append(visina_H); sirina.append(sirina_W)
+    obim = np.asarray(obim, dtype=float); sirina = np.asarray(sirina, dtype=float)
+    cil = indeks.svi(obim)
+    # Svako rešenje za obim × y = 1..y_max za tu orijentaciju
+    y_max = broj_po_sirini_niz(sirina)[cil["red"]]
+    resenje = np.repeat(np.arange(y_max.size), y_max)
+    y = np.arange(resenje.size) - np.repeat(np.cumsum(y_max) - y_max, y_max) + 1
+    red = cil["red"][resenje]
+    raspored = {
+        "rotiran": red == 1,
+        "sirina_W_obim": obim[red], "visina_H_sirina": sirina[red],
+        "broj_zuba_Z": cil["broj_zuba_Z"][resenje], "obim_mm": cil["obim_mm"][resenje],
+        "broj_po_obimu_x": cil["broj_sablona_N_obim"][resenje], "razmak_G_obim_mm": cil["razmak_G_obim_mm"][resenje],
+        "broj_po_sirini_y": y,
+    }
+    raspored["sirina_materijala_potrebna_mm"] = sirina_materijala_niz(y, raspored["visina_H_sirina"])
+    ok = raspored["sirina_materijala_potrebna_mm"] <= max_sirina_materijala
+    return {ime: vrednosti[ok] for ime, vrednosti in raspored.items()}
+
+def najbolji_rasporedi(sirina_W, visina_H, tiraz, broj_boja=1, is_blanko=False, is_uv_lak=False, cena_po_m2=None,
+                       tip_alata="Nijedan", brzina_masine_m_min=BRZINA_MASINE_DEFAULT,
+                       koeficijent_zarade=KOEFICIJENT_ZARADE_DEFAULT, materijal=None, cene=None,
+                       top_k=10, kriterijum="ukupni_trosak_proizvodnje_rsd", rotacija=True,
+                       max_sirina_materijala=MAX_SIRINA_MATERIJALA, postojeci_alati=None, samo_postojeci_alat=False):
+    """Top-k rasporeda po kriterijumu (ukupan trošak ili cena po komadu).
+
+    `postojeci_alati` su ključevi iz kljuc_alata(); raspored koji se poklapa sa
+    postojećim alatom nema trošak alata. Sa `samo_postojeci_alat` ostaju samo takvi.
+    """
+    if kriterijum not in KRITERIJUMI: raise ValueError(f"Nepoznat kriterijum '{kriterijum}'.")
+    cene = cene or podrazumevane_cene()
+    if cena_po_m2 is None: cena_po_m2 = cene["materijali_cene"][materijal or ULAZNE_KOLONE["materijal"]]
+    r = svi_rasporedi(sirina_W, visina_H, rotacija, max_sirina_materijala)
+    ima_alat = np.zeros(r["broj_zuba_Z"].size, dtype=bool)
+    if postojeci_alati:
+        obim_mm = np.round(r["sirina_W_obim"], 3); sirina_mm = np.round(r["visina_H_sirina"], 3)
+        for z, w, h, x, y in {kljuc_alata(*alat) for alat in postojeci_alati}:
+            ima_alat |= (r["broj_zuba_Z"] == z) & (obim_mm == w) & (sirina_mm == h) & (r["broj_po_obimu_x"] == x) & (r["broj_po_sirini_y"] == y)
+    if samo_postojeci_alat: r = {ime: vrednosti[ima_alat] for ime, vrednosti in r.items()}; ima_alat = ima_alat[ima_alat]
+    n = r["broj_zuba_Z"].size
+    if n == 0: return pd.DataFrame()
+
+    bb = svedi_broj_boja(broj_boja, is_blanko)
+    pot = izracunaj_potrosnju(r, r["sirina_W_obim"], tiraz, bb, is_blanko, brzina_masine_m_min)
+    tip = np.where(ima_alat, "Nijedan", tip_alata)
+    tro = izracunaj_troskove(pot, tiraz, bb, is_blanko, is_uv_lak, cena_po_m2, tip, koeficijent_zarade, cene)
+
+    vrednost = tro[kriterijum]
+    k = min(top_k, n)
+    kandidati = np.argpartition(vrednost, k - 1)[:k] if k < n else np.arange(n)
+    kandidati = kandidati[np.lexsort((r["broj_po_obimu_x"][kandidati] * -1, r["broj_zuba_Z"][kandidati], vrednost[kandidati]))]
+    tabela = {ime: vrednosti[kandidati] for ime, vrednosti in r.items()}
+    tabela["postojeci_alat"] = ima_alat[kandidati]
+    for ime in ["ukupna_duzina_final_m", "ukupna_kvadratura_final_m2", "ukupno_vreme_min"]: tabela[ime] = pot[ime][kandidati]
+    for ime in ["ukupna_cena_materijala_rsd", "ukupna_cena_rada_masine_rsd", "ukupna_cena_alata_rsd",
+                "ukupni_trosak_proizvodnje_rsd", "ukupna_cena_prodajna_rsd", "prodajna_cena_po_komadu_rsd"]: tabela[ime] = tro[ime][kandidati]
+    return pd.DataFrame(tabela)
@@ -0,0 +1,180 @@
+"""Analiza rizika (Monte Carlo): brzina mašine, škart, vreme pripreme i potrošnja boje/laka.
+
+Svaki nesigurni parametar ima raspodelu faktora oko nominalne vrednosti (1.0 =
+vrednost iz proračuna). Uzorci se izvlače jednom i isti se koriste za sve ponude,
+pa su ponude međusobno uporedive. Geometrija se računa jednom po ponudi, a koraci
+4-15 (izracunaj_potrosnju, izracunaj_troskove) nad matricom ponuda × uzoraka, u
+paketima da bi memorija ostala ograničena.
+
+Predlog koeficijenta zarade: prodajna cena iz ponude treba da pokrije trošak na
+izabranom percentilu i da pri tome ostane planirana zarada, tj.
+koeficijent = planirani + (P_q(trošak) − nominalni trošak) / nominalna cena materijala.
+
+Upotreba iz komandne linije:
+    python rizik.py poslovi.csv -o rizik.csv --uzoraka 100000 --percentil 90
+"""
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from kalkulacija import (
+    BRZINA_MASINE_DEFAULT, KOEFICIJENT_ZARADE_DEFAULT, DUZINA_SKART_OSNOVA, DUZINA_SKART_PO_BOJI, VREME_PRIPREME_PO_BOJI_ILI_OSNOVA,
+    GRAMA_BOJE_PO_M2, GRAMA_LAKA_PO_M2,
+    pripremi_poslove, izracunaj_geometriju, izracunaj_potrosnju, izracunaj_troskove, svedi_broj_boja, podrazumevane_cene,
+    ucitaj_tabelu, sacuvaj_tabelu,
+)
+
+# Polazne pretpostavke (faktor na nominalnu vrednost); podesiti prema podacima iz proizvodnje
+PODRAZUMEVANE_RASPODELE = {
+    "brzina_masine_m_min": ("trougaona", 0.60, 0.90, 1.05),
+    "duzina_skart_osnova": ("trougaona", 0.80, 1.00, 1.80),
+    "duzina_skart_po_boji": ("trougaona", 0.80, 1.00, 1.80),
+    "vreme_pripreme_po_boji": ("trougaona", 0.80, 1.00, 1.60),
+    "grama_boje_po_m2": ("trougaona", 0.85, 1.00, 1.30),
+    "grama_laka_po_m2": ("trougaona", 0.85, 1.00, 1.30),
+}
+NOMINALNO = {
+    "duzina_skart_osnova": DUZINA_SKART_OSNOVA, "duzina_skart_po_boji": DUZINA_SKART_PO_BOJI,
+    "vreme_pripreme_po_boji": VREME_PRIPREME_PO_BOJI_ILI_OSNOVA, "grama_boje_po_m2": GRAMA_BOJE_PO_M2, "grama_laka_po_m2": GRAMA_LAKA_PO_M2,
+}
+RASPODELE = {"trougaona": 3, "uniformna": 2, "normalna": 2, "lognormalna": 2, "fiksno": 1}
+BROJ_UZORAKA = 100_000
+ELEMENATA_PO_PAKETU = 1_000_000   # ponuda × uzoraka u jednom prolazu (~8 MB po nizu)
+MIN_FAKTOR = 0.01
+
+
+def uzorkuj(raspodela, broj_uzoraka, rng):
+    """Faktori iz raspodele: ("trougaona", min, mod, max), ("uniformna", min, max),
+    ("normalna", sredina, sigma), ("lognormalna", medijana, sigma) ili ("fiksno", vrednost).
+
+    Faktori su ograničeni odozdo na MIN_FAKTOR (brzina i škart ne mogu biti ≤ 0).
+    """
+    vrsta, *p = raspodela
+    if vrsta not in RASPODELE: raise ValueError(f"Nepoznata raspodela '{vrsta}'.")
+    if len(p) != RASPODELE[vrsta]: raise ValueError(f"Raspodela '{vrsta}' traži {RASPODELE[vrsta]} parametra, dato {len(p)}.")
+    if vrsta == "trougaona":
+        if not p[0] <= p[1] <= p[2] or p[0] == p[2]: raise ValueError(f"Trougaona raspodela traži min ≤ mod ≤ max i min < max, dato {p}.")
+        faktor = rng.triangular(p[0], p[1], p[2], broj_uzoraka)
+    elif vrsta == "uniformna": faktor = rng.uniform(p[0], p[1], broj_uzoraka)
+    elif vrsta == "normalna": faktor = rng.normal(p[0], p[1], broj_uzoraka)
+    elif vrsta == "lognormalna": faktor = p[0] * np.exp(p[1] * rng.standard_normal(broj_uzoraka))
+    else: faktor = np.full(broj_uzoraka, float(p[0]))
+    return np.maximum(faktor, MIN_FAKTOR)
+
+def izvuci_uzorke(raspodele=None, broj_uzoraka=BROJ_UZORAKA, seme=0):
+    """Faktori za sve parametre; nenavedeni parametri uzimaju PODRAZUMEVANE_RASPODELE."""
+    raspodele = {**PODRAZUMEVANE_RASPODELE, **(raspodele or {})}
+    nepoznati = set(raspodele) - set(PODRAZUMEVANE_RASPODELE)
+    if nepoznati: raise ValueError(f"Nepoznati parametri rizika: {sorted(nepoznati)}")
+    rng = np.random.default_rng(seme)
+    return {ime: uzorkuj(raspodele[ime], broj_uzoraka, rng) for ime in PODRAZUMEVANE_RASPODELE}
+
+
+def _simuliraj_paket(geo, kolone, cena_po_m2, faktori, cene):
+    """Koraci 4-15 za paket ponuda (redovi) × uzoraka (kolone)."""
+    kolona = lambda niz: np.asarray(niz)[:, None]
+    geo = {ime: kolona(vrednosti) for ime, vrednosti in geo.items()}
+    bb = kolona(svedi_broj_boja(kolone["broj_boja"], kolone["is_blanko"]))
+    brzina = kolona(kolone["brzina_masine_m_min"]).astype(float) * faktori["brzina_masine_m_min"][None, :]
+    parametri = {ime: NOMINALNO[ime] * faktori[ime][None, :] for ime in ["duzina_skart_osnova", "duzina_skart_po_boji", "vreme_pripreme_po_boji"]}
+    pot = izracunaj_potrosnju(geo, kolona(kolone["sirina_W"]), kolona(kolone["tiraz"]), bb, kolona(kolone["is_blanko"]), brzina, **parametri)
+    return pot, izracunaj_troskove(pot, kolona(kolone["tiraz"]), bb, kolona(kolone["is_blanko"]), kolona(kolone["is_uv_lak"]), kolona(cena_po_m2),
+                                   kolona(kolone["tip_alata"]), kolona(kolone["koeficijent_zarade"]), cene,
+                                   grama_boje_po_m2=GRAMA_BOJE_PO_M2 * faktori["grama_boje_po_m2"][None, :],
+                                   grama_laka_po_m2=GRAMA_LAKA_PO_M2 * faktori["grama_laka_po_m2"][None, :])
+
+def simuliraj_ponude(poslovi, raspodele=None, broj_uzoraka=BROJ_UZORAKA, percentil=90, cene=None, seme=0, uzorci=None, vrati_uzorke=False):
+    """Monte Carlo za tabelu poslova -> tabela sa nominalnom ponudom, P50/P90 i predlogom koeficijenta zarade.
+
+    `uzorci` (iz izvuci_uzorke) zamenjuju raspodele/broj_uzoraka/seme. Sa `vrati_uzorke`
+    vraća i (tabela, {kolona: matrica ponuda × uzoraka}) za trošak, cenu po komadu i vreme.
+    """
+    if not 0 < percentil < 100: raise ValueError("Percentil mora biti između 0 i 100.")
+    cene = cene or podrazumevane_cene()
+    faktori = uzorci or izvuci_uzorke(raspodele, broj_uzoraka, seme)
+    broj_uzoraka = len(faktori["brzina_masine_m_min"])
+    poslovi, kolone, cena_po_m2 = pripremi_poslove(poslovi, cene)
+    n = len(poslovi)
+    geo = izracunaj_geometriju(kolone["sirina_W"], kolone["visina_H"])
+    bb = svedi_broj_boja(kolone["broj_boja"], kolone["is_blanko"])
+    pot_nom = izracunaj_potrosnju(geo, kolone["sirina_W"], kolone["tiraz"], bb, kolone["is_blanko"], kolone["brzina_masine_m_min"])
+    tro_nom = izracunaj_troskove(pot_nom, kolone["tiraz"], bb, kolone["is_blanko"], kolone["is_uv_lak"], cena_po_m2,
+                                 kolone["tip_alata"], kolone["koeficijent_zarade"], cene)
+
+    kvantili = sorted({50.0, 90.0, float(percentil)})
+    rezultat = {ime: np.full((len(kvantili), n), np.nan) for ime in ["trosak", "po_komadu", "vreme"]}
+    verovatnoca_gubitka = np.full(n, np.nan)
+    matrice = {ime: np.full((n, broj_uzoraka), np.nan) for ime in ["ukupni_trosak_proizvodnje_rsd", "prodajna_cena_po_komadu_rsd", "ukupno_vreme_min"]} if vrati_uzorke else None
+    validni = np.flatnonzero(geo["validno"])
+    velicina_paketa = max(1, ELEMENATA_PO_PAKETU // broj_uzoraka)
+    for pocetak in range(0, validni.size, velicina_paketa):
+        redovi = validni[pocetak:pocetak + velicina_paketa]
+        pot, tro = _simuliraj_paket({ime: v[redovi] for ime, v in geo.items()}, {ime: v[redovi] for ime, v in kolone.items()},
+                                    cena_po_m2[redovi], faktori, cene)
+        trosak = tro["ukupni_trosak_proizvodnje_rsd"]
+        # Prodajna cena iz ponude je fiksna (nominalna); simulira se šta košta po komadu i koliko traje
+        po_komadu = trosak / kolone["tiraz"][redovi].astype(float)[:, None]
+        rezultat["trosak"][:, redovi] = np.percentile(trosak, kvantili, axis=1)
+        rezultat["po_komadu"][:, redovi] = np.percentile(po_komadu, kvantili, axis=1)
+        rezultat["vreme"][:, redovi] = np.percentile(pot["ukupno_vreme_min"], kvantili, axis=1)
+        verovatnoca_gubitka[redovi] = (trosak > tro_nom["ukupna_cena_prodajna_rsd"][redovi][:, None]).mean(axis=1)
+        if vrati_uzorke:
+            matrice["ukupni_trosak_proizvodnje_rsd"][redovi] = trosak; matrice["prodajna_cena_po_komadu_rsd"][redovi] = po_komadu
+            matrice["ukupno_vreme_min"][redovi] = np.broadcast_to(pot["ukupno_vreme_min"], trosak.shape)
+
+    q = {k: kvantili.index(k) for k in kvantili}
+    materijal = tro_nom["ukupna_cena_materijala_rsd"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pokrice = np.where(materijal > 0, (rezultat["trosak"][q[float(percentil)]] - tro_nom["ukupni_trosak_proizvodnje_rsd"]) / materijal, np.nan)
+    koeficijent = kolone["koeficijent_zarade"].astype(float)
+    tabela = {
+        "validno": geo["validno"],
+        "nominalni_trosak_rsd": np.where(geo["validno"], tro_nom["ukupni_trosak_proizvodnje_rsd"], np.nan),
+        "nominalna_prodajna_rsd": np.where(geo["validno"], tro_nom["ukupna_cena_prodajna_rsd"], np.nan),
+        "nominalna_cena_po_komadu_rsd": np.where(geo["validno"], tro_nom["prodajna_cena_po_komadu_rsd"], np.nan),
+        "trosak_p50_rsd": rezultat["trosak"][q[50.0]], "trosak_p90_rsd": rezultat["trosak"][q[90.0]],
+        "trosak_po_komadu_p50_rsd": rezultat["po_komadu"][q[50.0]], "trosak_po_komadu_p90_rsd": rezultat["po_komadu"][q[90.0]],
+        "vreme_p50_min": rezultat["vreme"][q[50.0]], "vreme_p90_min": rezultat["vreme"][q[90.0]],
+        "percentil": float(percentil), "trosak_na_percentilu_rsd": rezultat["trosak"][q[float(percentil)]],
+        "verovatnoca_gubitka": verovatnoca_gubitka,
+        "koeficijent_pokrica": pokrice,
+        "predlog_koeficijenta_zarade": np.maximum(koeficijent + pokrice, 0.0),
+    }
+    tabela["predlog_prodajne_rsd"] = tabela["nominalni_trosak_rsd"] + tabela["predlog_koeficijenta_zarade"] * np.where(geo["validno"], materijal, np.nan)
+    tabela = pd.concat([poslovi, pd.DataFrame(tabela)], axis=1)
+    return (tabela, matrice) if vrati_uzorke else tabela
+
+def simuliraj_ponudu(sirina_W, visina_H, tiraz, broj_boja=1, is_blanko=False, is_uv_lak=False, cena_po_m2=None, tip_alata="Nijedan",
+                     brzina_masine_m_min=BRZINA_MASINE_DEFAULT, koeficijent_zarade=KOEFICIJENT_ZARADE_DEFAULT, materijal=None, raspodele=None, broj_uzoraka=BROJ_UZORAKA,
+                     percentil=90, cene=None, seme=0, vrati_uzorke=False):
+    """Jedna ponuda; vraća rečnik (i uzorke ako je vrati_uzorke) ili None ako nema cilindra."""
+    posao = {"sirina_W": sirina_W, "visina_H": visina_H, "tiraz": tiraz, "broj_boja": broj_boja, "is_blanko": is_blanko, "is_uv_lak": is_uv_lak,
+             "tip_alata": tip_alata, "brzina_masine_m_min": brzina_masine_m_min, "koeficijent_zarade": koeficijent_zarade}
+    if cena_po_m2 is not None: posao["cena_po_m2"] = cena_po_m2
+    elif materijal is not None: posao["materijal"] = materijal
+    tabela, matrice = simuliraj_ponude([posao], raspodele, broj_uzoraka, percentil, cene, seme, vrati_uzorke=True)
+    if not tabela["validno"].iat[0]: return None
+    rezultat = {ime: (v.item() if hasattr(v, "item") else v) for ime, v in tabela.iloc[0].items()}
+    return (rezultat, {ime: m[0] for ime, m in matrice.items()}) if vrati_uzorke else rezultat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo analiza rizika za tabelu poslova (CSV/Parquet).")
+    parser.add_argument("ulaz", help="Tabela poslova (.csv ili .parquet), iste kolone kao za kalkulacija.py")
+    parser.add_argument("-o", "--izlaz", help="Rezultat po poslu (.csv ili .parquet)")
+    parser.add_argument("--uzoraka", type=int, default=BROJ_UZORAKA, help="Broj uzoraka po ponudi")
+    parser.add_argument("--percentil", type=float, default=90, help="Percentil troška koji predlog koeficijenta treba da pokrije")
+    parser.add_argument("--raspodele", help='JSON sa raspodelama, npr. {"brzina_masine_m_min": ["trougaona", 0.5, 0.85, 1.0]}')
+    parser.add_argument("--seme", type=int, default=0)
+    args = parser.parse_args(argv)
+    raspodele = None
+    if args.raspodele:
+        with open(args.raspodele, encoding="utf-8") as f: raspodele = {k: tuple(v) for k, v in json.load(f).items()}
+    tabela = simuliraj_ponude(ucitaj_tabelu(args.ulaz), raspodele, args.uzoraka, args.percentil, seme=args.seme)
+    if args.izlaz: sacuvaj_tabelu(tabela, args.izlaz)
+    print(tabela[["nominalni_trosak_rsd", "trosak_p50_rsd", "trosak_p90_rsd", "verovatnoca_gubitka", "koeficijent_zarade", "predlog_koeficijenta_zarade"]].describe().to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
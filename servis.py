@@ -0,0 +1,284 @@
+"""Lokalni HTTP servis za ponude (JSON), bez spoljnih zavisnosti osim numpy/pandas.
+
+Rute:
+    POST /quote        jedan posao (ista polja kao u sidebar-u) -> ponuda
+    POST /quote/bulk   {"poslovi": [...], "cene": {...}?} -> {"ponude": [...]}
+    GET  /stats        broj zahteva i latencije (p50/p90/p99) po ruti, stanje redova i keševa
+    GET  /health
+
+Pojedinačni zahtevi se skupljaju u mikro-batch i računaju jednim vektorskim
+pozivom; veliki bulk zahtevi idu u pool procesa. Pun red vraća 503.
+
+Pokretanje:
+    python servis.py --port 8080 --radnici 4 --cene cene.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from kalkulacija import ULAZNE_KOLONE, TIPOVI_ALATA, izracunaj_ponude, podrazumevane_cene
+from kes import statistika_keseva
+
+MAX_TELO_BAJTOVA = 16 * 1024 * 1024
+MAX_ZAGLAVLJE_BAJTOVA = 64 * 1024
+MAX_POSLOVA_BULK = 100_000
+PRAG_BULK_PROCES = 5_000          # bulk veći od ovoga ide u pool procesa
+MAX_MIKRO_BATCH = 2_048
+MAX_RED_PONUDA = 10_000           # pojedinačni zahtevi koji čekaju na mikro-batch
+MAX_BULK_ISTOVREMENO = 4          # bulk zahtevi koji se računaju u isto vreme
+MAX_BULK_CEKA = 16                # bulk zahtevi koji čekaju na slobodno mesto
+BROJ_UZORAKA_LATENCIJE = 10_000
+TIMEOUT_KONEKCIJE_S = 30
+
+STATUSI = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+BROJCANA_POLJA = ["sirina_W", "visina_H", "tiraz", "broj_boja", "brzina_masine_m_min", "koeficijent_zarade", "cena_po_m2"]
+POZITIVNA_POLJA = ["sirina_W", "visina_H", "tiraz", "brzina_masine_m_min"]
+RUTE = ["/quote", "/quote/bulk", "/health", "/stats"]
+OSTALE_RUTE = "(ostalo)"           # nepoznate putanje se beleže pod jednim ključem
+
+
+class GreskaZahteva(Exception):
+    def __init__(self, status, poruka):
+        super().__init__(poruka); self.status = status; self.poruka = poruka
+
+
+def normalizuj_posao(posao, cene):
+    """Proverava jedan posao iz JSON-a i dopunjuje podrazumevane vrednosti i cenu materijala."""
+    if not isinstance(posao, dict): raise GreskaZahteva(400, "Posao mora biti JSON objekat.")
+    nepoznata = set(posao) - set(ULAZNE_KOLONE) - {"cena_po_m2"}
+    if nepoznata: raise GreskaZahteva(400, f"Nepoznata polja: {sorted(nepoznata)}")
+    rezultat = {}
+    for ime, podrazumevano in ULAZNE_KOLONE.items():
+        if ime in posao: rezultat[ime] = posao[ime]
+        elif podrazumevano is None: raise GreskaZahteva(400, f"Nedostaje obavezno polje '{ime}'.")
+        else: rezultat[ime] = podrazumevano
+    if "cena_po_m2" in posao: rezultat["cena_po_m2"] = posao["cena_po_m2"]
+    elif rezultat["materijal"] in cene["materijali_cene"]: rezultat["cena_po_m2"] = cene["materijali_cene"][rezultat["materijal"]]
+    else: raise GreskaZahteva(400, f"Nepoznat materijal '{rezultat['materijal']}'.")
+    for ime in BROJCANA_POLJA:
+        vrednost = rezultat[ime]
+        if isinstance(vrednost, bool) or not isinstance(vrednost, (int, float)): raise GreskaZahteva(400, f"Polje '{ime}' mora biti broj.")
+        # json.loads prihvata NaN i Infinity
+        if not np.isfinite(vrednost): raise GreskaZahteva(400, f"Polje '{ime}' mora biti konačan broj.")
+        if ime in POZITIVNA_POLJA and vrednost <= 0: raise GreskaZahteva(400, f"Polje '{ime}' mora biti > 0.")
+    for ime in ["is_blanko", "is_uv_lak"]:
+        if not isinstance(rezultat[ime], bool): raise GreskaZahteva(400, f"Polje '{ime}' mora biti true/false.")
+    if rezultat["tip_alata"] not in TIPOVI_ALATA: raise GreskaZahteva(400, f"Nepoznat tip alata '{rezultat['tip_alata']}'.")
+    return rezultat
+
+def _broj_cene(ime, vrednost):
+    if isinstance(vrednost, bool) or not isinstance(vrednost, (int, float)): raise GreskaZahteva(400, f"Cena '{ime}' mora biti broj.")
+    if not np.isfinite(vrednost) or vrednost < 0: raise GreskaZahteva(400, f"Cena '{ime}' mora biti konačan broj ≥ 0.")
+    return float(vrednost)
+
+def normalizuj_cene(izmene, cene):
+    """Proverava izmene cenovnika iz zahteva (ključevi kao podrazumevane_cene()) i vraća novi cenovnik."""
+    if not isinstance(izmene, dict): raise GreskaZahteva(400, "Polje 'cene' mora biti JSON objekat.")
+    nepoznata = set(izmene) - set(cene)
+    if nepoznata: raise GreskaZahteva(400, f"Nepoznate cene: {sorted(nepoznata)}")
+    materijali = izmene.get("materijali_cene", {})
+    if not isinstance(materijali, dict): raise GreskaZahteva(400, "Polje 'materijali_cene' mora biti JSON objekat {materijal: cena_po_m2}.")
+    return {**cene, **{ime: _broj_cene(ime, v) for ime, v in izmene.items() if ime != "materijali_cene"},
+            "materijali_cene": {**cene["materijali_cene"], **{naziv: _broj_cene(naziv, v) for naziv, v in materijali.items()}}}
+
+def _izracunaj_zapise(poslovi, cene):
+    """Računa listu normalizovanih poslova; vraća JSON niz (string) ponuda istim redom."""
+    return izracunaj_ponude(pd.DataFrame.from_records(poslovi), cene).to_json(orient="records", force_ascii=False)
+
+def _izracunaj_pojedinacno(poslovi, cene):
+    """Posle neuspelog paketa: svaki posao posebno; vraća listu zapisa ili izuzetaka istim redom."""
+    rezultati = []
+    for posao in poslovi:
+        try: rezultati.append(json.loads(_izracunaj_zapise([posao], cene))[0])
+        except Exception as e: rezultati.append(e)
+    return rezultati
+
+
+class Latencije:
+    def __init__(self):
+        self.uzorci = {}; self.brojaci = {}
+
+    def zabelezi(self, ruta, status, trajanje_s):
+        if ruta not in RUTE: ruta = OSTALE_RUTE
+        self.uzorci.setdefault(ruta, deque(maxlen=BROJ_UZORAKA_LATENCIJE)).append(trajanje_s * 1000.0)
+        kljuc = (ruta, status); self.brojaci[kljuc] = self.brojaci.get(kljuc, 0) + 1
+
+    def izvestaj(self):
+        rute = {}
+        for ruta, uzorci in self.uzorci.items():
+            p50, p90, p99 = np.percentile(np.fromiter(uzorci, float), [50, 90, 99])
+            rute[ruta] = {"uzoraka": len(uzorci), "p50_ms": p50, "p90_ms": p90, "p99_ms": p99,
+                          "statusi": {str(s): n for (r, s), n in self.brojaci.items() if r == ruta}}
+        return rute
+
+
+class MikroBatch:
+    """Skuplja pojedinačne ponude dok se prethodni paket računa i računa ih zajedno."""
+
+    def __init__(self, izvrsilac, cene):
+        self.izvrsilac = izvrsilac; self.cene = cene
+        self.red = asyncio.Queue(maxsize=MAX_RED_PONUDA)
+        self.paketa = 0; self.ponuda = 0
+
+    async def ponudi(self, posao):
+        buducnost = asyncio.get_running_loop().create_future()
+        try: self.red.put_nowait((posao, buducnost))
+        except asyncio.QueueFull: raise GreskaZahteva(503, "Servis je preopterećen, pokušajte ponovo.")
+        return await buducnost
+
+    async def radi(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            paket = [await self.red.get()]
+            while len(paket) < MAX_MIKRO_BATCH and not self.red.empty(): paket.append(self.red.get_nowait())
+            poslovi = [p for p, _ in paket]
+            try: zapisi = json.loads(await loop.run_in_executor(self.izvrsilac, _izracunaj_zapise, poslovi, self.cene))
+            except Exception as e:
+                # Jedan loš posao ne sme da obori ceo paket: računa se posao po posao
+                try: zapisi = await loop.run_in_executor(self.izvrsilac, _izracunaj_pojedinacno, poslovi, self.cene) if len(paket) > 1 else [e]
+                except Exception as e2: zapisi = [e2] * len(paket)
+            for (_, buducnost), zapis in zip(paket, zapisi):
+                if buducnost.done(): continue
+                if isinstance(zapis, Exception): buducnost.set_exception(zapis)
+                else: buducnost.set_result(zapis)
+            self.paketa += 1; self.ponuda += len(paket)
+
+
+class Servis:
+    def __init__(self, cene=None, radnici=None):
+        self.cene = cene or podrazumevane_cene()
+        self.radnici = radnici or os.cpu_count() or 1
+        self.niti = ThreadPoolExecutor(max_workers=self.radnici)
+        # Ne fork: procesi pokrenuti iz obrade zahteva bi nasledili otvorene sokete i klijent ne bi dobio EOF
+        kontekst = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+        self.procesi = ProcessPoolExecutor(max_workers=self.radnici, mp_context=kontekst)
+        self.latencije = Latencije()
+        self.bulk_mesta = asyncio.Semaphore(MAX_BULK_ISTOVREMENO); self.bulk_ceka = 0; self.bulk_aktivno = 0
+        self.mikro_batch = MikroBatch(self.niti, self.cene)
+        self.pocetak = time.time()
+
+    async def quote(self, telo):
+        return await self.mikro_batch.ponudi(normalizuj_posao(telo, self.cene))
+
+    async def quote_bulk(self, telo):
+        if not isinstance(telo, dict) or not isinstance(telo.get("poslovi"), list): raise GreskaZahteva(400, "Očekuje se {\"poslovi\": [...]}.")
+        poslovi = telo["poslovi"]
+        if len(poslovi) > MAX_POSLOVA_BULK: raise GreskaZahteva(413, f"Najviše {MAX_POSLOVA_BULK} poslova po zahtevu.")
+        cene = normalizuj_cene(telo["cene"], self.cene) if "cene" in telo else self.cene
+        if not poslovi: return "[]"
+        loop = asyncio.get_running_loop()
+        poslovi = await loop.run_in_executor(self.niti, lambda: [normalizuj_posao(p, cene) for p in poslovi])
+        if self.bulk_mesta.locked() and self.bulk_ceka >= MAX_BULK_CEKA: raise GreskaZahteva(503, "Previše bulk zahteva, pokušajte ponovo.")
+        self.bulk_ceka += 1
+        try: await self.bulk_mesta.acquire()
+        finally: self.bulk_ceka -= 1
+        self.bulk_aktivno += 1
+        try:
+            izvrsilac = self.procesi if len(poslovi) > PRAG_BULK_PROCES else self.niti
+            return await loop.run_in_executor(izvrsilac, _izracunaj_zapise, poslovi, cene)
+        finally:
+            self.bulk_aktivno -= 1; self.bulk_mesta.release()
+
+    def stats(self):
+        return {"radi_s": time.time() - self.pocetak, "radnici": self.radnici, "rute": self.latencije.izvestaj(),
+                "mikro_batch": {"u_redu": self.mikro_batch.red.qsize(), "paketa": self.mikro_batch.paketa, "ponuda": self.mikro_batch.ponuda},
+                "bulk": {"aktivno": self.bulk_aktivno, "ceka": self.bulk_ceka}, "kesevi": statistika_keseva()}
+
+    async def obradi(self, metoda, putanja, telo_bajtovi):
+        """Vraća (status, JSON telo kao string)."""
+        rute = {("POST", "/quote"): self.quote, ("POST", "/quote/bulk"): self.quote_bulk}
+        if putanja == "/health" and metoda == "GET": return 200, '{"status": "ok"}'
+        if putanja == "/stats" and metoda == "GET": return 200, json.dumps(self.stats(), ensure_ascii=False)
+        if (metoda, putanja) not in rute:
+            return (405 if putanja in ("/quote", "/quote/bulk") else 404), json.dumps({"greska": f"{metoda} {putanja} nije podržan."})
+        try:
+            # Veća tela se parsiraju van event loop-a da ne blokiraju ostale konekcije
+            if len(telo_bajtovi) > 64 * 1024: telo = await asyncio.get_running_loop().run_in_executor(self.niti, json.loads, telo_bajtovi)
+            else: telo = json.loads(telo_bajtovi or b"null")
+        except ValueError: raise GreskaZahteva(400, "Telo zahteva nije ispravan JSON.")
+        rezultat = await rute[(metoda, putanja)](telo)
+        if putanja == "/quote/bulk": return 200, '{"ponude": ' + rezultat + "}"
+        return 200, json.dumps(rezultat, ensure_ascii=False)
+
+    async def konekcija(self, reader, writer):
+        try:
+            while True:
+                try: zaglavlje = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), TIMEOUT_KONEKCIJE_S)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError): break
+                except asyncio.LimitOverrunError:
+                    await self._posalji(writer, 413, json.dumps({"greska": "Zaglavlje je preveliko."}), False); break
+                pocetak = time.perf_counter()
+                linije = zaglavlje.decode("latin-1").split("\r\n")
+                try: metoda, putanja, verzija = linije[0].split(" ", 2)
+                except ValueError:
+                    await self._posalji(writer, 400, json.dumps({"greska": "Neispravan zahtev."}), False); break
+                putanja = putanja.split("?", 1)[0]
+                zaglavlja = {}
+                for linija in linije[1:]:
+                    if ":" in linija: ime, vrednost = linija.split(":", 1); zaglavlja[ime.strip().lower()] = vrednost.strip()
+                zadrzi = zaglavlja.get("connection", "").lower() != "close" and verzija == "HTTP/1.1"
+                try:
+                    if zaglavlja.get("transfer-encoding"): raise GreskaZahteva(411, "Potreban je Content-Length (chunked nije podržan).")
+                    duzina = int(zaglavlja.get("content-length", "0"))
+                    if duzina > MAX_TELO_BAJTOVA:
+                        zadrzi = False; raise GreskaZahteva(413, f"Telo zahteva je veće od {MAX_TELO_BAJTOVA} bajtova.")
+                    telo = await reader.readexactly(duzina) if duzina else b""
+                    status, odgovor = await self.obradi(metoda, putanja, telo)
+                except GreskaZahteva as e: status, odgovor = e.status, json.dumps({"greska": e.poruka}, ensure_ascii=False)
+                except ValueError as e: status, odgovor = 400, json.dumps({"greska": str(e)}, ensure_ascii=False)
+                except asyncio.IncompleteReadError: break
+                except Exception as e: status, odgovor = 500, json.dumps({"greska": f"{type(e).__name__}: {e}"}, ensure_ascii=False)
+                await self._posalji(writer, status, odgovor, zadrzi)
+                self.latencije.zabelezi(putanja, status, time.perf_counter() - pocetak)
+                if not zadrzi: break
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _posalji(writer, status, telo, zadrzi):
+        telo = telo.encode("utf-8")
+        zaglavlje = (f"HTTP/1.1 {status} {STATUSI[status]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(telo)}\r\nConnection: {'keep-alive' if zadrzi else 'close'}\r\n")
+        if status == 503: zaglavlje += "Retry-After: 1\r\n"
+        writer.write(zaglavlje.encode("latin-1") + b"\r\n" + telo)
+        await writer.drain()
+
+    async def pokreni(self, host, port):
+        radnik = asyncio.create_task(self.mikro_batch.radi())
+        server = await asyncio.start_server(self.konekcija, host, port, limit=MAX_ZAGLAVLJE_BAJTOVA)
+        print(f"Servis za ponude sluša na http://{host}:{port} ({self.radnici} radnika)")
+        try:
+            async with server: await server.serve_forever()
+        finally:
+            radnik.cancel(); self.niti.shutdown(wait=False); self.procesi.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP servis za kalkulaciju ponuda etiketa.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--radnici", type=int, default=None, help="Broj niti/procesa (podrazumevano broj jezgara)")
+    parser.add_argument("--cene", help="JSON fajl sa cenovnikom (ključevi kao kalkulacija.podrazumevane_cene())")
+    args = parser.parse_args(argv)
+    cene = podrazumevane_cene()
+    if args.cene:
+        with open(args.cene, encoding="utf-8") as f: cene.update(json.load(f))
+
+    async def _pokreni():
+        await Servis(cene, args.radnici).pokreni(args.host, args.port)
+    try: asyncio.run(_pokreni())
+    except KeyboardInterrupt: pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,253 @@
+"""Lokalna SQLite baza: cene iz kataloga, istorija ponuda i inventar alata za isecanje.
+
+Upisi idu u red i jedna pozadinska nit ih upisuje u paketima (jedna transakcija
+po paketu), tako da stranica ne čeka na disk. Pisac ne čeka da se paket napuni:
+uzima sve što je trenutno u redu i odmah upisuje, a dok traje upis novi zahtevi se
+skupljaju za sledeći paket. Čitanja koriste posebnu konekciju po niti i čekaju samo
+izmene dodate u red pre samog čitanja (ne i one koje stignu kasnije).
+Neuspeo paket se odbacuje i broji (odbaceno), a pisac nastavlja; ako nit pisca
+ipak stane, čitanja više ne čekaju na nju, a novi upisi prijavljuju grešku.
+
+Alat je određen ključem iz raspored.kljuc_alata: Z, W (po obimu), H (po širini),
+x i y, sa dimenzijama zaokruženim na 0.001 mm, pa se pretraga radi po jednakosti
+nad indeksom.
+"""
+import atexit
+import json
+import math
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+import pandas as pd
+from kalkulacija import podrazumevane_cene
+
+MAX_SQLITE_INT = 2**63 - 1
+PUTANJA_BAZE = os.environ.get("LABEL_BAZA", "label_estimation.db")
+VELICINA_PAKETA = 500
+
+SEMA = """
+CREATE TABLE IF NOT EXISTS cene (kljuc TEXT PRIMARY KEY, vrednost REAL NOT NULL, azurirano TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS materijali (naziv TEXT PRIMARY KEY, cena_po_m2 REAL NOT NULL, azurirano TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS ponude (
+    id INTEGER PRIMARY KEY, vreme TEXT NOT NULL, klijent TEXT NOT NULL DEFAULT '', proizvod TEXT NOT NULL DEFAULT '',
+    sirina_W REAL, visina_H REAL, tiraz INTEGER, broj_boja INTEGER, is_blanko INTEGER, is_uv_lak INTEGER,
+    materijal TEXT, cena_po_m2 REAL, tip_alata TEXT, brzina_masine_m_min REAL, koeficijent_zarade REAL,
+    broj_zuba_Z INTEGER, broj_po_obimu_x INTEGER, broj_po_sirini_y INTEGER,
+    ukupni_trosak_proizvodnje_rsd REAL, ukupna_cena_prodajna_rsd REAL, prodajna_cena_po_komadu_rsd REAL,
+    detalji TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ponude_klijent ON ponude (klijent, vreme);
+CREATE INDEX IF NOT EXISTS ponude_proizvod ON ponude (proizvod, vreme);
+CREATE INDEX IF NOT EXISTS ponude_format ON ponude (sirina_W, visina_H);
+CREATE TABLE IF NOT EXISTS alati (
+    id INTEGER PRIMARY KEY, oznaka TEXT NOT NULL UNIQUE, tip_alata TEXT NOT NULL,
+    broj_zuba_Z INTEGER NOT NULL, sirina_W REAL NOT NULL, visina_H REAL NOT NULL,
+    broj_po_obimu_x INTEGER NOT NULL, broj_po_sirini_y INTEGER NOT NULL,
+    napomena TEXT NOT NULL DEFAULT '', dodat TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alati_format ON alati (sirina_W, visina_H, broj_zuba_Z);
+"""
+KOLONE_PONUDE = ["sirina_W", "visina_H", "tiraz", "broj_boja", "is_blanko", "is_uv_lak", "materijal", "cena_po_m2", "tip_alata",
+                 "brzina_masine_m_min", "koeficijent_zarade", "broj_zuba_Z", "broj_po_obimu_x", "broj_po_sirini_y",
+                 "ukupni_trosak_proizvodnje_rsd", "ukupna_cena_prodajna_rsd", "prodajna_cena_po_komadu_rsd"]
+KOLONE_ALATA = ["oznaka", "tip_alata", "broj_zuba_Z", "sirina_W", "visina_H", "broj_po_obimu_x", "broj_po_sirini_y", "napomena"]
+
+_SKLADISTA = {}
+_SKLADISTA_LOCK = threading.Lock()
+
+
+def _sada():
+    return datetime.now().isoformat(timespec="seconds")
+
+def _skalar(vrednost):
+    return vrednost.item() if hasattr(vrednost, "item") else vrednost
+
+
+class Skladiste:
+    """Baza na disku sa paketnim upisom iz pozadinske niti."""
+
+    def __init__(self, putanja=PUTANJA_BAZE, velicina_paketa=VELICINA_PAKETA):
+        self.putanja = putanja; self.velicina_paketa = velicina_paketa
+        self._lokalno = threading.local(); self._red = queue.Queue(); self._zatvoreno = False
+        # Redni brojevi izmena: poslato u red / obrađeno (upisano ili odbačeno)
+        self._uslov = threading.Condition(); self._poslato = 0; self._obradjeno = 0
+        self.upisano = 0; self.paketa = 0; self.odbaceno = 0; self.poslednja_greska = None; self.pisac_radi = True
+        with self._konekcija() as kon: kon.executescript(SEMA)
+        self._pisac = threading.Thread(target=self._pisi, name=f"skladiste:{putanja}", daemon=True); self._pisac.start()
+        atexit.register(self.zatvori)
+
+    def _konekcija(self):
+        kon = getattr(self._lokalno, "kon", None)
+        if kon is None:
+            kon = sqlite3.connect(self.putanja, timeout=30)
+            kon.execute("PRAGMA journal_mode=WAL"); kon.execute("PRAGMA synchronous=NORMAL")
+            self._lokalno.kon = kon
+        return kon
+
+    # --- Paketni upis ---
+    def _pisi(self):
+        try: self._pisi_pakete()
+        finally:
+            # Nit pisca je završila (zatvaranje ili neočekivana greška): čitanja više ne čekaju na nju
+            with self._uslov: self.pisac_radi = False; self._uslov.notify_all()
+
+    def _pisi_pakete(self):
+        kon = self._konekcija()
+        while True:
+            stavka = self._red.get()
+            if stavka is None: self._red.task_done(); return
+            paket = [stavka]
+            # Paket je sve što je već u redu (do velicina_paketa), bez čekanja na nove stavke
+            while len(paket) < self.velicina_paketa:
+                try: stavka = self._red.get_nowait()
+                except queue.Empty: break
+                if stavka is None: self._red.put(None); self._red.task_done(); break
+                paket.append(stavka)
+            try:
+                with kon:
+                    i = 0
+                    while i < len(paket):
+                        # Uzastopne stavke sa istim SQL-om idu jednim executemany
+                        j = i
+                        while j < len(paket) and paket[j][0] == paket[i][0]: j += 1
+                        kon.executemany(paket[i][0], [p for _, p in paket[i:j]]); i = j
+                self.upisano += len(paket); self.paketa += 1
+            except Exception as e:
+                # Neuspeo paket se odbacuje u celini (transakcija), nit nastavlja sa sledećim
+                self.odbaceno += len(paket); self.poslednja_greska = f"{type(e).__name__}: {e}"
+            finally:
+                with self._uslov: self._obradjeno += len(paket); self._uslov.notify_all()
+                for _ in paket: self._red.task_done()
+
+    def _u_red(self, sql, parametri):
+        if self._zatvoreno: raise RuntimeError("Skladište je zatvoreno.")
+        with self._uslov:
+            if not self.pisac_radi: raise RuntimeError(f"Upis u skladište je zaustavljen: {self.poslednja_greska}")
+            self._poslato += 1; self._red.put((sql, parametri))
+
+    def sacekaj_upis(self):
+        """Blokira dok se sve izmene iz reda ne upišu."""
+        self._red.join()
+
+    def _citaj(self, sql, parametri=()):
+        # Čeka samo izmene poslate pre ovog čitanja (tipično jedan paket, nekoliko ms)
+        with self._uslov:
+            cilj = self._poslato
+            self._uslov.wait_for(lambda: self._obradjeno >= cilj or not self.pisac_radi)
+        return pd.read_sql_query(sql, self._konekcija(), params=parametri)
+
+    def zatvori(self):
+        if self._zatvoreno: return
+        self._zatvoreno = True; self._red.put(None); self._pisac.join()
+
+    # --- Cene ---
+    def sacuvaj_cene(self, cene):
+        """Upisuje cene u obliku podrazumevane_cene() (uključujući materijali_cene)."""
+        sada = _sada()
+        for kljuc, vrednost in cene.items():
+            if kljuc == "materijali_cene":
+                for naziv, cena in vrednost.items():
+                    self._u_red("INSERT OR REPLACE INTO materijali (naziv, cena_po_m2, azurirano) VALUES (?, ?, ?)", (naziv, float(cena), sada))
+            else: self._u_red("INSERT OR REPLACE INTO cene (kljuc, vrednost, azurirano) VALUES (?, ?, ?)", (kljuc, float(vrednost), sada))
+
+    def ucitaj_cene(self):
+        """Cene iz baze; ono što nije sačuvano ostaje na podrazumevanoj vrednosti."""
+        cene = podrazumevane_cene()
+        for kljuc, vrednost in self._citaj("SELECT kljuc, vrednost FROM cene").itertuples(index=False):
+            if kljuc in cene: cene[kljuc] = vrednost
+        for naziv, cena in self._citaj("SELECT naziv, cena_po_m2 FROM materijali").itertuples(index=False): cene["materijali_cene"][naziv] = cena
+        return cene
+
+    # --- Ponude ---
+    def zapisi_ponudu(self, ulaz, rezultat, klijent="", proizvod=""):
+        """Upisuje ulaz i kompletan rezultat izracunaj_ponudu (ceo rečnik ide u kolonu detalji kao JSON)."""
+        zapis = {**{k: _skalar(v) for k, v in ulaz.items()}, **{k: _skalar(v) for k, v in rezultat.items()}}
+        self._u_red(f"INSERT INTO ponude (vreme, klijent, proizvod, {', '.join(KOLONE_PONUDE)}, detalji) VALUES ({', '.join(['?'] * (len(KOLONE_PONUDE) + 4))})",
+                    (_sada(), klijent or "", proizvod or "", *[zapis.get(k) for k in KOLONE_PONUDE], json.dumps(zapis, ensure_ascii=False)))
+
+    def ponude(self, klijent=None, proizvod=None, limit=100):
+        """Poslednje ponude, opciono za klijenta i/ili proizvod (tačno poklapanje, koristi indeks)."""
+        uslovi, parametri = [], []
+        if klijent: uslovi.append("klijent = ?"); parametri.append(klijent)
+        if proizvod: uslovi.append("proizvod = ?"); parametri.append(proizvod)
+        gde = f"WHERE {' AND '.join(uslovi)}" if uslovi else ""
+        return self._citaj(f"SELECT id, vreme, klijent, proizvod, {', '.join(KOLONE_PONUDE)} FROM ponude {gde} ORDER BY vreme DESC, id DESC LIMIT ?", (*parametri, int(limit)))
+
+    def detalji_ponude(self, id_ponude):
+        tabela = self._citaj("SELECT detalji FROM ponude WHERE id = ?", (int(id_ponude),))
+        return json.loads(tabela["detalji"].iat[0]) if len(tabela) else None
+
+    # --- Inventar alata ---
+    def dodaj_alate(self, alati):
+        """Dodaje ili menja (po oznaci) alate; svaki alat je rečnik sa kolonama KOLONE_ALATA.
+
+        Svi redovi se proveravaju pre upisa: ako je bilo koji neispravan (ValueError sa
+        brojem reda), ništa se ne upisuje.
+        """
+        sada = _sada(); redovi = []
+        for i, alat in enumerate(alati, 1):
+            try: redovi.append((*_proveri_alat(alat), sada))
+            except ValueError as e: raise ValueError(f"Alat u redu {i}: {e}") from None
+        for red in redovi:
+            self._u_red(f"INSERT OR REPLACE INTO alati ({', '.join(KOLONE_ALATA)}, dodat) VALUES ({', '.join(['?'] * (len(KOLONE_ALATA) + 1))})", red)
+
+    def obrisi_alat(self, oznaka):
+        self._u_red("DELETE FROM alati WHERE oznaka = ?", (oznaka,))
+
+    def pronadji_alate(self, sirina_W, visina_H, broj_zuba_Z=None, rotacija=True):
+        """Alati za format W×H (i H×W ako je rotacija dozvoljena), opciono samo za dati Z."""
+        W = round(float(sirina_W), 3); H = round(float(visina_H), 3)
+        orijentacije = [(W, H, False)] + ([(H, W, True)] if rotacija and W != H else [])
+        delovi = []
+        for obim, sirina, rotiran in orijentacije:
+            sql = f"SELECT {', '.join(KOLONE_ALATA)}, dodat, {int(rotiran)} AS rotiran FROM alati WHERE sirina_W = ? AND visina_H = ?"
+            parametri = [obim, sirina]
+            if broj_zuba_Z is not None: sql += " AND broj_zuba_Z = ?"; parametri.append(int(broj_zuba_Z))
+            delovi.append(self._citaj(sql, parametri))
+        tabela = pd.concat(delovi, ignore_index=True)
+        tabela["rotiran"] = tabela["rotiran"].astype(bool)
+        return tabela
+
+    def alati(self, limit=1000):
+        return self._citaj(f"SELECT {', '.join(KOLONE_ALATA)}, dodat FROM alati ORDER BY oznaka LIMIT ?", (int(limit),))
+
+    def statistika(self):
+        brojevi = {t: int(self._citaj(f"SELECT COUNT(*) AS n FROM {t}")["n"].iat[0]) for t in ["ponude", "alati", "materijali", "cene"]}
+        return {"putanja": self.putanja, **brojevi, "u_redu": self._red.unfinished_tasks, "upisano": self.upisano, "paketa": self.paketa,
+                "odbaceno": self.odbaceno, "poslednja_greska": self.poslednja_greska}
+
+
+def _proveri_alat(alat):
+    """Vrednosti jednog alata redom kao KOLONE_ALATA; ValueError ako nešto nedostaje ili nije ispravno."""
+    nedostaju = [k for k in KOLONE_ALATA if k != "napomena" and (alat.get(k) is None or (isinstance(alat.get(k), float) and math.isnan(alat[k])))]
+    if nedostaju: raise ValueError(f"nedostaju vrednosti {nedostaju}.")
+    oznaka = str(alat["oznaka"]).strip(); tip_alata = str(alat["tip_alata"]).strip()
+    if not oznaka: raise ValueError("alat mora imati oznaku.")
+    if not tip_alata: raise ValueError("alat mora imati tip.")
+    vrednosti = {}
+    for k in ["sirina_W", "visina_H"]:
+        try: vrednost = float(alat[k])
+        except (TypeError, ValueError): raise ValueError(f"'{k}' mora biti broj, dato {alat[k]!r}.") from None
+        if not math.isfinite(vrednost) or vrednost <= 0: raise ValueError(f"'{k}' mora biti konačan broj > 0, dato {alat[k]!r}.")
+        vrednosti[k] = round(vrednost, 3)
+    for k in ["broj_zuba_Z", "broj_po_obimu_x", "broj_po_sirini_y"]:
+        try: vrednost = float(alat[k])
+        except (TypeError, ValueError): raise ValueError(f"'{k}' mora biti ceo broj, dato {alat[k]!r}.") from None
+        if not math.isfinite(vrednost) or vrednost != int(vrednost) or not 1 <= int(vrednost) <= MAX_SQLITE_INT:
+            raise ValueError(f"'{k}' mora biti ceo broj ≥ 1, dato {alat[k]!r}.")
+        vrednosti[k] = int(alat[k]) if isinstance(alat[k], int) else int(vrednost)
+    napomena = alat.get("napomena")
+    napomena = "" if napomena is None or (isinstance(napomena, float) and math.isnan(napomena)) else str(napomena)
+    return oznaka, tip_alata, vrednosti["broj_zuba_Z"], vrednosti["sirina_W"], vrednosti["visina_H"], vrednosti["broj_po_obimu_x"], vrednosti["broj_po_sirini_y"], napomena
+
+def kljucevi_alata(tabela):
+    """Ključevi alata iz rezultata pronadji_alate, u obliku koji prima raspored.najbolji_rasporedi."""
+    return list(tabela[["broj_zuba_Z", "sirina_W", "visina_H", "broj_po_obimu_x", "broj_po_sirini_y"]].itertuples(index=False, name=None))
+
+def otvori_skladiste(putanja=PUTANJA_BAZE):
+    """Vraća skladište za datu putanju; otvara ga pri prvom pozivu (bezbedno za ponovljene rerun-ove)."""
+    with _SKLADISTA_LOCK:
+        if putanja not in _SKLADISTA: _SKLADISTA[putanja] = Skladiste(putanja)
+        return _SKLADISTA[putanja]